@@ -0,0 +1,151 @@
+"""
+asyncio client for the LLM REST endpoint (config.TEST_LLMs_REST_API_URL).
+
+AsyncLLMClient keeps one pooled keep-alive aiohttp session and bounds the number of
+requests in flight with a semaphore. Requests use the same payload and headers as
+ASUllmAPI.query_llm (ModelConfig.compute_payload / compute_headers) and return the
+same response dict.
+
+AsyncLLMBackend wraps the client in a query_llm-compatible, single-attempt callable
+running on a background event loop, so the synchronous pipeline in main.py and
+match.py can drive it through llm_client.set_llm_backend (see
+llm_client.use_async_transport) under the shared llm_scheduler retry policy.
+
+Requires the optional aiohttp package.
+"""
+import asyncio
+import threading
+
+import aiohttp
+
+from llm_scheduler import TransientLLMError, parse_retry_after
+
+DEFAULT_MAX_CONCURRENCY = 16
+KEEPALIVE_SECONDS = 60
+
+
+class AsyncLLMClient:
+    """
+    Pooled, concurrency-bounded async client for the LLM REST endpoint.
+
+    Args:
+        max_concurrency (int): Maximum requests in flight (also the connection pool size)
+        timeout (float): Total timeout per request in seconds
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout=180):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._session = None
+        self._semaphore = None
+
+    async def open(self):
+        """Create the pooled session; must be awaited on the loop that will use the client."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=KEEPALIVE_SECONDS)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def send(self, model, query):
+        """
+        Send one request without retrying (retries are left to llm_scheduler).
+
+        Returns:
+            dict: The endpoint's JSON response, as returned by ASUllmAPI.query_llm
+
+        Raises:
+            TransientLLMError: Throttling, a 5xx status, a network error or malformed JSON
+        """
+        payload = model.compute_payload(query=query)
+        headers = model.compute_headers()
+        try:
+            async with self._semaphore:
+                async with self._session.post(model.api_url, json=payload, headers=headers) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise TransientLLMError(f"HTTP {response.status}", status=response.status,
+                                                retry_after=parse_retry_after(response.headers.get("Retry-After")))
+                    response.raise_for_status()
+                    body = await response.json(content_type=None)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError, ValueError) as e:
+            raise TransientLLMError(str(e) or type(e).__name__) from e
+        response_dict = {"response": ""}
+        response_dict.update(body)
+        return response_dict
+
+    async def query(self, model, query, num_retry=3, success_sleep=0.0, fail_sleep=1.0):
+        """
+        Send one query, retrying failed requests after a fixed delay.
+
+        Returns:
+            dict: The endpoint's JSON response; {"response": ""} if every attempt failed,
+                  matching ASUllmAPI.query_llm
+        """
+        for attempt in range(num_retry):
+            try:
+                response_dict = await self.send(model, query)
+                if success_sleep > 0:
+                    await asyncio.sleep(success_sleep)
+                return response_dict
+            except (TransientLLMError, aiohttp.ClientError) as e:
+                print(f"  LLM request failed (attempt {attempt + 1}/{num_retry}): {e}")
+                if fail_sleep > 0 and attempt + 1 < num_retry:
+                    await asyncio.sleep(fail_sleep)
+        return {"response": ""}
+
+    async def query_many(self, model, queries, num_retry=3, fail_sleep=1.0):
+        """
+        Send many queries concurrently (bounded by max_concurrency).
+
+        Args:
+            queries (dict): query id -> prompt
+
+        Returns:
+            dict: query id -> response dict
+        """
+        ids = list(queries)
+        responses = await asyncio.gather(*(self.query(model, queries[qid], num_retry=num_retry,
+                                                      fail_sleep=fail_sleep) for qid in ids))
+        return dict(zip(ids, responses))
+
+
+class AsyncLLMBackend:
+    """
+    Synchronous, query_llm-compatible front end for AsyncLLMClient.
+
+    The client runs on its own event loop thread; any number of caller threads share
+    its pooled session and concurrency limit.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, timeout=180):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="async-llm-client", daemon=True)
+        self._thread.start()
+        self.client = AsyncLLMClient(max_concurrency=max_concurrency, timeout=timeout)
+        asyncio.run_coroutine_threadsafe(self.client.open(), self._loop).result()
+
+    def __call__(self, model, query, num_retry=1, success_sleep=0.0, fail_sleep=0.0, timeout=180):
+        """Make a single attempt (see AsyncLLMClient.send); llm_scheduler handles retries."""
+        future = asyncio.run_coroutine_threadsafe(self.client.send(model, query), self._loop)
+        return future.result()
+
+    def close(self):
+        """Close the session and stop the event loop thread."""
+        if self._loop.is_closed():
+            return
+        asyncio.run_coroutine_threadsafe(self.client.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,91 @@
+"""
+Benchmark map-reduce extraction of long syllabi against a single prompt, using a stub
+LLM whose latency grows with the prompt size.
+
+Each synthetic syllabus has its title block and gold statement on the first page, a
+long weekly schedule and its learning outcomes on the last page, so a correct merge
+has to combine fields found in different chunks.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_chunked_extraction --files 8 --pages 60 --per-token-latency 0.00002
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from ASUllmAPI import ModelConfig
+from llm_cache import MODE_OFF
+from llm_client import configure_llm_cache, configure_llm_scheduler, set_llm_backend
+from benchmarks.bench_pipeline import PLACEHOLDER_CREDENTIALS
+from benchmarks.stub_llm import StubLLM
+
+SCHEDULE_LINE = "Week {week}: read chapter {week} of the textbook and submit the weekly reflection by Friday. "
+
+
+def make_syllabus(index, pages):
+    course_code = f"CIS {100 + index}"
+    page_texts = [f"{course_code} Computer Applications\nInstructor: Dr. Jane Smith\n\n"
+                  f"Gold Statement\nThis course builds quantitative reasoning through {index + 2} projects.\n\n"
+                  f"Grading\nWeekly projects."]
+    page_texts += [SCHEDULE_LINE.format(week=page) * 40 for page in range(2, pages)]
+    page_texts += [f"Learning Outcomes\nStudents will build and evaluate {index + 2} spreadsheet models.\n\n"
+                   f"Grading\nSee the first page."]
+    text = "".join(f"\n\n--- Page {number} ---\n{page}" for number, page in enumerate(page_texts, 1))
+    expected = {"course_code": course_code, "instructor_name": "Jane Smith",
+                "extracted_gold_statement": f"This course builds quantitative reasoning through {index + 2} projects.",
+                "learning_outcome": f"Students will build and evaluate {index + 2} spreadsheet models."}
+    return f"{course_code} - Smith.pdf", text, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare single-prompt and chunked extraction of long syllabi.")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--per-token-latency", type=float, default=0.00002,
+                        help="Extra stub latency per prompt token, so long prompts are slow")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="chunk-bench-")
+    cwd = os.getcwd()
+    with open(os.path.join(workdir, "credentials.conf"), "w") as f:
+        f.write(PLACEHOLDER_CREDENTIALS)
+    os.chdir(workdir)
+    try:
+        # Imported from the scratch working directory, which holds placeholder credentials
+        from main import extract_syllabus
+        from document_chunks import MAX_PROMPT_TOKENS
+
+        configure_llm_cache(mode=MODE_OFF)
+        configure_llm_scheduler(rate_per_second=0)
+        stub = StubLLM(base_latency=args.latency, per_token_latency=args.per_token_latency)
+        set_llm_backend(stub)
+        model = ModelConfig(name="stub", provider="stub", access_token="stub", api_url="http://localhost/stub")
+        syllabi = [make_syllabus(index, args.pages) for index in range(args.files)]
+
+        report = []
+        for label, max_prompt_tokens in (("single prompt", 0), ("chunked", MAX_PROMPT_TOKENS)):
+            stub.reset()
+            start = time.perf_counter()
+            records = [extract_syllabus(file_name, text, model, max_prompt_tokens=max_prompt_tokens)
+                       for file_name, text, _ in syllabi]
+            seconds = time.perf_counter() - start
+            correct = sum(all(record.get(field) == value for field, value in expected.items())
+                          for record, (_, _, expected) in zip(records, syllabi))
+            report.append({"mode": label, "seconds": round(seconds, 3),
+                           "seconds_per_file": round(seconds / len(syllabi), 3),
+                           "llm_calls": stub.calls, "records_correct": correct})
+    finally:
+        set_llm_backend(None)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    tokens = len(syllabi[0][1]) // 4
+    print(json.dumps({"files": args.files, "document_tokens": tokens, "results": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
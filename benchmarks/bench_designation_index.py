@@ -0,0 +1,177 @@
+"""
+Benchmark the designation lookup on course codes written the way the LLM writes them.
+
+A course catalog and gold_statements.csv are generated as in benchmarks.synthetic_corpus,
+then extraction rows whose course_code is the catalog code as written, reformatted
+("CIS105", " cis 105 ", "CIS-105", cross-listed "CIS 105 / HON 105"), misspelled
+("CSI 105", "C1S 105") or not in the catalog, each with a gold statement that is the
+expected one, a paraphrase, an unrelated one or missing. add_gold_designations is run
+with the exact lookup only and with the course code and gold statement indexes.
+
+A row's expected designation is its catalog designation, or for an uncataloged course,
+the designation of the statement it quotes ("NA" for unrelated or missing statements).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_designation_index --rows 20000
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic_corpus import GOLD_DESIGNATIONS, SUBJECTS, _paraphrase
+from load_gold_statements_csv import GOLD_STATEMENTS_CSV, load_gold_statement_index
+from map_course_designation import (COURSE_CATALOG_CSV, add_gold_designations, load_course_code_index,
+                                    load_course_gold_dict)
+
+# Course code variant -> share of rows
+CODE_VARIANTS = (("as written", 0.5), ("compact", 0.1), ("padded lowercase", 0.1), ("dashed", 0.05),
+                 ("cross-listed", 0.05), ("misspelled", 0.1), ("uncataloged", 0.1))
+STATEMENT_VARIANTS = (("exact", 0.5), ("paraphrase", 0.2), ("unrelated", 0.15), ("missing", 0.15))
+UNRELATED_STATEMENTS = (
+    "Students will learn to write clean, well tested programs and to document them according to professional "
+    "conventions.",
+    "This course meets twice a week; attendance and participation count for ten percent of the grade.",
+    "This course has no general studies designation.",
+)
+
+
+def pick(rng, variants):
+    roll = rng.random()
+    for variant, share in variants:
+        if roll < share:
+            return variant
+        roll -= share
+    return variants[-1][0]
+
+
+def misspell(subject, rng):
+    if "I" in subject and rng.random() < 0.5:
+        return subject.replace("I", "1", 1)
+    i = rng.randrange(len(subject) - 1)
+    return subject[:i] + subject[i + 1] + subject[i] + subject[i + 2:]
+
+
+def make_rows(rng, num_rows, catalog):
+    rows = []
+    expected = []
+    designations = list(GOLD_DESIGNATIONS)
+    for i in range(num_rows):
+        code_variant = pick(rng, CODE_VARIANTS)
+        statement_variant = pick(rng, STATEMENT_VARIANTS)
+        if code_variant == "uncataloged":
+            subject, number = "XYZ", str(100 + i % 500)
+            designation = rng.choice(designations)
+        else:
+            subject, number, designation = rng.choice(catalog)
+        course_code = {
+            "as written": f"{subject} {number}",
+            "compact": f"{subject}{number}",
+            "padded lowercase": f" {subject.lower()} {number} ",
+            "dashed": f"{subject}-{number}",
+            "cross-listed": f"{subject} {number} / HON {number}",
+            "misspelled": f"{misspell(subject, rng)} {number}",
+            "uncataloged": f"{subject} {number}",
+        }[code_variant]
+        statement = {
+            "exact": GOLD_DESIGNATIONS[designation],
+            "paraphrase": _paraphrase(GOLD_DESIGNATIONS[designation]),
+            "unrelated": rng.choice(UNRELATED_STATEMENTS),
+            "missing": "NA",
+        }[statement_variant]
+        rows.append({"file_name": f"{i}.pdf", "course_code": course_code, "extracted_gold_statement": statement})
+        name = designation.rsplit(" (", 1)[0]
+        if code_variant == "uncataloged" and statement_variant in ("unrelated", "missing"):
+            name = "NA"
+        expected.append((code_variant, name))
+    return pd.DataFrame(rows), expected
+
+
+def score(df, expected):
+    """Return per code variant and overall counts of right, wrong and missing ("NA") designations."""
+    counts = {}
+    for designation, (code_variant, expected_designation) in zip(df["gold_designation"], expected):
+        for key in (code_variant, "all"):
+            bucket = counts.setdefault(key, {"right": 0, "wrong": 0, "missing": 0})
+            if designation == expected_designation:
+                bucket["right"] += 1
+            elif designation == "NA":
+                bucket["missing"] += 1
+            else:
+                bucket["wrong"] += 1
+    return counts
+
+
+def run_benchmark(workdir, args):
+    rng = random.Random(args.seed)
+    designations = list(GOLD_DESIGNATIONS)
+    catalog = [(subject, str(number), rng.choice(designations))
+               for subject in SUBJECTS for number in range(100, 100 + args.catalog_rows // len(SUBJECTS))]
+    os.makedirs(os.path.join(workdir, "Map"))
+    pd.DataFrame([(subject, number, designation) for subject, number, designation in catalog],
+                 columns=["Subject", "Nbr", "Gold Designation"]).to_csv(os.path.join(workdir, COURSE_CATALOG_CSV),
+                                                                          index=False)
+    pd.DataFrame([(designation.rsplit(" (", 1)[0], statement) for designation, statement in GOLD_DESIGNATIONS.items()],
+                 columns=["gold_designation", "statements"]).to_csv(os.path.join(workdir, GOLD_STATEMENTS_CSV),
+                                                                    index=False)
+    df, expected = make_rows(rng, args.rows, catalog)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        course_gold_dict = load_course_gold_dict()
+        start = time.perf_counter()
+        course_index = load_course_code_index()
+        statement_index = load_gold_statement_index()
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        exact = add_gold_designations(df, course_gold_dict)
+        exact_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        indexed = add_gold_designations(df, course_gold_dict, course_index, statement_index)
+        indexed_seconds = time.perf_counter() - start
+
+        statements = df["extracted_gold_statement"].tolist()
+        start = time.perf_counter()
+        for statement in statements:
+            statement_index.infer(statement)
+        infer_seconds = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+    fallback_rows = int((exact["gold_designation"] == "NA").sum())
+    return {
+        "rows": args.rows,
+        "catalog_rows": len(catalog),
+        "index_build_seconds": round(build_seconds, 4),
+        "exact_lookup": {"seconds": round(exact_seconds, 4), "designations": score(exact, expected)},
+        "with_indexes": {"seconds": round(indexed_seconds, 4), "designations": score(indexed, expected)},
+        "fallback_rows": fallback_rows,
+        "fallback_ms_per_row": round(1000 * (indexed_seconds - exact_seconds) / max(fallback_rows, 1), 4),
+        "statement_inference_ms_per_row": round(1000 * infer_seconds / len(statements), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the course code and gold statement designation indexes.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--catalog-rows", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="designation-bench-")
+    try:
+        report = run_benchmark(workdir, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
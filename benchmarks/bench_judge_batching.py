@@ -0,0 +1,97 @@
+"""
+Benchmark batched LLM-as-judge requests against the per-row path, using a stub LLM.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_judge_batching --rows 200 --latency 0.2 --batch-sizes 5 10 20
+"""
+import argparse
+import json
+import random
+import time
+
+from ASUllmAPI import ModelConfig
+from llm_cache import MODE_OFF
+from llm_client import configure_llm_cache, set_llm_backend
+from match import match_gold_statements_with_llm, match_gold_statements_batch_with_llm
+from benchmarks.stub_llm import StubLLM
+
+EXPECTED_STATEMENTS = {
+    "Humanities, Arts and Design": "This course fulfills the Humanities, Arts and Design requirement by "
+                                   "exploring how people express and interpret the human experience.",
+    "Social and Behavioral Sciences": "This course fulfills the Social and Behavioral Sciences requirement by "
+                                      "applying scientific methods to the study of human behavior and society.",
+    "Scientific Thinking in Natural Sciences": "This course fulfills the Scientific Thinking in Natural Sciences "
+                                               "requirement through inquiry into the natural world.",
+}
+
+
+def make_rows(count, seed=0):
+    """Build (gold_designation, syllabus_statement, expected_statement) triples of mixed quality."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        designation = rng.choice(sorted(EXPECTED_STATEMENTS))
+        expected = EXPECTED_STATEMENTS[designation]
+        words = expected.split()
+        kind = i % 3
+        if kind == 0:
+            syllabus = expected
+        elif kind == 1:
+            # Light paraphrase: drop a few words
+            syllabus = " ".join(word for j, word in enumerate(words) if j % 4 != 3)
+        else:
+            syllabus = "Students will read widely and write often about topics chosen each week."
+        rows.append((designation, syllabus, expected))
+    return rows
+
+
+def run_per_row(model, rows):
+    return [match_gold_statements_with_llm(model, *row) for row in rows]
+
+
+def run_batched(model, rows, batch_size):
+    verdicts = []
+    for start in range(0, len(rows), batch_size):
+        verdicts.extend(match_gold_statements_batch_with_llm(model, rows[start:start + batch_size]))
+    return verdicts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row and batched LLM-as-judge requests.")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub latency per request (seconds)")
+    parser.add_argument("--per-token-latency", type=float, default=0.0002,
+                        help="Stub latency per prompt/response token (seconds)")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="Share of items the stub leaves out of batched answers")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[5, 10, 20])
+    args = parser.parse_args()
+
+    configure_llm_cache(mode=MODE_OFF)
+    stub = StubLLM(base_latency=args.latency, per_token_latency=args.per_token_latency, drop_rate=args.drop_rate)
+    set_llm_backend(stub)
+    model = ModelConfig(name="stub", provider="stub", access_token="stub", api_url="http://localhost/stub")
+    rows = make_rows(args.rows)
+
+    report = []
+    start = time.perf_counter()
+    baseline = run_per_row(model, rows)
+    report.append({"mode": "per-row", "batch_size": 1, "llm_calls": stub.calls,
+                   "prompt_tokens": stub.prompt_tokens, "seconds": round(time.perf_counter() - start, 3),
+                   "agreement": 1.0})
+
+    for batch_size in args.batch_sizes:
+        stub.reset()
+        start = time.perf_counter()
+        verdicts = run_batched(model, rows, batch_size)
+        agreement = sum(a == b for a, b in zip(baseline, verdicts)) / len(rows)
+        report.append({"mode": "batched", "batch_size": batch_size, "llm_calls": stub.calls,
+                       "prompt_tokens": stub.prompt_tokens, "seconds": round(time.perf_counter() - start, 3),
+                       "agreement": round(agreement, 4)})
+
+    set_llm_backend(None)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare the fixed retry loop of ASUllmAPI.query_llm with the shared request scheduler
+(llm_scheduler) against the local mock endpoint while it throttles and fails requests.
+
+Reports, per client, how many requests were answered, how many were given up on
+(and would have been recorded as "not matched" before), and the load put on the server.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_llm_scheduler --requests 200 --throttle-rate 0.2 --error-rate 0.05
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ASUllmAPI import ModelConfig, query_llm
+from benchmarks.mock_llm_server import MockLLMServer
+from llm_client import send_llm_request
+from llm_scheduler import LLMRequestScheduler, LLMUnavailableError
+
+
+def make_queries(count):
+    return [f"Item {i}: reply with a short acknowledgement." for i in range(count)]
+
+
+def run_fixed_retries(model, queries, concurrency):
+    def send(query):
+        return bool(query_llm(model, query, num_retry=3, success_sleep=0.0, fail_sleep=1.0).get("response"))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send, queries)), {}
+
+
+def run_scheduler(model, queries, concurrency, rate):
+    scheduler = LLMRequestScheduler(rate_per_second=rate, backoff_base=0.5, reset_timeout=5.0)
+
+    def send(query):
+        try:
+            return bool(scheduler.submit(send_llm_request, model, query).get("response"))
+        except LLMUnavailableError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(send, queries)), scheduler.stats()
+
+
+def measure(server, label, run):
+    before = server.stats.as_dict()
+    start = time.perf_counter()
+    answered, client_stats = run()
+    seconds = time.perf_counter() - start
+    after = server.stats.as_dict()
+    report = {
+        "client": label,
+        "seconds": round(seconds, 2),
+        "answered": sum(answered),
+        "gave_up": len(answered) - sum(answered),
+        "server_requests": after["requests"] - before["requests"],
+        "server_throttled": after["throttled"] - before["throttled"],
+        "server_errors": after["errors"] - before["errors"],
+    }
+    report.update(client_stats)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM retry policies against a failing mock endpoint.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--rate-limit", type=float, default=50.0)
+    args = parser.parse_args()
+
+    queries = make_queries(args.requests)
+    with MockLLMServer(latency=args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                       retry_after=args.retry_after, seed=0) as server:
+        model = ModelConfig(name="mock", provider="mock", access_token="mock", api_url=server.url)
+        report = [
+            measure(server, "query_llm fixed retries", lambda: run_fixed_retries(model, queries, args.concurrency)),
+            measure(server, "scheduler", lambda: run_scheduler(model, queries, args.concurrency, args.rate_limit)),
+        ]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark streamed LLM answers over the WebSocket endpoint, read to the end of the
+stream or closed as soon as their JSON is complete, against the local mock endpoint.
+
+Every answer is also checked: its JSON must parse and equal the StubLLM answer, with
+the mock's trailing chatter left out.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_llm_streaming --requests 100 --concurrency 16 --latency 0.1
+"""
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ASUllmAPI import ModelConfig
+import metrics
+from llm_cache import MODE_OFF
+from llm_client import configure_llm_cache, configure_llm_scheduler, run_llm_query, set_llm_backend
+from llm_client import use_stream_transport
+from prompt_builder import build_syllabus_audit_prompt
+from benchmarks.mock_llm_server import MockLLMServer
+from benchmarks.stub_llm import StubLLM
+
+
+def make_prompts(count):
+    return [build_syllabus_audit_prompt(
+        filename=f"CIS {100 + i} - Smith.pdf",
+        data=f"--- Page 1 ---\nCIS {100 + i} Computer Applications {i}\nInstructor: Dr. Jane Smith\n\n"
+             f"Gold Statement\nThis course develops quantitative reasoning through {i} weekly projects.\n\n"
+             f"Learning Outcomes\nStudents will build and evaluate spreadsheet models.\n\nGrading\nWeekly projects.")
+        for i in range(count)]
+
+
+def expected_answer(stub, prompt):
+    text = stub.respond(prompt)
+    return json.loads(text[text.find("{"):text.rfind("}") + 1])
+
+
+def measure(server, label, model, prompts, concurrency, close_early):
+    use_stream_transport(server.ws_url, close_early=close_early)
+    metrics.reset()
+    before = server.stats.as_dict()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        responses = list(executor.map(lambda prompt: run_llm_query(model, prompt), prompts))
+    seconds = time.perf_counter() - start
+    after = server.stats.as_dict()
+
+    stub = StubLLM(base_latency=0)
+    correct = 0
+    for prompt, response in zip(prompts, responses):
+        try:
+            correct += json.loads(response["response"]) == expected_answer(stub, prompt)
+        except ValueError:
+            pass
+    first_token = [response["first_token_seconds"] for response in responses
+                   if response.get("first_token_seconds") is not None]
+    snapshot = metrics.snapshot()
+    return {
+        "mode": label,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(prompts) / seconds, 1),
+        "mean_latency_seconds": round(snapshot["histograms"]["llm.latency_seconds"]["mean"], 4),
+        "median_first_token_seconds": round(statistics.median(first_token), 4) if first_token else None,
+        "answers_correct": correct,
+        "streams_closed_early": snapshot["counters"].get("llm.streams_closed_early", 0),
+        "retries": snapshot["counters"].get("llm.retries", 0),
+        "server_chunks_sent": after["stream_chunks_sent"] - before["stream_chunks_sent"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed LLM answers with and without early close.")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds before the first chunk")
+    parser.add_argument("--chunk-interval", type=float, default=0.005, help="Seconds between chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    configure_llm_cache(mode=MODE_OFF)
+    configure_llm_scheduler(rate_per_second=0, backoff_base=0.05)
+    prompts = make_prompts(args.requests)
+    with MockLLMServer(latency=args.latency, error_rate=args.error_rate, seed=0,
+                       stream_interval=args.chunk_interval) as server:
+        model = ModelConfig(name="mock", provider="mock", access_token="mock", api_url=server.url)
+        try:
+            report = [
+                measure(server, "stream to end", model, prompts, args.concurrency, close_early=False),
+                measure(server, "close at end of JSON", model, prompts, args.concurrency, close_early=True),
+            ]
+        finally:
+            set_llm_backend(None)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare LLM request throughput of the blocking ASUllmAPI client on a thread pool
+against the pooled asyncio client, both against the local mock endpoint.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_llm_transport --requests 200 --concurrency 32 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ASUllmAPI import ModelConfig, query_llm
+from async_llm_client import AsyncLLMClient
+from benchmarks.mock_llm_server import MockLLMServer
+
+
+def make_queries(count):
+    return {i: f"Item {i}: reply with a short acknowledgement." for i in range(count)}
+
+
+def run_threaded(model, queries, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(query_llm, model, query, 3, 0.0, 0.1) for query in queries.values()]
+        return [future.result() for future in futures]
+
+
+async def run_async(model, queries, concurrency):
+    async with AsyncLLMClient(max_concurrency=concurrency) as client:
+        return await client.query_many(model, queries, fail_sleep=0.1)
+
+
+def measure(server, label, run):
+    before = server.stats.as_dict()
+    start = time.perf_counter()
+    responses = run()
+    seconds = time.perf_counter() - start
+    after = server.stats.as_dict()
+    values = responses.values() if isinstance(responses, dict) else responses
+    return {
+        "client": label,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(values) / seconds, 1),
+        "failed": sum(1 for response in values if not response.get("response")),
+        "server_requests": after["requests"] - before["requests"],
+        "connections_opened": after["connections"] - before["connections"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM client transports against a mock endpoint.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    queries = make_queries(args.requests)
+    with MockLLMServer(latency=args.latency, error_rate=args.error_rate, seed=0) as server:
+        model = ModelConfig(name="mock", provider="mock", access_token="mock", api_url=server.url)
+        report = [
+            measure(server, "threaded query_llm", lambda: run_threaded(model, queries, args.concurrency)),
+            measure(server, "async pooled", lambda: asyncio.run(run_async(model, queries, args.concurrency))),
+        ]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
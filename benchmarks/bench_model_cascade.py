@@ -0,0 +1,117 @@
+"""
+Benchmark a small-then-large model cascade against sending everything to the large model.
+
+Two stub models stand in for the endpoint: a fast "small" one that leaves the course
+code and name of a share of syllabi as "NA" and answers "unsure" to a share of judge
+prompts, and a slower "large" one that always answers. Both runs extract the same
+synthetic corpus and judge the same rows; the report gives requests per model, wall
+time, the cascade's own latency estimate and how many results agree with the
+large-model run.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_model_cascade --files 60 --rows 60 --small-latency 0.02 --large-latency 0.1
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ASUllmAPI import ModelConfig
+from llm_cache import MODE_OFF
+from llm_client import configure_llm_cache, configure_llm_scheduler, set_llm_backend
+from input_processing import read_pdfs_from_folder
+from model_cascade import ModelCascade
+from benchmarks.bench_pipeline import PLACEHOLDER_CREDENTIALS
+from benchmarks.stub_llm import StubLLM
+from benchmarks.synthetic_corpus import generate_corpus
+
+
+class ModelRouter:
+    """LLM backend that sends each request to the stub registered for the model's name."""
+
+    def __init__(self, stubs):
+        self.stubs = stubs
+
+    def __call__(self, model, query, **kwargs):
+        return self.stubs[model.name](model, query, **kwargs)
+
+
+def run(model, texts, rows, max_workers):
+    from main import extract_syllabus
+    from match import match_gold_statements_with_llm
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        records = list(executor.map(lambda item: extract_syllabus(item[0], item[1], model), texts.items()))
+        verdicts = list(executor.map(lambda row: match_gold_statements_with_llm(model, *row), rows))
+    return records, verdicts, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a model cascade with the large model alone.")
+    parser.add_argument("--files", type=int, default=60, help="Synthetic syllabi to extract")
+    parser.add_argument("--rows", type=int, default=60, help="Judge rows")
+    parser.add_argument("--small-latency", type=float, default=0.02)
+    parser.add_argument("--large-latency", type=float, default=0.1)
+    parser.add_argument("--miss-rate", type=float, default=0.2,
+                        help="Share of syllabi the small model returns without course code and name")
+    parser.add_argument("--unsure-rate", type=float, default=0.2,
+                        help="Share of judge prompts the small model answers 'unsure'")
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    configure_llm_cache(mode=MODE_OFF)
+    configure_llm_scheduler(rate_per_second=0)
+    small_stub = StubLLM(base_latency=args.small_latency, miss_rate=args.miss_rate, unsure_rate=args.unsure_rate,
+                         name="small")
+    large_stub = StubLLM(base_latency=args.large_latency, name="large")
+    set_llm_backend(ModelRouter({"small": small_stub, "large": large_stub}))
+
+    small = ModelConfig(name="small", provider="stub", access_token="stub", api_url="http://localhost/stub")
+    large = ModelConfig(name="large", provider="stub", access_token="stub", api_url="http://localhost/stub")
+    workdir = tempfile.mkdtemp(prefix="cascade-bench-")
+    cwd = os.getcwd()
+    try:
+        generate_corpus(workdir, num_files=args.files)
+        texts = read_pdfs_from_folder(os.path.join(workdir, "Data"))
+        with open(os.path.join(workdir, "credentials.conf"), "w") as f:
+            f.write(PLACEHOLDER_CREDENTIALS)
+        os.chdir(workdir)
+        # Imported from the scratch working directory, which holds placeholder credentials
+        from benchmarks.bench_judge_batching import make_rows
+
+        # Distinct statements, so the stub's unsure answers spread over the rows
+        rows = [(designation, f"{syllabus} (section {i})", expected)
+                for i, (designation, syllabus, expected) in enumerate(make_rows(args.rows))]
+        results = []
+        baseline_records, baseline_verdicts, baseline_seconds = run(large, texts, rows, args.max_workers)
+        results.append({"mode": "large only", "seconds": round(baseline_seconds, 3),
+                        "requests": {"small": small_stub.calls, "large": large_stub.calls}})
+
+        small_stub.reset()
+        large_stub.reset()
+        cascade = ModelCascade([small, large])
+        records, verdicts, seconds = run(cascade, texts, rows, args.max_workers)
+        stats = cascade.stats()
+        results.append({
+            "mode": "cascade",
+            "seconds": round(seconds, 3),
+            "requests": {"small": small_stub.calls, "large": large_stub.calls},
+            "escalated": stats["models"]["small"]["escalated"],
+            "estimated_seconds_saved": round(stats["estimated_seconds_saved"] or 0.0, 3),
+            "records_agreeing": sum(a == b for a, b in zip(records, baseline_records)),
+            "verdicts_agreeing": sum(a == b for a, b in zip(verdicts, baseline_verdicts)),
+        })
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        set_llm_backend(None)
+
+    print(json.dumps({"files": len(texts), "rows": len(rows), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
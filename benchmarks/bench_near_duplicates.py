@@ -0,0 +1,101 @@
+"""
+Benchmark near-duplicate reuse of extractions: syllabi copied once per section with
+another section number and room, every other section with another instructor and one
+with an edited gold statement, extracted with and without the NearDuplicateIndex,
+using a stub LLM.
+
+Every course shares the same long policy boilerplate, so different courses look alike
+too; the records of the reuse run must equal those of the full run.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_near_duplicates --courses 10 --sections 5 --latency 0.05
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from ASUllmAPI import ModelConfig
+from llm_cache import MODE_OFF
+from llm_client import configure_llm_cache, configure_llm_scheduler, set_llm_backend
+from benchmarks.bench_pipeline import PLACEHOLDER_CREDENTIALS
+from benchmarks.stub_llm import StubLLM
+
+INSTRUCTORS = ("Jane Smith", "Bob McCarthy", "Ana Lopez", "Wei Chen", "Sam Patel", "Lee Okafor")
+POLICIES = ("Academic Integrity\nAll work must be your own. Violations are reported to the dean and may result "
+            "in failure of the course.\n\nAttendance\nAttend every class. Three unexcused absences lower the final "
+            "grade by one letter.\n\nAccessibility\nStudents with disabilities should contact Student "
+            "Accessibility and Inclusive Learning Services to request accommodations.\n\n")
+
+
+def make_syllabus(course, section):
+    course_code = f"CIS {100 + course}"
+    instructor = INSTRUCTORS[(course + section // 2) % len(INSTRUCTORS)]
+    statement = f"This course builds quantitative reasoning through {course + 2} modeling projects."
+    if section == 3:
+        statement += " Students also present one project in class."
+    schedule = "".join(f"Week {week}: topic {week} of {course_code}, reading {course}.{week}.\n"
+                       for week in range(1, 16))
+    text = (f"\n\n--- Page 1 ---\n{course_code} Computer Applications {course}\n"
+            f"Instructor: Dr. {instructor}\nSection {section + 1}, Room {200 + section}\n\n"
+            f"Gold Statement\n{statement}\n\n"
+            f"Learning Outcomes\nStudents will build and evaluate {course + 2} spreadsheet models.\n\n"
+            f"Grading\nWeekly projects.\n\n--- Page 2 ---\n{POLICIES}Schedule\n{schedule}")
+    return f"Copy of {course_code} - {instructor.split()[-1]} - {section + 1}.pdf", text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare extraction with and without near-duplicate reuse.")
+    parser.add_argument("--courses", type=int, default=10)
+    parser.add_argument("--sections", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="near-duplicate-bench-")
+    cwd = os.getcwd()
+    with open(os.path.join(workdir, "credentials.conf"), "w") as f:
+        f.write(PLACEHOLDER_CREDENTIALS)
+    os.chdir(workdir)
+    try:
+        # Imported from the scratch working directory, which holds placeholder credentials
+        from main import extract_syllabi
+        from near_duplicates import NearDuplicateIndex
+
+        configure_llm_cache(mode=MODE_OFF)
+        configure_llm_scheduler(rate_per_second=0)
+        stub = StubLLM(base_latency=args.latency)
+        set_llm_backend(stub)
+        model = ModelConfig(name="stub", provider="stub", access_token="stub", api_url="http://localhost/stub")
+        # Sections of a course are spread over the folder, as in a real listing
+        syllabi = [make_syllabus(course, section)
+                   for section in range(args.sections) for course in range(args.courses)]
+
+        report = []
+        records = {}
+        for label, index in (("full extraction", None), ("near-duplicate reuse", NearDuplicateIndex())):
+            stub.reset()
+            start = time.perf_counter()
+            results, failures = extract_syllabi(syllabi, model, max_workers=args.workers, near_duplicates=index)
+            seconds = time.perf_counter() - start
+            records[label] = {record["file_name"]: record for record in results}
+            entry = {"mode": label, "seconds": round(seconds, 3), "llm_calls": stub.calls,
+                     "prompt_tokens": stub.prompt_tokens, "failures": len(failures)}
+            if index is not None:
+                entry.update(index.stats())
+            report.append(entry)
+        full, reused = records["full extraction"], records["near-duplicate reuse"]
+        differing = sorted(name for name in full if full[name] != reused.get(name))
+    finally:
+        set_llm_backend(None)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({"files": len(syllabi), "results": report, "records_identical": not differing,
+                      "differing_files": differing}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+End-to-end benchmark of the audit pipeline on a synthetic corpus.
+
+Generates a corpus with benchmarks.synthetic_corpus in a scratch folder, then runs
+main.process_folder (PDF parsing, extraction, designation mapping, gold matching and
+the report) against StubLLM with a configurable latency. Reports, as JSON:
+per-stage wall time, files/sec, LLM calls and prompt tokens, match verdict counts and
+peak RSS, together with the git commit and the pipeline's own metrics (see metrics.py),
+so runs of different versions can be compared.
+
+Stage times are taken by wrapping the stage functions process_folder calls
+(extract_syllabi, load_course_gold_dict/add_gold_designations,
+load_gold_statements_csv/match_gold_statements, write_report). PDF parsing streams
+into extraction, so both are reported under "extraction". "other" is listing and
+hashing the PDFs plus the checkpoint bookkeeping.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_pipeline --files 200 --latency 0.2 --output bench.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from benchmarks.stub_llm import StubLLM
+from benchmarks.synthetic_corpus import generate_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stage name -> functions of main timed under it
+STAGE_FUNCTIONS = {
+    "extraction": ["extract_syllabi"],
+    "designation": ["load_course_gold_dict", "add_gold_designations"],
+    "matching": ["load_gold_statements_csv", "match_gold_statements"],
+    "report": ["write_report"],
+}
+
+# Read by config.py if a credential is used; the stub LLM never uses these values
+PLACEHOLDER_CREDENTIALS = """[TEST]
+access_token = benchmark
+rest_api_url = http://localhost/benchmark
+model_list_endpoint = http://localhost/benchmark/models
+ws_url = ws://localhost/benchmark
+"""
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its finished child processes (MB)."""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+
+def instrument_stages(pipeline, stage_seconds, verdicts):
+    """Wrap the stage functions of the main module; returns a function that undoes it."""
+    originals = {}
+
+    def timed(stage, name, fn):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                stage_seconds[stage] += time.perf_counter() - start
+            if name == "match_gold_statements":
+                verdicts.update(result["match_result"])
+            return result
+        return wrapper
+
+    for stage, names in STAGE_FUNCTIONS.items():
+        for name in names:
+            originals[name] = getattr(pipeline, name)
+            setattr(pipeline, name, timed(stage, name, originals[name]))
+
+    def restore():
+        for name, fn in originals.items():
+            setattr(pipeline, name, fn)
+    return restore
+
+
+def run_benchmark(workdir, args):
+    corpus = generate_corpus(workdir, num_files=args.files, pages=args.pages, catalog_rows=args.catalog_rows,
+                             seed=args.seed)
+    with open(os.path.join(workdir, "credentials.conf"), "w") as f:
+        f.write(PLACEHOLDER_CREDENTIALS)
+    os.makedirs(os.path.join(workdir, "Output"), exist_ok=True)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import main as pipeline
+        import metrics
+        from ASUllmAPI import ModelConfig
+        from llm_cache import MODE_OFF
+        from llm_client import configure_llm_cache, configure_llm_scheduler, set_llm_backend
+
+        configure_llm_cache(mode=MODE_OFF)
+        scheduler = configure_llm_scheduler(rate_per_second=args.rate_limit)
+        stub = StubLLM(base_latency=args.latency, per_token_latency=args.per_token_latency)
+        set_llm_backend(stub)
+        model = ModelConfig(name="stub", provider="stub", access_token="stub", api_url="http://localhost/stub")
+
+        stage_seconds = dict.fromkeys(STAGE_FUNCTIONS, 0.0)
+        verdicts = Counter()
+        restore = instrument_stages(pipeline, stage_seconds, verdicts)
+        metrics.reset()
+        start = time.perf_counter()
+        try:
+            results = pipeline.process_folder("Data/", model, max_workers=args.max_workers,
+                                              pdf_workers=args.pdf_workers or None,
+                                              window_sections=not args.no_window, heuristics=args.heuristics)
+        finally:
+            total = time.perf_counter() - start
+            restore()
+            set_llm_backend(None)
+    finally:
+        os.chdir(cwd)
+
+    stage_seconds["other"] = max(0.0, total - sum(stage_seconds.values()))
+    own_rss, children_rss = peak_rss_mb()
+    return {
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "workdir", "keep")},
+        "corpus": corpus,
+        "files_extracted": len(results or []),
+        "total_seconds": round(total, 3),
+        "files_per_second": round(args.files / total, 2),
+        "stage_seconds": {stage: round(seconds, 3) for stage, seconds in stage_seconds.items()},
+        "llm_calls": stub.calls,
+        "llm_prompt_tokens": stub.prompt_tokens,
+        "llm_scheduler": scheduler.stats(),
+        "match_results": dict(verdicts),
+        "peak_rss_mb": own_rss,
+        "peak_rss_children_mb": children_rss,
+        "metrics": metrics.snapshot(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the audit pipeline on a synthetic corpus.")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--catalog-rows", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request (seconds)")
+    parser.add_argument("--per-token-latency", type=float, default=0.0,
+                        help="Stub latency per prompt/response token (seconds)")
+    parser.add_argument("--max-workers", type=int, default=4, help="Concurrent LLM requests")
+    parser.add_argument("--pdf-workers", type=int, default=4, help="PDF parsing processes (0 to read up front)")
+    parser.add_argument("--rate-limit", type=float, default=0, help="LLM requests per second (0 for no limit)")
+    parser.add_argument("--no-window", action="store_true", help="Send full syllabus text to the LLM")
+    parser.add_argument("--heuristics", action="store_true", help="Extract confidently recognised fields locally")
+    parser.add_argument("--workdir", help="Folder for the corpus and outputs (default: a temporary folder)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary folder")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    # The pipeline modules are imported from the scratch folder's working directory
+    sys.path.insert(0, REPO_ROOT)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="syllabus-bench-")
+    try:
+        report = run_benchmark(os.path.abspath(workdir), args)
+    finally:
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
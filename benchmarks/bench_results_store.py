@@ -0,0 +1,104 @@
+"""
+Benchmark a reporting query ("CIS courses that failed matching") on the SQLite results
+store against loading the Excel/CSV report into pandas and filtering it, and time an
+incremental re-run that updates a few verdicts in the store.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_results_store --rows 20000
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from results_store import ResultsStore
+
+SUBJECTS = ("CIS", "ENG", "MAT", "BIO", "HST", "PSY", "CHM", "ART")
+DESIGNATIONS = ("Scientific Thinking in Natural Sciences", "Humanities, Arts and Design",
+                "Quantitative Reasoning", "Social and Behavioral Sciences")
+VERDICTS = ("matched", "not matched", "not present")
+
+
+def make_rows(count):
+    rows = []
+    for index in range(count):
+        course_code = f"{SUBJECTS[index % len(SUBJECTS)]} {100 + index % 400}"
+        rows.append((hashlib.sha256(str(index).encode()).hexdigest(), {
+            "file_name": f"{course_code} - Section {index}.pdf",
+            "full_title": f"{course_code} Course {index}",
+            "course_code": course_code,
+            "course_name": f"Course {index}",
+            "instructor_name": "Jane Smith",
+            "extracted_gold_statement": f"This course develops reasoning through {index % 50} projects. " * 3,
+            "learning_outcome": "Students will build and evaluate models. " * 5,
+        }, DESIGNATIONS[index % len(DESIGNATIONS)], VERDICTS[index % 7 % len(VERDICTS)]))
+    return rows
+
+
+def timed(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare results store queries with loading the report.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--updates", type=int, default=50, help="Verdicts changed by the incremental re-run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="results-bench-")
+    try:
+        rows = make_rows(args.rows)
+        store = ResultsStore(os.path.join(workdir, "results.sqlite"))
+        start = time.perf_counter()
+        for file_hash, record, _, _ in rows:
+            store.upsert_extraction(file_hash, record)
+        store.update_designations((file_hash, record["course_code"], designation,
+                                   "NA" if designation == "NA" else "catalog")
+                                  for file_hash, record, designation, _ in rows)
+        for file_hash, record, _, verdict in rows:
+            store.update_match(file_hash, record["course_code"], verdict, "Expected statement.")
+        fill_seconds = time.perf_counter() - start
+
+        xlsx_path, csv_path = store.export(os.path.join(workdir, "report.xlsx"), ("xlsx", "csv"))
+
+        def from_report(path):
+            df = pd.read_excel(path, dtype=str) if path.endswith(".xlsx") else pd.read_csv(path, dtype=str)
+            return df[df["course_code"].str.startswith("CIS") & (df["match_result"] == "not matched")]
+
+        from_store, store_seconds = timed(lambda: store.query(course_prefix="CIS", match_result="not matched"))
+        from_csv, csv_seconds = timed(lambda: from_report(csv_path))
+        from_xlsx, xlsx_seconds = timed(lambda: from_report(xlsx_path), repeat=1)
+
+        # Incremental re-run: a few verdicts change, only those rows are written
+        start = time.perf_counter()
+        for file_hash, record, _, _ in rows[:args.updates]:
+            store.update_match(file_hash, record["course_code"], "matched", "Expected statement.")
+        update_seconds = time.perf_counter() - start
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps({
+        "rows": args.rows,
+        "query_rows_returned": len(from_store),
+        "same_rows": sorted(from_store["file_name"]) == sorted(from_csv["file_name"]) == sorted(from_xlsx["file_name"]),
+        "store_fill_seconds": round(fill_seconds, 3),
+        "query_seconds": {"store": round(store_seconds, 4), "csv_report": round(csv_seconds, 4),
+                          "xlsx_report": round(xlsx_seconds, 4)},
+        "incremental_update_seconds": {"rows": args.updates, "store": round(update_seconds, 4)},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark command-line startup time.
+
+Runs each command (by default the `--help` of every cli.py subcommand and of main.py)
+in a fresh interpreter several times and reports the fastest wall time, so startup
+regressions from an eager import show up between commits. For each command, the
+modules with the largest cumulative import time (`python -X importtime`) are listed.
+Also checks that the offline designate subcommand starts without credentials.conf.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup --repeat 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import REPO_ROOT, git_commit
+
+# Label -> arguments of the interpreter
+COMMANDS = {
+    "cli --help": ["cli.py", "--help"],
+    "cli extract --help": ["cli.py", "extract", "--help"],
+    "cli designate --help": ["cli.py", "designate", "--help"],
+    "cli match --help": ["cli.py", "match", "--help"],
+    "cli run-all --help": ["cli.py", "run-all", "--help"],
+    "main.py --help": ["main.py", "--help"],
+}
+
+
+def time_command(args, cwd, repeat):
+    """Return the fastest of repeat wall times (seconds) of `python <args>`."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def slowest_imports(args, cwd, top):
+    """
+    Return the top-level modules with the largest cumulative import time of `python -X importtime <args>`.
+
+    Returns:
+        dict: Module -> cumulative import time (ms), slowest first
+    """
+    stderr = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, capture_output=True,
+                            text=True, check=True).stderr
+    totals = {}
+    for line in stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only top-level imports; the modules they import are indented further
+        if not name.startswith("  "):
+            totals[name.strip()] = round(int(cumulative) / 1000, 1)
+    return dict(sorted(totals.items(), key=lambda item: -item[1])[:top])
+
+
+def runs_without_credentials(workdir):
+    """Whether `cli.py designate` starts in a folder without credentials.conf."""
+    result = subprocess.run([sys.executable, os.path.join(REPO_ROOT, "cli.py"), "designate", "--help"],
+                            cwd=workdir, capture_output=True, text=True)
+    return result.returncode == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark command-line startup time.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the fastest is reported")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports listed per command")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    startup = {}
+    imports = {}
+    for label, command in COMMANDS.items():
+        startup[label] = round(time_command(command, REPO_ROOT, args.repeat), 3)
+        imports[label] = slowest_imports(command, REPO_ROOT, args.top)
+
+    workdir = tempfile.mkdtemp(prefix="startup-bench-")
+    try:
+        designate_offline = runs_without_credentials(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "startup_seconds": startup,
+        "slowest_imports_ms": imports,
+        "designate_without_credentials": designate_offline,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark watch mode: latency from a syllabus landing in the data folder to its audit
+result in the results store, against a full re-run of the folder, using a stub LLM.
+
+A synthetic corpus is generated (see benchmarks.synthetic_corpus); its last --arrivals
+files are held back, the watcher audits the rest, then the held-back files are moved
+into the folder one at a time (atomically, like a finished upload).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_watch --files 100 --arrivals 5 --latency 0.2
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_pipeline import PLACEHOLDER_CREDENTIALS, REPO_ROOT
+from benchmarks.stub_llm import StubLLM
+from benchmarks.synthetic_corpus import generate_corpus
+
+
+def wait_for(condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def run_benchmark(workdir, args):
+    generate_corpus(workdir, num_files=args.files, seed=args.seed)
+    with open(os.path.join(workdir, "credentials.conf"), "w") as f:
+        f.write(PLACEHOLDER_CREDENTIALS)
+    data_dir = os.path.join(workdir, "Data")
+    incoming_dir = os.path.join(workdir, "Incoming")
+    os.makedirs(incoming_dir)
+    arrivals = sorted(os.listdir(data_dir))[-args.arrivals:]
+    for file_name in arrivals:
+        os.replace(os.path.join(data_dir, file_name), os.path.join(incoming_dir, file_name))
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        # Imported from the scratch working directory, which holds placeholder credentials
+        import main as pipeline
+        from ASUllmAPI import ModelConfig
+        from input_processing import compute_file_hash
+        from llm_cache import MODE_OFF
+        from llm_client import configure_llm_cache, configure_llm_scheduler, set_llm_backend
+        from results_store import ResultsStore
+        from watch import AuditWatcher
+
+        configure_llm_cache(mode=MODE_OFF)
+        configure_llm_scheduler(rate_per_second=0)
+        stub = StubLLM(base_latency=args.latency)
+        set_llm_backend(stub)
+        model = ModelConfig(name="stub", provider="stub", access_token="stub", api_url="http://localhost/stub")
+
+        store = ResultsStore(os.path.join("Output", "watch.sqlite"))
+        watcher = AuditWatcher("Data/", model, store, report_formats=("xlsx",), max_workers=args.max_workers,
+                               settle_seconds=args.settle_seconds)
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(args.interval, stop), daemon=True)
+        start = time.perf_counter()
+        thread.start()
+        initial_files = args.files - args.arrivals
+        if not wait_for(lambda: watcher.files_audited >= initial_files, timeout=600):
+            raise RuntimeError("initial scan did not finish")
+        initial_seconds = time.perf_counter() - start
+
+        latencies = []
+        for file_name in arrivals:
+            path = os.path.join(data_dir, file_name)
+            file_hash = compute_file_hash(os.path.join(incoming_dir, file_name))
+            landed = time.perf_counter()
+            os.replace(os.path.join(incoming_dir, file_name), path)
+            if not wait_for(lambda: store.match_results([file_hash]).get(file_hash) is not None, timeout=120):
+                raise RuntimeError(f"{file_name} was not audited")
+            latencies.append(time.perf_counter() - landed)
+        stop.set()
+        thread.join()
+        store.close()
+
+        # A full re-run of the folder, as without watch mode
+        stub.reset()
+        start = time.perf_counter()
+        pipeline.process_folder("Data/", model, output_file=os.path.join("Output", "full.xlsx"),
+                                max_workers=args.max_workers, pdf_workers=4, window_sections=True,
+                                results_db=os.path.join("Output", "full.sqlite"))
+        full_seconds = time.perf_counter() - start
+        set_llm_backend(None)
+    finally:
+        os.chdir(cwd)
+
+    return {
+        "files": args.files,
+        "arrivals": args.arrivals,
+        "poll_interval_seconds": args.interval,
+        "settle_seconds": args.settle_seconds,
+        "initial_scan_seconds": round(initial_seconds, 3),
+        "arrival_to_result_seconds": {"median": round(statistics.median(latencies), 3),
+                                      "max": round(max(latencies), 3)},
+        "full_rerun_seconds": round(full_seconds, 3),
+        "full_rerun_llm_calls": stub.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark watch-mode latency against a full re-run.")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--arrivals", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub latency per request (seconds)")
+    parser.add_argument("--max-workers", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.5, help="Watcher poll interval (seconds)")
+    parser.add_argument("--settle-seconds", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The pipeline modules are imported from the scratch folder's working directory
+    sys.path.insert(0, REPO_ROOT)
+    workdir = tempfile.mkdtemp(prefix="watch-bench-")
+    try:
+        report = run_benchmark(workdir, args)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
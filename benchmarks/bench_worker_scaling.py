@@ -0,0 +1,85 @@
+"""
+Benchmark how extraction scales with the number of concurrent LLM requests.
+
+main.extract_syllabi is run over the same in-memory syllabi with 1, 2, 4 and 8
+workers against StubLLM with a fixed latency per request, so the wall time is
+dominated by waiting on the LLM, as with the real endpoint. The speedup over one
+worker should be close to the number of workers; the run fails when it falls below
+--min-efficiency times the worker count, or when the records differ between runs.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_worker_scaling --files 40 --latency 0.1
+"""
+import argparse
+import json
+import sys
+import time
+
+from ASUllmAPI import ModelConfig
+from llm_cache import MODE_OFF
+from llm_client import configure_llm_cache, configure_llm_scheduler, set_llm_backend
+from benchmarks.stub_llm import StubLLM
+from benchmarks.synthetic_corpus import GOLD_DESIGNATIONS, SUBJECTS
+
+
+def make_syllabus(i):
+    course_code = f"{SUBJECTS[i % len(SUBJECTS)]} {100 + i // len(SUBJECTS)}"
+    statement = list(GOLD_DESIGNATIONS.values())[i % len(GOLD_DESIGNATIONS)]
+    text = (f"\n\n--- Page 1 ---\n{course_code} Foundations {i}\nInstructor: Dr. Sam Patel\n\n"
+            f"Gold Statement\n{statement}\n\n"
+            f"Learning Outcomes\nStudents will explain and apply {i + 2} core concepts.\n\n"
+            f"Grading\nWeekly projects and a final exam.\n")
+    return f"{course_code} - Patel - {10000 + i}.pdf", text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction speedup with concurrent LLM requests.")
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stub latency per request (seconds)")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--min-efficiency", type=float, default=0.7,
+                        help="Fail when speedup / workers falls below this (0 only reports)")
+    args = parser.parse_args()
+
+    # Imported late so the stub is installed on the same modules extract_syllabi uses
+    from main import extract_syllabi
+
+    configure_llm_cache(mode=MODE_OFF)
+    configure_llm_scheduler(rate_per_second=0)
+    stub = StubLLM(base_latency=args.latency)
+    set_llm_backend(stub)
+    model = ModelConfig(name="stub", provider="stub", access_token="stub", api_url="http://localhost/stub")
+    syllabi = [make_syllabus(i) for i in range(args.files)]
+
+    runs = []
+    baseline_seconds = None
+    baseline_records = None
+    failed = []
+    try:
+        for workers in (int(count) for count in args.workers.split(",")):
+            stub.reset()
+            start = time.perf_counter()
+            results, failures = extract_syllabi(syllabi, model, max_workers=workers)
+            seconds = time.perf_counter() - start
+            # Relative to one worker, extrapolated when the first count is not 1
+            if baseline_seconds is None:
+                baseline_seconds, baseline_records = seconds * workers, results
+            speedup = baseline_seconds / seconds
+            efficiency = speedup / workers
+            runs.append({"workers": workers, "seconds": round(seconds, 3), "speedup": round(speedup, 2),
+                         "efficiency": round(efficiency, 2), "llm_calls": stub.calls, "failures": len(failures)})
+            if failures or results != baseline_records:
+                failed.append(f"{workers} workers: records differ or files failed")
+            elif args.min_efficiency and efficiency < args.min_efficiency:
+                failed.append(f"{workers} workers: speedup {speedup:.2f} below {args.min_efficiency:g} x {workers}")
+    finally:
+        set_llm_backend(None)
+
+    print(json.dumps({"files": args.files, "latency_seconds": args.latency, "runs": runs, "failed": failed},
+                     indent=2))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
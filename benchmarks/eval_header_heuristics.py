@@ -0,0 +1,177 @@
+"""
+Measure the rule-based field extractor (header_heuristics) against LLM extractions.
+
+For every labeled syllabus, each field the heuristics settle (confidence at or above
+the threshold) is compared with the LLM's value. The report gives, per field, how
+often the heuristics settle it (coverage) and how often they then agree with the
+LLM (accuracy), plus the LLM requests skipped and prompt tokens saved.
+
+Labels are LLM extraction records, read from an extraction checkpoint
+(Output/all_results.checkpoint.jsonl) or an audit report (.xlsx/.csv) with a
+file_name column. With --synthetic, a synthetic corpus is generated and StubLLM
+answers serve as labels; that only checks the plumbing, since StubLLM is rule-based too.
+
+Usage (from the repository root):
+    python -m benchmarks.eval_header_heuristics Data/ --labels Output/all_results.checkpoint.jsonl
+    python -m benchmarks.eval_header_heuristics --synthetic 100
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import pandas as pd
+
+from header_heuristics import HEURISTIC_MIN_CONFIDENCE, HEADER_FIELDS, extract_header_fields, settled_fields
+from input_processing import read_pdfs_from_folder
+from prompt_builder import AUDIT_FIELDS, build_partial_audit_prompt, build_syllabus_audit_prompt, estimate_tokens
+from section_windowing import split_pages, window_relevant_sections
+from text_similarity import containment, normalize_text, shingles, tokenize
+
+# Section texts agree when this share of either one's 3-word shingles is in the other
+SECTION_AGREEMENT = 0.8
+_TITLE_RE = re.compile(r"^(dr|prof|professor|mr|ms|mrs) ")
+
+
+def load_labels(path):
+    """Return file_name -> LLM extraction record from a checkpoint (.jsonl) or report (.xlsx/.csv)."""
+    if path.endswith(".jsonl"):
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line)["record"])
+    elif path.endswith(".csv"):
+        records = pd.read_csv(path, dtype=str, keep_default_na=False).to_dict("records")
+    else:
+        records = pd.read_excel(path, dtype=str).fillna("NA").to_dict("records")
+    return {record["file_name"]: record for record in records if record.get("file_name")}
+
+
+def fields_agree(field, value, label):
+    """Compare a heuristic value with the LLM's, ignoring formatting differences."""
+    value, label = normalize_text(str(value)), normalize_text(str(label))
+    if value in ("na", "") or label in ("na", ""):
+        return value in ("na", "") and label in ("na", "")
+    if field == "course_code":
+        return value.replace(" ", "") == label.replace(" ", "")
+    if field == "instructor_name":
+        return _TITLE_RE.sub("", value) == _TITLE_RE.sub("", label)
+    if field in HEADER_FIELDS:
+        return value == label
+    a, b = shingles(tokenize(value)), shingles(tokenize(label))
+    return containment(a, b) >= SECTION_AGREEMENT and containment(b, a) >= SECTION_AGREEMENT
+
+
+def evaluate(texts, labels, min_confidence=HEURISTIC_MIN_CONFIDENCE, window_sections=True):
+    """
+    Compare heuristic extraction with the labels.
+
+    Args:
+        texts (dict): file_name -> extracted PDF text
+        labels (dict): file_name -> LLM extraction record
+
+    Returns:
+        dict: The report (see the module docstring)
+    """
+    per_field = {field: {"settled": 0, "correct": 0} for field in AUDIT_FIELDS}
+    skipped = shrunk = full = 0
+    tokens_before = tokens_after = 0
+    files_all_correct = 0
+    evaluated = [name for name in texts if name in labels]
+
+    for file_name in evaluated:
+        text, label = texts[file_name], labels[file_name]
+        fields, confidence = extract_header_fields(file_name, text)
+        settled = settled_fields(fields, confidence, min_confidence)
+        all_correct = True
+        for field, value in settled.items():
+            per_field[field]["settled"] += 1
+            if fields_agree(field, value, label.get(field, "NA")):
+                per_field[field]["correct"] += 1
+            else:
+                all_correct = False
+        files_all_correct += all_correct
+
+        data = window_relevant_sections(text) if window_sections else text
+        full_tokens = estimate_tokens(build_syllabus_audit_prompt(filename=file_name, data=data))
+        tokens_before += full_tokens
+        remaining = [field for field in AUDIT_FIELDS if field not in settled]
+        if not remaining:
+            skipped += 1
+        elif settled:
+            shrunk += 1
+            if all(field in HEADER_FIELDS for field in remaining):
+                pages = split_pages(text)
+                data = text[:pages[0][2]] if pages else text
+            tokens_after += estimate_tokens(build_partial_audit_prompt(file_name, data, remaining))
+        else:
+            full += 1
+            tokens_after += full_tokens
+
+    count = len(evaluated) or 1
+    return {
+        "files": len(evaluated),
+        "min_confidence": min_confidence,
+        "fields": {field: {"coverage": round(stats["settled"] / count, 3),
+                           "accuracy": round(stats["correct"] / stats["settled"], 3) if stats["settled"] else None,
+                           **stats}
+                   for field, stats in per_field.items()},
+        "files_with_all_settled_fields_correct": round(files_all_correct / count, 3),
+        "llm_requests": {"skipped": skipped, "shrunk": shrunk, "full": full},
+        "llm_calls_saved": round(skipped / count, 3),
+        "prompt_tokens": {"before": tokens_before, "after": tokens_after,
+                          "saved": round(1 - tokens_after / tokens_before, 3) if tokens_before else 0.0},
+    }
+
+
+def synthetic_sample(num_files):
+    """Generate a synthetic corpus and label it with StubLLM answers."""
+    from benchmarks.stub_llm import StubLLM
+    from benchmarks.synthetic_corpus import generate_corpus
+
+    root = tempfile.mkdtemp(prefix="heuristics-eval-")
+    try:
+        generate_corpus(root, num_files=num_files)
+        texts = read_pdfs_from_folder(os.path.join(root, "Data"))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    stub = StubLLM(base_latency=0)
+    labels = {}
+    for name, text in texts.items():
+        response = stub.respond(build_syllabus_audit_prompt(filename=name, data=text))
+        # StubLLM wraps its JSON in a code fence, like the real model often does
+        labels[name] = json.loads(response[response.find("{"):response.rfind("}") + 1])
+    return texts, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate rule-based field extraction against LLM labels.")
+    parser.add_argument("folder", nargs="?", help="Folder with the labeled syllabus PDFs")
+    parser.add_argument("--labels", help="Extraction checkpoint (.jsonl) or audit report (.xlsx/.csv)")
+    parser.add_argument("--synthetic", type=int, help="Evaluate on this many synthetic syllabi instead")
+    parser.add_argument("--min-confidence", type=float, default=HEURISTIC_MIN_CONFIDENCE)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        texts, labels = synthetic_sample(args.synthetic)
+    elif args.folder and args.labels:
+        labels = load_labels(args.labels)
+        texts = read_pdfs_from_folder(args.folder, filenames=[name for name in labels
+                                                              if os.path.exists(os.path.join(args.folder, name))])
+    else:
+        parser.error("give a folder and --labels, or --synthetic N")
+
+    report = evaluate(texts, labels, min_confidence=args.min_confidence)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
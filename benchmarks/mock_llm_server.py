@@ -0,0 +1,215 @@
+"""
+Local mock of the LLM REST and WebSocket endpoints for offline throughput testing.
+
+Accepts the same POST payload as the real endpoint (ModelConfig.compute_payload) and
+answers with {"response": ..., "metadata": ...} using StubLLM, after a configurable
+latency. A share of requests can fail with HTTP 500 or be throttled with HTTP 429.
+
+A WebSocket connection (GET on any path) takes the same payload as a message and
+streams the StubLLM answer back like the real WebSocket endpoint: {"response": chunk}
+messages, every stream_interval seconds after the first one, followed by trailing
+chatter and a final {"response": "<EOS>", "metadata": ...} message.
+
+Usage (from the repository root):
+    python -m benchmarks.mock_llm_server --port 8765 --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.stub_llm import StubLLM
+
+END_OF_STREAM = "<EOS>"
+TRAILING_CHATTER = ("\n\nThe JSON above contains every requested field. Let me know if you would like me to "
+                    "extract anything else from this syllabus or explain how each field was identified.")
+
+
+class MockServerStats:
+    """Request counters kept by the mock server."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections = set()
+        self.streams = 0
+        self.streams_completed = 0
+        self.streams_closed_by_client = 0
+        self.stream_chunks_sent = 0
+
+    def as_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "max_in_flight": self.max_in_flight,
+            "connections": len(self.connections),
+            "streams": self.streams,
+            "streams_completed": self.streams_completed,
+            "streams_closed_by_client": self.streams_closed_by_client,
+            "stream_chunks_sent": self.stream_chunks_sent,
+        }
+
+
+def create_app(latency=0.2, jitter=0.0, error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=None,
+               stream_chunk_chars=16, stream_interval=0.005, trailing_chatter=TRAILING_CHATTER):
+    """
+    Build the mock endpoint.
+
+    Args:
+        latency (float): Seconds before every response (before the first chunk of a stream)
+        jitter (float): Extra random latency, uniformly up to this many seconds
+        error_rate (float): Share of requests answered with HTTP 500 (an error message on a stream)
+        throttle_rate (float): Share of requests answered with HTTP 429 and Retry-After
+        retry_after (int): Retry-After value (seconds) sent with 429 responses
+        seed (int): Random seed for reproducible failures
+        stream_chunk_chars (int): Characters per streamed chunk
+        stream_interval (float): Seconds between streamed chunks
+        trailing_chatter (str): Text streamed after the answer, like a chatty model
+    """
+    rng = random.Random(seed)
+    stub = StubLLM(base_latency=0)
+    stats = MockServerStats()
+
+    async def handle(request):
+        payload = await request.json()
+        stats.requests += 1
+        stats.connections.add(request.transport.get_extra_info("peername") if request.transport else None)
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(latency + rng.uniform(0, jitter))
+            roll = rng.random()
+            if roll < error_rate:
+                stats.errors += 1
+                return web.json_response({"message": "mock internal error"}, status=500)
+            if roll < error_rate + throttle_rate:
+                stats.throttled += 1
+                return web.json_response({"message": "Too Many Requests"}, status=429,
+                                         headers={"Retry-After": str(retry_after)})
+            return web.json_response({
+                "response": stub.respond(payload.get("query", "")),
+                "metadata": {"model_name": payload.get("model_name"), "model_provider": payload.get("model_provider")},
+            })
+        finally:
+            stats.in_flight -= 1
+
+    async def stream_answer(ws, payload):
+        await asyncio.sleep(latency + rng.uniform(0, jitter))
+        if rng.random() < error_rate:
+            stats.errors += 1
+            await ws.send_str(json.dumps({"message": "Internal server error"}))
+            return
+        text = stub.respond(payload.get("query", "")) + trailing_chatter
+        for start in range(0, len(text), stream_chunk_chars):
+            if start:
+                await asyncio.sleep(stream_interval)
+            if ws.closed:
+                stats.streams_closed_by_client += 1
+                return
+            await ws.send_str(json.dumps({"response": text[start:start + stream_chunk_chars]}))
+            stats.stream_chunks_sent += 1
+        await ws.send_str(json.dumps({"response": END_OF_STREAM,
+                                      "metadata": {"model_name": payload.get("model_name")}}))
+        stats.streams_completed += 1
+
+    async def handle_stream(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        streaming = None
+        # Keep reading while an answer streams, so a close from the client is seen at once
+        async for message in ws:
+            if message.type == aiohttp.WSMsgType.TEXT:
+                if streaming is not None:
+                    await streaming
+                stats.streams += 1
+                stats.requests += 1
+                streaming = asyncio.ensure_future(stream_answer(ws, json.loads(message.data)))
+        if streaming is not None:
+            try:
+                await streaming
+            except ConnectionResetError:
+                stats.streams_closed_by_client += 1
+        return ws
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post("/{tail:.*}", handle)
+    app.router.add_get("/{tail:.*}", handle_stream)
+    return app
+
+
+class MockLLMServer:
+    """
+    Run the mock endpoint on a background thread, e.g. from a benchmark.
+
+    Usage:
+        with MockLLMServer(latency=0.1) as server:
+            model = ModelConfig(..., api_url=server.url)
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, **app_options):
+        self.host = host
+        self.port = port
+        self.app = create_app(**app_options)
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mock-llm-server", daemon=True)
+        self._runner = None
+
+    @property
+    def stats(self):
+        return self.app["stats"]
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    async def _start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{self.host}:{port}/"
+        self.ws_url = f"ws://{self.host}:{port}/"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a mock LLM REST endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    app = create_app(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                     throttle_rate=args.throttle_rate, seed=args.seed)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Local stand-in for the LLM endpoint, used by the benchmarks.
+
+StubLLM answers the syllabus audit prompt and the LLM-as-judge prompts (single and
+batched) deterministically, after sleeping for a configurable latency, and counts the
+calls and prompt size it received. Install it with llm_client.set_llm_backend(stub).
+"""
+import json
+import re
+import threading
+import time
+import zlib
+
+from prompt_builder import estimate_tokens
+from text_similarity import tokenize, shingles, containment
+
+_FILENAME_RE = re.compile(r'"file_name": MUST be exactly "([^"]*)"')
+_COURSE_CODE_RE = re.compile(r"\b([A-Z]{2,4}) ?(\d{3})\b")
+_INSTRUCTOR_RE = re.compile(r"Instructor:\s*(?:Dr\.\s*|Prof\.\s*)?([^\n]+)")
+_ITEM_RE = re.compile(r"Item id: (\d+)\nGold Designation Area: ([^\n]*)\nSyllabus Gold Statement:\n(.*?)(?=\n\nItem id: |\n\nJSON only:)",
+                      re.DOTALL)
+_EXPECTED_RE = re.compile(r"Gold Designation Area: ([^\n]*)\n(.*?)(?=\n\nGold Designation Area: |\n\nItems:)", re.DOTALL)
+
+
+def _section(document, heading, stop_headings):
+    """Return the text following a heading line, up to the next known heading."""
+    match = re.search(rf"^{re.escape(heading)}\s*$", document, re.MULTILINE)
+    if not match:
+        return "NA"
+    rest = document[match.end():]
+    stop = len(rest)
+    for stop_heading in stop_headings:
+        found = re.search(rf"^{re.escape(stop_heading)}\s*$", rest, re.MULTILINE)
+        if found:
+            stop = min(stop, found.start())
+    page_marker = re.search(r"\n--- Page \d+ ---", rest)
+    if page_marker:
+        stop = min(stop, page_marker.start())
+    return " ".join(rest[:stop].split()) or "NA"
+
+
+def _selected(key, rate):
+    """Deterministically select a share `rate` of keys."""
+    return rate > 0 and zlib.crc32(key.encode("utf-8")) % 10000 < rate * 10000
+
+
+def _is_match(syllabus_statement, expected_statement):
+    score = containment(shingles(tokenize(expected_statement)), shingles(tokenize(syllabus_statement)))
+    return score >= 0.5
+
+
+class StubLLM:
+    """
+    Callable with the signature of ASUllmAPI.query_llm.
+
+    Args:
+        base_latency (float): Seconds every request takes
+        per_token_latency (float): Extra seconds per prompt and response token
+        drop_rate (float): Fraction of items silently left out of batched judge answers
+        miss_rate (float): Fraction of syllabi whose course code and name come back "NA",
+                           like a weaker model would (the same syllabi on every call)
+        unsure_rate (float): Fraction of judge answers (single or batched items) that are "unsure"
+        name (str): Label used in reports
+    """
+
+    def __init__(self, base_latency=0.2, per_token_latency=0.0, drop_rate=0.0, miss_rate=0.0, unsure_rate=0.0,
+                 name="stub"):
+        self.base_latency = base_latency
+        self.per_token_latency = per_token_latency
+        self.drop_rate = drop_rate
+        self.miss_rate = miss_rate
+        self.unsure_rate = unsure_rate
+        self.name = name
+        self.calls = 0
+        self.prompt_tokens = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.prompt_tokens = 0
+
+    def respond(self, query):
+        """Return the response text for a prompt, without any simulated latency."""
+        if "Items:" in query and "Item id:" in query:
+            return self._judge_batch(query)
+        if "impartial evaluator" in query:
+            return self._judge_single(query)
+        return self._extract(query)
+
+    def __call__(self, model, query, num_retry=3, success_sleep=0.0, fail_sleep=1.0, timeout=180):
+        response = self.respond(query)
+
+        prompt_tokens = estimate_tokens(query)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+        time.sleep(self.base_latency + self.per_token_latency * (prompt_tokens + estimate_tokens(response)))
+        return {"response": response}
+
+    def _extract(self, query):
+        filename_match = _FILENAME_RE.search(query)
+        marker = "Extracted document content::"
+        document = query.split(marker, 1)[1] if marker in query else query
+
+        code_match = _COURSE_CODE_RE.search(document)
+        course_code = f"{code_match.group(1)} {code_match.group(2)}" if code_match else "NA"
+        course_name = "NA"
+        full_title = "NA"
+        if code_match:
+            title_line = document[code_match.start():].split("\n", 1)[0].strip()
+            full_title = title_line
+            course_name = title_line[code_match.end() - code_match.start():].strip(" -:") or "NA"
+        instructor_match = _INSTRUCTOR_RE.search(document)
+
+        headings = ["Gold Statement", "Learning Outcomes", "Course Description", "Grading", "Schedule"]
+        result = {
+            "file_name": filename_match.group(1) if filename_match else "NA",
+            "full_title": full_title,
+            "course_code": course_code,
+            "course_name": course_name,
+            "instructor_name": instructor_match.group(1).strip() if instructor_match else "NA",
+            "extracted_gold_statement": _section(document, "Gold Statement", headings),
+            "learning_outcome": _section(document, "Learning Outcomes", headings),
+        }
+        if _selected(result["file_name"], self.miss_rate):
+            result["course_code"] = result["course_name"] = "NA"
+        # Real models often wrap the JSON in a code fence
+        return "```json\n" + json.dumps(result, indent=2) + "\n```"
+
+    def _judge_single(self, query):
+        expected = query.split("Official Expected Statement:\n", 1)[1].split("\n\nSyllabus Gold Statement:", 1)[0]
+        syllabus = query.split("Syllabus Gold Statement:\n", 1)[1].split("\n\nJSON only:", 1)[0]
+        answer = "yes" if _is_match(syllabus, expected) else "no"
+        if _selected(syllabus, self.unsure_rate):
+            answer = "unsure"
+        return json.dumps({"match": answer, "reason": "stub comparison"})
+
+    def _judge_batch(self, query):
+        expected_section = query.split("Official Expected Statements:\n\n", 1)[1]
+        expected_by_designation = {designation: text for designation, text in _EXPECTED_RE.findall(expected_section)}
+        items = _ITEM_RE.findall(query.split("Items:", 1)[1])
+
+        drop_every = round(1 / self.drop_rate) if self.drop_rate else 0
+        answers = []
+        for position, (item_id, designation, syllabus) in enumerate(items):
+            # Drop a deterministic share of items to exercise re-querying
+            if drop_every and (position + 1) % drop_every == 0:
+                continue
+            expected = expected_by_designation.get(designation, "")
+            answer = "yes" if _is_match(syllabus, expected) else "no"
+            if _selected(syllabus, self.unsure_rate):
+                answer = "unsure"
+            answers.append({"id": int(item_id), "match": answer, "reason": "stub comparison"})
+        return json.dumps(answers)
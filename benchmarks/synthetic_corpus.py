@@ -0,0 +1,231 @@
+"""
+Generate a synthetic syllabus corpus for the end-to-end benchmark.
+
+Writes, under a root folder, the layout the pipeline expects:
+    Data/*.pdf                          syllabus PDFs (text, several pages)
+    Map/<course catalog CSV>            Subject, Nbr, Gold Designation
+    Map/gold_statements.csv             gold_designation, statements
+
+Each syllabus gets one of these gold statement variants, so every matching path is
+exercised: the exact expected statement (decided locally), a paraphrase (sent to the
+LLM judge), an unrelated statement (decided locally) or no statement at all. A share
+of the courses is left out of the catalog (designation "NA").
+
+The PDFs are written directly (uncompressed text streams with the standard Helvetica
+font), so no PDF library is needed to generate them.
+
+Usage (from the repository root):
+    python -m benchmarks.synthetic_corpus /tmp/corpus --files 200
+"""
+import argparse
+import csv
+import os
+import random
+import textwrap
+
+from load_gold_statements_csv import GOLD_STATEMENTS_CSV
+from map_course_designation import COURSE_CATALOG_CSV
+
+GOLD_DESIGNATIONS = {
+    "Humanities, Arts and Design (HUAD)":
+        "This course develops the ability to interpret and create works of human expression, examining "
+        "how literature, art, music and design reflect and shape cultural values across time and place.",
+    "Social and Behavioral Sciences (SOBE)":
+        "This course applies the theories and methods of the social and behavioral sciences to explain how "
+        "individuals, groups and institutions think, behave and interact within society.",
+    "Scientific Thinking in Natural Sciences (SCIT)":
+        "This course engages students in scientific inquiry, using observation, hypothesis testing and "
+        "quantitative evidence to explain phenomena of the natural world.",
+    "Quantitative Reasoning (QTRS)":
+        "This course builds the capacity to reason with numbers, models and data, and to use quantitative "
+        "evidence to support arguments and decisions in real-world contexts.",
+    "Mathematical Foundations (MATH)":
+        "This course establishes the mathematical foundations of functions, algebraic structures and proof "
+        "needed to formulate and solve problems across disciplines.",
+    "American Institutions (AMIT)":
+        "This course examines the founding documents, political institutions and economic history of the "
+        "United States and their influence on contemporary civic life.",
+    "Governance and Civic Engagement (CIVI)":
+        "This course prepares students for informed civic participation by analyzing how communities govern "
+        "themselves and how citizens influence public decisions.",
+    "Global Communities, Societies and Individuals (GCSI)":
+        "This course explores the interconnections among global communities, examining how cultures, "
+        "economies and individuals influence one another across national boundaries.",
+    "Sustainability (SUST)":
+        "This course investigates the environmental, social and economic dimensions of sustainability and "
+        "evaluates strategies for meeting present needs without compromising future generations.",
+}
+
+SUBJECTS = ["CIS", "ENG", "HIS", "BIO", "MAT", "PSY", "SOC", "ART", "PHI", "ECN", "POS", "SUS"]
+TOPICS = ["Foundations", "Methods", "Perspectives", "Principles", "Topics", "Inquiry", "Practice", "Analysis"]
+FIELDS = ["Computing", "Literature", "History", "Biology", "Statistics", "Psychology", "Society", "Design",
+          "Ethics", "Economics", "Politics", "Environment"]
+FIRST_NAMES = ["Alex", "Jordan", "Sam", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn"]
+LAST_NAMES = ["Garcia", "Nguyen", "Smith", "Patel", "Kim", "Lopez", "Brown", "Chen", "Davis", "Martinez"]
+FILLER = ("Students are expected to attend every session, complete the assigned readings before class and "
+          "participate in discussion. Late work is accepted within one week with a ten percent deduction. "
+          "Academic integrity policies apply to all assignments, quizzes and examinations in this course.")
+
+# Share of syllabi per gold statement variant
+STATEMENT_VARIANTS = (("exact", 0.5), ("paraphrase", 0.2), ("unrelated", 0.15), ("missing", 0.15))
+# Share of courses left out of the catalog
+UNCATALOGED_SHARE = 0.1
+LINE_WIDTH = 90
+LINES_PER_PAGE = 48
+
+
+def _escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path, pages):
+    """
+    Write a minimal text PDF.
+
+    Args:
+        path (str): Output file
+        pages (list): One list of text lines per page (latin-1 characters)
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, lines in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        text = " ".join(f"({_escape(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 50 760 Td {text} ET".encode("latin-1", errors="replace")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _paraphrase(statement):
+    words = statement.split()
+    keep = words[:len(words) // 2]
+    return " ".join(keep + ["and", "related", "skills", "through", "weekly", "projects", "and", "reflection."])
+
+
+def _pick_variant(rng):
+    roll = rng.random()
+    for variant, share in STATEMENT_VARIANTS:
+        if roll < share:
+            return variant
+        roll -= share
+    return STATEMENT_VARIANTS[-1][0]
+
+
+def _syllabus_pages(course_code, title, instructor, designation, variant, num_pages, rng):
+    lines = [f"{course_code} - {title}", "Syllabus, Fall Semester", f"Instructor: Dr. {instructor}",
+             "Office Hours: Tuesday and Thursday, 2:00-3:30 PM", "", "Course Description"]
+    lines += textwrap.wrap(f"{title} introduces the core ideas of the field. " + FILLER, LINE_WIDTH)
+
+    expected = GOLD_DESIGNATIONS[designation]
+    statement = {
+        "exact": expected,
+        "paraphrase": _paraphrase(expected),
+        "unrelated": "Students will learn to write clean, well tested programs and to document them "
+                     "according to professional conventions.",
+        "missing": None,
+    }[variant]
+    body = []
+    if statement is not None:
+        body += ["", "Gold Statement"] + textwrap.wrap(statement, LINE_WIDTH)
+    body += ["", "Learning Outcomes"]
+    body += [f"{n}. Students will {verb} {rng.choice(FIELDS).lower()} concepts."
+             for n, verb in enumerate(["explain", "apply", "analyze", "evaluate"], start=1)]
+    body += ["", "Grading"] + textwrap.wrap(FILLER, LINE_WIDTH)
+    body += ["", "Schedule"] + [f"Week {week}: {rng.choice(TOPICS)} of {rng.choice(FIELDS)}" for week in range(1, 16)]
+
+    pages = [lines]
+    for start in range(0, len(body), LINES_PER_PAGE):
+        pages.append(body[start:start + LINES_PER_PAGE])
+    while len(pages) < num_pages:
+        pages.append(textwrap.wrap(FILLER * 4, LINE_WIDTH))
+    return pages
+
+
+def generate_corpus(root, num_files=100, pages=3, catalog_rows=2000, seed=0):
+    """
+    Write a synthetic corpus under root (see the module docstring for the layout).
+
+    Args:
+        root (str): Output folder; Data/ and Map/ are created inside it
+        num_files (int): Number of syllabus PDFs
+        pages (int): Minimum pages per syllabus (filler pages are appended)
+        catalog_rows (int): Minimum rows in the course catalog CSV (unrelated courses are added)
+        seed (int): Random seed
+
+    Returns:
+        dict: Counts of syllabi per gold statement variant and of uncataloged courses
+    """
+    rng = random.Random(seed)
+    data_dir = os.path.join(root, "Data")
+    os.makedirs(data_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(os.path.join(root, COURSE_CATALOG_CSV)), exist_ok=True)
+
+    designations = list(GOLD_DESIGNATIONS)
+    catalog = []
+    counts = {variant: 0 for variant, _ in STATEMENT_VARIANTS}
+    counts["uncataloged"] = 0
+    for i in range(num_files):
+        subject = SUBJECTS[i % len(SUBJECTS)]
+        course_code = f"{subject} {100 + i // len(SUBJECTS)}"
+        title = f"{rng.choice(TOPICS)} of {rng.choice(FIELDS)}"
+        instructor = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        designation = rng.choice(designations)
+        variant = _pick_variant(rng)
+        counts[variant] += 1
+        if rng.random() < UNCATALOGED_SHARE:
+            counts["uncataloged"] += 1
+        else:
+            catalog.append((subject, course_code.split()[1], designation))
+        file_name = f"{course_code} - {instructor.split()[1]} - {10000 + i}.pdf"
+        write_pdf(os.path.join(data_dir, file_name),
+                  _syllabus_pages(course_code, title, instructor, designation, variant, pages, rng))
+
+    # Unrelated catalog entries, so the lookup tables have a realistic size
+    number = 600
+    while len(catalog) < catalog_rows:
+        catalog.append((rng.choice(SUBJECTS), str(number), rng.choice(designations)))
+        number += 1
+
+    with open(os.path.join(root, COURSE_CATALOG_CSV), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Subject", "Nbr", "Gold Designation"])
+        writer.writerows(catalog)
+
+    with open(os.path.join(root, GOLD_STATEMENTS_CSV), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["gold_designation", "statements"])
+        for designation, statement in GOLD_DESIGNATIONS.items():
+            writer.writerow([designation.rsplit(" (", 1)[0], statement])
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic syllabus corpus.")
+    parser.add_argument("root", help="Output folder")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--catalog-rows", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    counts = generate_corpus(args.root, num_files=args.files, pages=args.pages,
+                             catalog_rows=args.catalog_rows, seed=args.seed)
+    print(f"Wrote {args.files} syllabi to {args.root}: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Append-only JSONL checkpoints that let an interrupted audit resume where it stopped.
+
+Each line holds one completed record and the key of the work that produced it:
+    {"key": "<file hash or row key>", "record": {...}}
+"""
+import hashlib
+import json
+import os
+import threading
+
+_write_lock = threading.Lock()
+
+
+def checkpoint_path_for(output_file):
+    """Return the checkpoint file that belongs to an output file."""
+    return f"{os.path.splitext(output_file)[0]}.checkpoint.jsonl"
+
+
+def load_checkpoint(path):
+    """
+    Load the completed records from a checkpoint file.
+
+    A truncated last line (from a run killed mid-write) is ignored, and terminated so
+    that records appended by the resumed run start on a fresh line.
+
+    Returns:
+        dict: Mapping key -> record, empty if the file does not exist
+    """
+    records = {}
+    if not os.path.exists(path):
+        return records
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    for line in content.splitlines():
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        records[entry["key"]] = entry["record"]
+
+    if content and not content.endswith("\n"):
+        with _write_lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+    return records
+
+
+def reset_checkpoint(path):
+    """Start a fresh checkpoint, discarding records from a previous run."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    open(path, "w", encoding="utf-8").close()
+
+
+def append_checkpoint(path, key, record):
+    """Append one completed record and flush it to disk straight away."""
+    line = json.dumps({"key": key, "record": record}, default=str) + "\n"
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def row_key(*values):
+    """Build a stable key for a unit of work from the values it depends on."""
+    return hashlib.sha256("\x1f".join(str(value) for value in values).encode("utf-8")).hexdigest()
@@ -0,0 +1,71 @@
+"""
+Single command-line entry point of the syllabus audit.
+
+Each subcommand imports the pipeline modules it needs only when it runs, so this
+module itself loads nothing but the standard library: `--help`, cron wrappers and
+worker processes that re-import the entry point start quickly. credentials.conf is
+only read by the subcommands that call the LLM (extract, match and run-all);
+designate runs offline.
+
+Usage:
+    python cli.py extract [options]      # Data/ -> Output/all_results.xlsx
+    python cli.py designate              # -> Output/all_results_designation.xlsx
+    python cli.py match [options]        # -> Output/all_results_designation_matched.xlsx
+    python cli.py run-all [options]      # every stage in one process, as main.py
+    python cli.py <subcommand> --help    # options of a subcommand
+"""
+import argparse
+import sys
+
+
+def run_extract(argv, prog):
+    from main import main as run_pipeline
+    run_pipeline(["--extract-only", *argv], prog=prog)
+
+
+def run_designate(argv, prog):
+    argparse.ArgumentParser(prog=prog, description="Add gold designations to the extraction results in "
+                                                   "Output/ (offline, no credentials needed).").parse_args(argv)
+    from map_course_designation import process_course_designation
+    if process_course_designation() is None:
+        sys.exit(1)
+
+
+def run_match(argv, prog):
+    from match import main as run_matching
+    run_matching(argv, prog=prog)
+
+
+def run_all(argv, prog):
+    from main import main as run_pipeline
+    run_pipeline(argv, prog=prog)
+
+
+# Subcommand -> (handler, help)
+COMMANDS = {
+    "extract": (run_extract, "Extract the fields of every syllabus in Data/ with the LLM"),
+    "designate": (run_designate, "Look up the gold designation of each extracted course (offline)"),
+    "match": (run_match, "Judge each extracted gold statement against the expected statement"),
+    "run-all": (run_all, "Extract, designate and match in one process"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Audit syllabus PDFs with an LLM.",
+        epilog="Subcommands: " + "; ".join(f"{name}: {text}" for name, (_, text) in COMMANDS.items()))
+    parser.add_argument("command", choices=COMMANDS, help="Subcommand (see below); '<subcommand> --help' for "
+                                                          "its options")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    handler, _ = COMMANDS[args.command]
+    try:
+        handler(args.args, prog=f"cli.py {args.command}")
+    except FileNotFoundError as e:
+        # Typically credentials.conf or an input folder missing from the working directory
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Persist lookup dictionaries built from the CSV files in Map/ next to their source.
+
+A compiled index is a pickle stored beside the CSV. It is reused while the CSV's size
+and modification time are unchanged, revalidated by content hash when only the
+modification time moved (e.g. after a fresh checkout), and rebuilt otherwise. A
+long-running process (see watch.py) also keeps each loaded index in memory while its
+CSV is unchanged, so repeated loads cost one stat.
+"""
+import hashlib
+import os
+import pickle
+import threading
+
+# index path -> (size, mtime_ns, index) of the indexes loaded by this process
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def compiled_index_path(csv_path, name):
+    """Return the path of the compiled index `name` for a CSV file."""
+    return f"{csv_path}.{name}.index.pkl"
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_compiled_index(csv_path, name, build_fn):
+    """
+    Return the index built by build_fn(csv_path), reusing the persisted copy when valid.
+
+    Args:
+        csv_path (str): Source CSV file
+        name (str): Index name; change it (e.g. bump a version suffix) when build_fn changes
+        build_fn (callable): Builds the index from the CSV path
+
+    Returns:
+        The index returned by build_fn
+    """
+    index_path = compiled_index_path(csv_path, name)
+    stat = os.stat(csv_path)
+    key = os.path.abspath(index_path)
+    with _loaded_lock:
+        loaded = _loaded.get(key)
+    if loaded is not None and loaded[:2] == (stat.st_size, stat.st_mtime_ns):
+        return loaded[2]
+    index = _load_or_build(csv_path, index_path, stat, build_fn)
+    with _loaded_lock:
+        _loaded[key] = (stat.st_size, stat.st_mtime_ns, index)
+    return index
+
+
+def _load_or_build(csv_path, index_path, stat, build_fn):
+    try:
+        with open(index_path, "rb") as f:
+            stored = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        stored = None
+
+    if stored is not None:
+        if stored["size"] == stat.st_size and stored["mtime_ns"] == stat.st_mtime_ns:
+            return stored["index"]
+        if stored["size"] == stat.st_size and stored["sha256"] == _file_hash(csv_path):
+            _save(index_path, stored["index"], stat, stored["sha256"])
+            return stored["index"]
+
+    index = build_fn(csv_path)
+    _save(index_path, index, stat, _file_hash(csv_path))
+    return index
+
+
+def _save(index_path, index, stat, sha256):
+    payload = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256, "index": index}
+    tmp_path = f"{index_path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+    except OSError as e:
+        # A read-only Map/ folder only costs a rebuild on the next run
+        print(f"Warning: could not save compiled index {index_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -1,9 +1,47 @@
+"""
+LLM endpoint credentials, read from credentials.conf in the working directory.
+
+The file is only read when a credential is first used (e.g. config.TEST_LLMs_REST_API_URL),
+so offline steps such as designation mapping run without it.
+"""
 import configparser
+import os
+
+CREDENTIALS_FILE = "credentials.conf"
+
+# Attribute -> key in the [TEST] section
+_CREDENTIAL_KEYS = {
+    "TEST_LLMs_API_ACCESS_TOKEN": "access_token",
+    "TEST_LLMs_REST_API_URL": "rest_api_url",
+    "TEST_LLMs_REST_API_PROVIDERS_URL": "model_list_endpoint",
+    "TEST_LLMs_WS_URL": "ws_url",
+}
+
+_credentials = None
+
+
+def load_credentials(path=CREDENTIALS_FILE):
+    """
+    Read the [TEST] section of the credentials file (once per process).
+
+    Returns:
+        dict: Attribute name (e.g. "TEST_LLMs_REST_API_URL") -> value
+
+    Raises:
+        FileNotFoundError: The credentials file does not exist
+        configparser.Error: The file lacks the [TEST] section or one of its keys
+    """
+    global _credentials
+    if _credentials is None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found in {os.getcwd()}; it holds the LLM endpoint credentials")
+        config = configparser.ConfigParser(interpolation=None)
+        config.read(path)
+        _credentials = {name: config.get('TEST', key) for name, key in _CREDENTIAL_KEYS.items()}
+    return _credentials
 
-config = configparser.ConfigParser(interpolation=None)
-config.read('credentials.conf')
 
-TEST_LLMs_API_ACCESS_TOKEN = config.get('TEST', 'access_token')
-TEST_LLMs_REST_API_URL = config.get('TEST', 'rest_api_url')
-TEST_LLMs_REST_API_PROVIDERS_URL = config.get('TEST', 'model_list_endpoint')
-TEST_LLMs_WS_URL = config.get('TEST', 'ws_url')
+def __getattr__(name):
+    if name in _CREDENTIAL_KEYS:
+        return load_credentials()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,107 @@
+"""
+Split syllabi that are too long for one extraction prompt, and merge the per-chunk answers.
+
+Long syllabi (appended schedules, reading lists) are cut into chunks of whole pages,
+using the "--- Page N ---" markers written by input_processing.read_single_pdf_file,
+so that each chunk's prompt stays under CHUNK_TOKENS estimated tokens. A page that is
+too long on its own is cut at paragraph, then line boundaries. main.extract_syllabus
+queries the chunks in parallel and merge_partial_records folds their answers back
+into one record of the usual extraction schema.
+"""
+from header_heuristics import SECTION_FIELDS
+from prompt_builder import estimate_tokens
+from section_windowing import split_pages
+
+# Prompts above this many estimated tokens are split into chunks
+MAX_PROMPT_TOKENS = 16000
+# Estimated tokens of document text per chunk
+CHUNK_TOKENS = 8000
+# Chunk requests in flight per syllabus, within the request slots of main.extract_syllabi
+CHUNK_WORKERS = 4
+
+
+def _is_missing(value):
+    return value is None or str(value).strip() in ("", "NA")
+
+
+def _split_text(text, max_tokens):
+    """Cut text at paragraph, line or (as a last resort) character boundaries."""
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for separator in ("\n\n", "\n"):
+        pieces = text.split(separator)
+        if len(pieces) > 1:
+            parts = []
+            current = ""
+            for piece in pieces:
+                candidate = f"{current}{separator}{piece}" if current else piece
+                if current and estimate_tokens(candidate) > max_tokens:
+                    parts.append(current)
+                    current = piece
+                else:
+                    current = candidate
+            parts.append(current)
+            # Pieces that are still too long are cut further
+            return [part for piece in parts for part in _split_text(piece, max_tokens)]
+    size = max_tokens * 4
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def chunk_pages(text, max_tokens=CHUNK_TOKENS):
+    """
+    Group whole pages into chunks of at most max_tokens estimated tokens.
+
+    Text before the first page marker stays with the first page. Without page markers,
+    the text is cut at paragraph and line boundaries.
+
+    Returns:
+        list: Chunk texts, in document order
+    """
+    pages = split_pages(text)
+    if not pages:
+        return _split_text(text, max_tokens)
+    page_texts = [text[:pages[0][2]]] + [text[start:end] for _, start, end in pages[1:]]
+
+    chunks = []
+    current = ""
+    for page_text in page_texts:
+        for piece in _split_text(page_text, max_tokens):
+            if current and estimate_tokens(current + piece) > max_tokens:
+                chunks.append(current)
+                current = ""
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def merge_partial_records(file_name, partials, fields):
+    """
+    Merge the answers for the chunks of one syllabus, preferring non-"NA" values.
+
+    Header fields (title, code, instructor) take the first non-"NA" value in document
+    order. A section may run across chunks, so the distinct non-"NA" values of a
+    section field are joined in document order, leaving out any value already contained
+    in another.
+
+    Args:
+        file_name (str): Syllabus file name
+        partials (list): Parsed chunk answers, in document order
+        fields (iterable): Extraction fields to merge
+
+    Returns:
+        dict: Record with file_name and every field ("NA" where no chunk found it)
+    """
+    record = {"file_name": file_name}
+    for field in fields:
+        values = [str(partial.get(field)).strip() for partial in partials if not _is_missing(partial.get(field))]
+        if not values:
+            record[field] = "NA"
+        elif field not in SECTION_FIELDS:
+            record[field] = values[0]
+        else:
+            distinct = list(dict.fromkeys(values))
+            kept = [value for value in distinct
+                    if not any(value != other and value in other for other in distinct)]
+            record[field] = " ".join(kept)
+    return record
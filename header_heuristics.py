@@ -0,0 +1,203 @@
+"""
+Local, rule-based extraction of the syllabus fields that follow a predictable layout.
+
+The course code, title and instructor are normally on the first page ("CIS 105 -
+Computer Applications", "Instructor: Dr. Jane Smith"), and the Gold Statement and
+Learning Outcomes sections usually sit under a heading of their own. This module
+pulls those fields out with regular expressions and gives each a confidence score
+in [0, 1]; main.extract_syllabus only asks the LLM for the fields that are not
+settled with at least HEURISTIC_MIN_CONFIDENCE.
+
+Fields are returned with the keys of the extraction prompt (see
+prompt_builder.AUDIT_FIELDS) and "NA" for a field that is missing.
+"""
+import re
+
+from section_windowing import split_pages
+
+HEURISTIC_MIN_CONFIDENCE = 0.8
+HEADER_FIELDS = ("full_title", "course_code", "course_name", "instructor_name")
+SECTION_FIELDS = ("extracted_gold_statement", "learning_outcome")
+
+# Only the first lines of the first page are searched for the course title
+TITLE_SEARCH_LINES = 12
+MAX_HEADING_LENGTH = 60
+# A section longer than this is probably not terminated by a heading we know
+MAX_SECTION_CHARS = 6000
+
+COURSE_CODE_RE = re.compile(r"\b([A-Z]{2,4})[ \-]?(\d{3}[A-Z]?)\b")
+INSTRUCTOR_RE = re.compile(
+    r"^[ \t]*(?:lead\s+|primary\s+)?(?:instructor|professor|faculty)(?:\s*\(s\))?(?:\s+name)?[ \t]*[:\-–][ \t]*(.+)$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_NAME_RE = re.compile(r"^(?:(?:Dr|Prof|Professor|Mr|Ms|Mrs)\.?\s+)?[A-Z][A-Za-z'\-]*\.?(?:\s+[A-Z][A-Za-z'\-]*\.?){1,3}$")
+_NAME_STOP_RE = re.compile(r"\s*(?:[,|;(]|\s{2,}|\S+@\S+|\b(?:office|email|e-mail|phone)\b).*$", re.IGNORECASE)
+_PAGE_MARKER_LINE_RE = re.compile(r"^--- Page \d+ ---$")
+
+SECTION_HEADINGS = {
+    "extracted_gold_statement": ("gold statement", "general studies gold statement", "general studies gold"),
+    "learning_outcome": ("learning outcomes", "course learning outcomes", "student learning outcomes",
+                         "learning objectives"),
+}
+# Words whose presence means a section may exist under a heading the rules missed
+SECTION_MENTIONS = {
+    "extracted_gold_statement": ("gold",),
+    "learning_outcome": ("outcome", "objective"),
+}
+# Headings that end a section
+KNOWN_HEADINGS = {
+    "academic integrity", "assessment", "assignments", "attendance", "course description", "course materials",
+    "course objectives", "course overview", "course policies", "course schedule", "evaluation", "grading",
+    "grading policy", "instructor", "office hours", "policies", "prerequisites", "required materials",
+    "required texts", "schedule", "textbook", "textbooks",
+}
+for _headings in SECTION_HEADINGS.values():
+    KNOWN_HEADINGS.update(_headings)
+
+
+def _normalize_code(subject, number):
+    return f"{subject} {number}"
+
+
+def _heading_key(line):
+    return re.sub(r"[\s:]+$", "", line.strip().lower())
+
+
+def extract_course_title(first_page, file_name=""):
+    """
+    Find the course code, name and full title on the first page.
+
+    Returns:
+        tuple: (fields dict, confidence dict) for full_title, course_code and course_name
+    """
+    lines = [line.strip() for line in first_page.splitlines() if line.strip()][:TITLE_SEARCH_LINES]
+    codes = []
+    for number, line in enumerate(lines):
+        for match in COURSE_CODE_RE.finditer(line):
+            codes.append((number, line, match))
+    if not codes:
+        return dict.fromkeys(("full_title", "course_code", "course_name"), "NA"), \
+            dict.fromkeys(("full_title", "course_code", "course_name"), 0.0)
+
+    line_number, line, match = codes[0]
+    course_code = _normalize_code(match.group(1), match.group(2))
+    code_confidence = 0.6
+    if line_number < 3:
+        code_confidence += 0.2
+    if COURSE_CODE_RE.search(file_name or "") and \
+            _normalize_code(*COURSE_CODE_RE.search(file_name).groups()) == course_code:
+        code_confidence += 0.2
+    if len({_normalize_code(m.group(1), m.group(2)) for _, _, m in codes}) > 1:
+        # Cross-listed or prerequisite codes make the choice ambiguous
+        code_confidence -= 0.3
+
+    course_name = line[match.end():].strip(" -–—:|\t")
+    full_title = line
+    name_confidence = code_confidence
+    if not course_name:
+        # Title on the line after the code
+        following = lines[line_number + 1] if line_number + 1 < len(lines) else ""
+        if following and ":" not in following and len(following) <= 80:
+            course_name = following
+            full_title = f"{line} {following}"
+            name_confidence -= 0.2
+        else:
+            course_name = "NA"
+            name_confidence = 0.3
+
+    fields = {"full_title": full_title, "course_code": course_code, "course_name": course_name}
+    confidence = {"full_title": name_confidence, "course_code": code_confidence, "course_name": name_confidence}
+    return fields, {field: round(max(0.0, min(1.0, value)), 2) for field, value in confidence.items()}
+
+
+def extract_instructor(first_page):
+    """
+    Find the instructor named after an "Instructor:" style label on the first page.
+
+    Returns:
+        tuple: (name or "NA", confidence)
+    """
+    names = []
+    for match in INSTRUCTOR_RE.finditer(first_page):
+        name = _NAME_STOP_RE.sub("", match.group(1).strip())
+        if _NAME_RE.match(name):
+            names.append(name)
+    if not names:
+        return "NA", 0.0
+    distinct = list(dict.fromkeys(names))
+    return distinct[0], 0.9 if len(distinct) == 1 else 0.5
+
+
+def extract_section(text, field):
+    """
+    Extract the section under one of the headings of SECTION_HEADINGS[field].
+
+    The section runs until the next known heading (page markers are skipped). A
+    heading may carry text after a colon on the same line ("Gold Statement: ...").
+
+    Returns:
+        tuple: (section text or "NA", confidence)
+    """
+    headings = SECTION_HEADINGS[field]
+    lines = text.splitlines()
+    starts = []
+    for number, line in enumerate(lines):
+        stripped = line.strip()
+        if len(stripped) > MAX_HEADING_LENGTH and ":" not in stripped:
+            continue
+        label, _, rest = stripped.partition(":")
+        if _heading_key(label) in headings and (rest.strip() or len(stripped) <= MAX_HEADING_LENGTH):
+            starts.append((number, rest.strip()))
+
+    if not starts:
+        # Clearly absent only when the section is not mentioned anywhere
+        lowered = text.lower()
+        mentioned = any(word in lowered for word in SECTION_MENTIONS[field])
+        return "NA", 0.0 if mentioned else 0.9
+
+    start, inline_text = starts[0]
+    body = [inline_text] if inline_text else []
+    terminated = False
+    for line in lines[start + 1:]:
+        stripped = line.strip()
+        if not stripped or _PAGE_MARKER_LINE_RE.match(stripped):
+            continue
+        if len(stripped) <= MAX_HEADING_LENGTH and _heading_key(stripped) in KNOWN_HEADINGS:
+            terminated = True
+            break
+        body.append(stripped)
+    section = " ".join(body)
+
+    if not section:
+        return "NA", 0.5
+    confidence = 0.9 if terminated else 0.6
+    if len(section) > MAX_SECTION_CHARS:
+        confidence = 0.3
+    if len(starts) > 1:
+        confidence -= 0.2
+    return section, round(confidence, 2)
+
+
+def extract_header_fields(file_name, text):
+    """
+    Extract every field the rules can find, with a confidence per field.
+
+    Args:
+        file_name (str): PDF file name (a course code in it confirms the one found in the text)
+        text (str): Extracted syllabus text with "--- Page N ---" markers
+
+    Returns:
+        tuple: (fields, confidence) dicts keyed by the extraction prompt's field names
+    """
+    pages = split_pages(text)
+    first_page = text[pages[0][1]:pages[0][2]] if pages else text
+    fields, confidence = extract_course_title(first_page, file_name)
+    fields["instructor_name"], confidence["instructor_name"] = extract_instructor(first_page)
+    for field in SECTION_FIELDS:
+        fields[field], confidence[field] = extract_section(text, field)
+    return fields, confidence
+
+
+def settled_fields(fields, confidence, min_confidence=HEURISTIC_MIN_CONFIDENCE):
+    """Return the fields whose confidence reaches min_confidence."""
+    return {field: value for field, value in fields.items() if confidence[field] >= min_confidence}
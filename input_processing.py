@@ -1,8 +1,33 @@
 from pypdf import PdfReader
+import pypdf
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import hashlib
 import os
+import time
+import metrics
+from text_cache import load_cached_text, store_cached_text, enforce_size_limit
 
+# Bump the suffix whenever the text layout produced below changes, so cached text is re-extracted
+EXTRACTOR_VERSION = f"pypdf-{pypdf.__version__}/1"
+
+
+def compute_file_hash(file_path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_single_pdf_file(filePath, use_cache=True):
+    # Reuse the text extracted on an earlier run if the file has not changed
+    if use_cache:
+        file_hash = compute_file_hash(filePath)
+        cached_text = load_cached_text(file_hash, EXTRACTOR_VERSION)
+        if cached_text is not None:
+            return cached_text
 
-def read_single_pdf_file(filePath):
     # Create a PdfReader object by providing the path to your PDF file
     reader = PdfReader(filePath)
 
@@ -16,27 +41,109 @@ def read_single_pdf_file(filePath):
     # print(f"Text from the first page:\n{text}")
 
     # Extract text from all pages
-    all_text = ""
+    page_texts = []
     for i, page in enumerate(reader.pages):
         page_text = page.extract_text()
         if page_text:
-            all_text += f"\n\n--- Page {i + 1} ---\n{page_text}"
+            page_texts.append(f"\n\n--- Page {i + 1} ---\n{page_text}")
+
+    all_text = "".join(page_texts)
+    if use_cache:
+        store_cached_text(file_hash, EXTRACTOR_VERSION, all_text)
 
     return all_text
 
 
-def read_pdfs_from_folder(folder_path):
+def list_pdf_files(folder_path):
+    """Return the names of the PDF files in a folder, in directory listing order."""
+    return [filename for filename in os.listdir(folder_path) if filename.lower().endswith(".pdf")]
+
+
+def read_pdfs_from_folder(folder_path, filenames=None):
     """
     Reads all PDF files in a folder and stores their extracted text in a dictionary.
     Key = PDF filename, Value = extracted text.
+    Files whose text is already in the text cache are not parsed again.
+    If filenames is given, only those files are read.
     """
     pdf_texts = {}
 
-    for filename in os.listdir(folder_path):
+    for filename in os.listdir(folder_path) if filenames is None else filenames:
         print(filename)
         if filename.lower().endswith(".pdf"):
             file_path = os.path.join(folder_path, filename)
             print(f"Reading: {filename}")
-            pdf_texts[filename] = read_single_pdf_file(file_path)
+            with metrics.span("pdf.read", file=filename):
+                pdf_texts[filename] = read_single_pdf_file(file_path)
 
+    enforce_size_limit()
     return pdf_texts
+
+
+def _read_pdf_timed(file_path):
+    """Process pool task: read a PDF and return (text, start time, seconds, worker pid)."""
+    start = time.time()
+    start_counter = time.perf_counter()
+    text = read_single_pdf_file(file_path)
+    return text, start, time.perf_counter() - start_counter, os.getpid()
+
+
+def iter_pdfs_from_folder(folder_path, max_workers=None, filenames=None, errors=None):
+    """
+    Extract the PDF files in a folder on a process pool and yield them as they finish.
+
+    Only about two files per worker are parsed ahead of the consumer, so peak memory
+    depends on the number of workers rather than on the size of the folder.
+    A PDF that cannot be parsed is reported, added to errors and skipped. The workers
+    store the text they extract in the text cache; its size limit is enforced here
+    once they are done.
+
+    Args:
+        folder_path (str): Path to folder containing PDF files
+        max_workers (int): Number of extraction processes (None for one per CPU)
+        filenames (list): Only read these files (None for every PDF in the folder)
+        errors (list): If given, (filename, error message) of each PDF that could not be
+                       parsed is appended to it, e.g. to report it with the extraction failures
+
+    Yields:
+        tuple: (filename, extracted text) in completion order
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    filenames = iter(list_pdf_files(folder_path) if filenames is None else filenames)
+
+    try:
+        yield from _iter_pdfs_on_pool(folder_path, max_workers, filenames, errors)
+    finally:
+        enforce_size_limit()
+
+
+def _iter_pdfs_on_pool(folder_path, max_workers, filenames, errors):
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+
+        def submit_next():
+            filename = next(filenames, None)
+            if filename is not None:
+                file_path = os.path.join(folder_path, filename)
+                pending[executor.submit(_read_pdf_timed, file_path)] = filename
+
+        for _ in range(max_workers * 2):
+            submit_next()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                filename = pending.pop(future)
+                submit_next()
+                try:
+                    text, start, seconds, pid = future.result()
+                except Exception as e:
+                    print(f"Error reading {filename}: {e}")
+                    metrics.incr("pdf.read_errors")
+                    if errors is not None:
+                        errors.append((filename, f"PDF could not be read: {e}"))
+                    continue
+                # The worker's timing is recorded here; its own metrics stay in its process
+                metrics.record_span("pdf.read", start, seconds, {"file": filename}, pid=pid, tid=0)
+                print(f"Read: {filename}")
+                yield filename, text
@@ -0,0 +1,163 @@
+"""
+Persistent SQLite cache for LLM responses.
+
+Responses are keyed by model name, provider and a hash of the prompt, so an audit
+that is re-run after a change elsewhere in the pipeline only pays for new prompts.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+LLM_CACHE_PATH = os.path.join(".cache", "llm_responses.sqlite")
+
+# Cache modes
+MODE_READWRITE = "readwrite"  # serve hits, store new responses
+MODE_REPLAY = "replay"        # serve hits only; a miss is an error (deterministic re-runs)
+MODE_OFF = "off"              # always query the LLM
+CACHE_MODES = (MODE_READWRITE, MODE_REPLAY, MODE_OFF)
+
+
+class ReplayCacheMiss(LookupError):
+    """Raised in replay mode when a prompt has no cached response."""
+
+
+def prompt_hash(prompt):
+    """Return the SHA-256 hex digest of a prompt."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL and LRU eviction.
+
+    Safe to share between the threads of a concurrent run.
+
+    Args:
+        path (str): SQLite database file
+        mode (str): One of CACHE_MODES
+        ttl_seconds (float): Entries older than this are treated as misses (None to keep forever)
+        max_entries (int): Least recently used entries beyond this count are evicted (None for no limit)
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, mode=MODE_READWRITE, ttl_seconds=None, max_entries=None):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}; expected one of {CACHE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if mode != MODE_OFF:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model_name TEXT,
+                    provider TEXT,
+                    prompt_hash TEXT,
+                    response TEXT,
+                    created_at REAL,
+                    last_access REAL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model, prompt):
+        """Build the cache key for a model configuration and prompt."""
+        return f"{model.provider}:{model.name}:{prompt_hash(prompt)}"
+
+    def get(self, model, prompt):
+        """
+        Return the cached response dict for a prompt, or None on a miss.
+
+        Raises:
+            ReplayCacheMiss: In replay mode, when the prompt has no cached response
+        """
+        if self.mode == MODE_OFF:
+            return None
+
+        key = self.make_key(model, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            expired = (row is not None and self.ttl_seconds is not None
+                       and now - row[1] > self.ttl_seconds)
+            if row is None or expired:
+                self.misses += 1
+            else:
+                self.hits += 1
+                if self.mode == MODE_READWRITE:
+                    self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                    self._conn.commit()
+                return json.loads(row[0])
+
+        if self.mode == MODE_REPLAY:
+            raise ReplayCacheMiss(f"No cached {model.name} response for prompt {prompt_hash(prompt)[:12]}")
+        return None
+
+    def put(self, model, prompt, response):
+        """Store a response dict for a prompt (ignored outside read-write mode)."""
+        if self.mode != MODE_READWRITE:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.make_key(model, prompt), model.name, model.provider, prompt_hash(prompt),
+                 json.dumps(response), now, now)
+            )
+            self.stores += 1
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, model, prompt):
+        """Remove the cached response for a prompt, e.g. one its caller could not use (read-write mode only)."""
+        if self.mode != MODE_READWRITE:
+            return
+
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (self.make_key(model, prompt),))
+            self._conn.commit()
+
+    def _evict(self):
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def stats(self):
+        """Return hit/miss/store counters for this process."""
+        lookups = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
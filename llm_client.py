@@ -0,0 +1,210 @@
+"""
+Shared entry point for the LLM requests made by syllabus extraction and gold matching.
+"""
+import threading
+import time
+
+import requests
+
+import metrics
+from prompt_builder import estimate_tokens
+from llm_cache import LLMResponseCache, LLM_CACHE_PATH, MODE_READWRITE
+from llm_scheduler import LLMRequestScheduler, TransientLLMError, parse_retry_after
+
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 100000
+LLM_REQUEST_TIMEOUT = 180
+# Connections kept open to the REST endpoint, at least one per concurrent request
+HTTP_POOL_SIZE = 32
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Return the HTTP session shared by REST requests, so connections are kept alive between them."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            _http_session.mount("https://", adapter)
+            _http_session.mount("http://", adapter)
+        return _http_session
+
+
+def send_llm_request(model, query, num_retry=1, success_sleep=0.0, fail_sleep=0.0, timeout=LLM_REQUEST_TIMEOUT):
+    """
+    Send one request to the LLM REST endpoint, with the payload and headers of
+    ASUllmAPI.query_llm but without its retry loop (retries are left to the scheduler).
+
+    Returns:
+        dict: The endpoint's JSON response, as returned by query_llm
+
+    Raises:
+        TransientLLMError: The endpoint throttled the request, failed with a 5xx status,
+                           could not be reached or returned malformed JSON
+    """
+    try:
+        response = get_http_session().post(model.api_url, json=model.compute_payload(query=query),
+                                           headers=model.compute_headers(), timeout=timeout)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        raise TransientLLMError(str(e)) from e
+    if response.status_code == 429 or response.status_code >= 500:
+        raise TransientLLMError(f"HTTP {response.status_code}", status=response.status_code,
+                                retry_after=parse_retry_after(response.headers.get("Retry-After")))
+    response.raise_for_status()
+    try:
+        body = response.json()
+    except ValueError as e:
+        raise TransientLLMError(f"malformed response: {e}") from e
+    response_dict = {"response": ""}
+    response_dict.update(body)
+    return response_dict
+
+
+_query_backend = send_llm_request
+
+
+def configure_llm_cache(mode=MODE_READWRITE, path=LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                        max_entries=LLM_CACHE_MAX_ENTRIES):
+    """
+    Replace the response cache used by run_llm_query.
+
+    Args:
+        mode (str): "readwrite", "replay" (cached responses only) or "off"
+        path (str): SQLite database file
+        ttl_seconds (float): Maximum age of a cached response
+        max_entries (int): Maximum number of cached responses
+
+    Returns:
+        LLMResponseCache: The new cache
+    """
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is not None:
+            _response_cache.close()
+        _response_cache = LLMResponseCache(path=path, mode=mode, ttl_seconds=ttl_seconds,
+                                           max_entries=max_entries)
+        return _response_cache
+
+
+def get_llm_cache():
+    """Return the response cache, opening the default one on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache(ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                                                   max_entries=LLM_CACHE_MAX_ENTRIES)
+    return _response_cache
+
+
+def configure_llm_scheduler(**options):
+    """
+    Replace the scheduler shared by all LLM requests.
+
+    Args:
+        **options: LLMRequestScheduler arguments, e.g. rate_per_second or max_attempts
+
+    Returns:
+        LLMRequestScheduler: The new scheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = LLMRequestScheduler(**options)
+        return _scheduler
+
+
+def get_llm_scheduler():
+    """Return the shared request scheduler, creating the default one on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMRequestScheduler()
+    return _scheduler
+
+
+def set_llm_backend(query_fn=None):
+    """
+    Send requests through query_fn instead of send_llm_request, e.g. a stub LLM in
+    benchmarks. query_fn takes the same arguments as ASUllmAPI.query_llm and makes a
+    single attempt; None restores the default.
+    """
+    global _query_backend
+    _query_backend = query_fn or send_llm_request
+
+
+def use_async_transport(max_concurrency=16):
+    """
+    Send requests through the pooled asyncio client (async_llm_client) instead of one
+    blocking HTTP connection per call. Requires aiohttp.
+
+    Returns:
+        AsyncLLMBackend: The installed backend; call close() on it when the run is done
+    """
+    from async_llm_client import AsyncLLMBackend
+
+    backend = AsyncLLMBackend(max_concurrency=max_concurrency)
+    set_llm_backend(backend)
+    return backend
+
+
+def use_stream_transport(ws_url, close_early=True):
+    """
+    Stream requests over the WebSocket endpoint (see llm_stream), closing each stream
+    as soon as the answer's JSON is complete.
+
+    Returns:
+        WebSocketBackend: The installed backend
+    """
+    from llm_stream import WebSocketBackend
+
+    backend = WebSocketBackend(ws_url, close_early=close_early)
+    set_llm_backend(backend)
+    return backend
+
+
+def run_llm_query(model, query, accept=None):
+    """
+    Query the LLM, serving repeated prompts from the response cache.
+
+    Requests go through the shared scheduler (see llm_scheduler), which rate-limits
+    them and retries transient failures.
+
+    Args:
+        model: LLM model configuration
+        query (str): Prompt
+        accept (callable): accept(response) -> bool, called on a fresh response; it is
+                           only cached when accepted, so an answer the caller cannot
+                           use is asked again on the next run (None caches every response)
+
+    Returns:
+        dict: The response payload, as returned by ASUllmAPI.query_llm
+
+    Raises:
+        LLMUnavailableError: The endpoint kept failing; the request was not answered
+    """
+    cache = get_llm_cache()
+    cached = cache.get(model, query)
+    if cached is not None:
+        metrics.incr("llm.cache_hits")
+        return cached
+
+    prompt_tokens = estimate_tokens(query)
+    metrics.incr("llm.prompt_tokens", prompt_tokens)
+    metrics.observe("llm.prompt_size_tokens", prompt_tokens, metrics.SIZE_BUCKETS)
+    start = time.perf_counter()
+    with metrics.span("llm.request", model=model.name, prompt_tokens=prompt_tokens):
+        response = get_llm_scheduler().submit(_query_backend, model, query)
+    # Includes rate limiting and retries, i.e. the latency the pipeline actually sees
+    metrics.observe("llm.latency_seconds", time.perf_counter() - start)
+    metrics.incr("llm.response_tokens", estimate_tokens(response.get('response', '')))
+    if accept is None or accept(response):
+        cache.put(model, query, response)
+    return response
@@ -0,0 +1,317 @@
+"""
+Shared scheduling of LLM requests: rate limiting, retries and a circuit breaker.
+
+Every request made through llm_client.run_llm_query goes through one
+LLMRequestScheduler, so all worker threads share:
+- a token bucket limiting the request rate, which halves its rate when the endpoint
+  throttles (HTTP 429) and recovers gradually after successful requests,
+- exponential backoff with full jitter between attempts, replaced by the server's
+  Retry-After delay when one is given (which then holds back every worker),
+- a circuit breaker that pauses all workers after repeated failures and lets a
+  single probe request through once the pause is over.
+
+Backends signal a retryable failure by raising TransientLLMError. When a request
+still fails after max_attempts, LLMUnavailableError is raised so callers can report
+it separately from a real answer.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import metrics
+
+DEFAULT_RATE_PER_SECOND = 10.0
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 30.0
+# After this many failed probes in a row the endpoint is considered down for the run
+CIRCUIT_MAX_CONSECUTIVE_TRIPS = 4
+# Lowest rate the bucket throttles down to, as a share of the configured rate
+MIN_RATE_FRACTION = 0.05
+# Rate regained per successful request, as a share of the configured rate
+RATE_RECOVERY_FRACTION = 0.05
+
+
+class TransientLLMError(RuntimeError):
+    """A request failed in a way that may succeed on retry (throttling, 5xx, network)."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class LLMUnavailableError(RuntimeError):
+    """Every attempt of a request failed with a transient error."""
+
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header value.
+
+    Returns:
+        float: Seconds to wait, or None if the header is missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with an adaptive rate.
+
+    Args:
+        rate (float): Tokens added per second (0 or None disables the limit)
+        burst (float): Bucket capacity, i.e. requests allowed back to back
+    """
+
+    def __init__(self, rate=DEFAULT_RATE_PER_SECOND, burst=None):
+        self.max_rate = rate or 0.0
+        self.rate = self.max_rate
+        self.burst = burst or max(1.0, self.max_rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif not self.max_rate:
+                    return
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Hold back every caller for the given number of seconds (e.g. Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def throttle(self):
+        """Halve the rate after the endpoint throttled a request."""
+        with self._lock:
+            if self.max_rate:
+                self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+
+    def recover(self):
+        """Step the rate back towards the configured rate after a success."""
+        with self._lock:
+            if self.max_rate and self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_FRACTION)
+
+
+class CircuitBreaker:
+    """
+    Pause all callers while the endpoint is failing.
+
+    After failure_threshold consecutive failures the circuit opens and before_request()
+    blocks every caller for reset_timeout seconds. Then a single probe request is let
+    through: its success closes the circuit, its failure opens it again. Once the
+    circuit has opened max_consecutive_trips times without a success in between, the
+    endpoint is considered down and before_request() fails fast instead of waiting.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_SECONDS,
+                 max_consecutive_trips=CIRCUIT_MAX_CONSECUTIVE_TRIPS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_consecutive_trips = max_consecutive_trips
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.consecutive_trips = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._condition = threading.Condition()
+
+    def before_request(self):
+        """
+        Block while the circuit is open or another caller's probe is in flight.
+
+        Returns:
+            bool: False if the endpoint is considered down and the request should not be sent
+        """
+        with self._condition:
+            while True:
+                if self.state == self.CLOSED:
+                    return True
+                if self.consecutive_trips >= self.max_consecutive_trips:
+                    return False
+                if self.state == self.OPEN:
+                    remaining = self._opened_at + self.reset_timeout - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+                    self.state = self.HALF_OPEN
+                if not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return True
+                self._condition.wait()
+
+    def record_success(self):
+        with self._condition:
+            if self.state != self.CLOSED:
+                print("  LLM endpoint recovered; circuit closed")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.consecutive_trips = 0
+            self._probe_in_flight = False
+            self._condition.notify_all()
+
+    def record_failure(self):
+        with self._condition:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED
+                                                and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.trips += 1
+                self.consecutive_trips += 1
+                metrics.incr("llm.circuit_trips")
+                self._opened_at = time.monotonic()
+                if self.consecutive_trips >= self.max_consecutive_trips:
+                    print(f"  LLM endpoint still failing after {self.consecutive_trips} pauses; "
+                          f"giving up on the remaining requests")
+                else:
+                    print(f"  LLM endpoint failing ({self.failures} consecutive failures); "
+                          f"pausing requests for {self.reset_timeout:.0f}s")
+            self._condition.notify_all()
+
+    def record_other(self):
+        """
+        End a request that failed without saying anything about the endpoint's health
+        (e.g. HTTP 400/401): the failure count is left alone, and a probe slot is freed.
+        """
+        with self._condition:
+            self._probe_in_flight = False
+            self._condition.notify_all()
+
+
+class LLMRequestScheduler:
+    """
+    Send LLM requests under a shared rate limit, retry policy and circuit breaker.
+
+    Args:
+        rate_per_second (float): Sustained request rate (0 disables the limit)
+        burst (float): Requests allowed back to back (defaults to one second's worth)
+        max_attempts (int): Attempts per request before LLMUnavailableError is raised
+        backoff_base (float): Backoff ceiling after the first failure, doubled per attempt
+        backoff_max (float): Largest backoff ceiling
+        failure_threshold (int): Consecutive failures that open the circuit
+        reset_timeout (float): Seconds the circuit stays open before a probe request
+        max_consecutive_trips (int): Failed probes in a row after which requests fail fast
+    """
+
+    def __init__(self, rate_per_second=DEFAULT_RATE_PER_SECOND, burst=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff_base=BACKOFF_BASE_SECONDS, backoff_max=BACKOFF_MAX_SECONDS,
+                 failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_timeout=CIRCUIT_RESET_SECONDS,
+                 max_consecutive_trips=CIRCUIT_MAX_CONSECUTIVE_TRIPS):
+        self.bucket = TokenBucket(rate=rate_per_second, burst=burst)
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout,
+                                      max_consecutive_trips=max_consecutive_trips)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._counts = {"requests": 0, "retries": 0, "throttled": 0, "transient_failures": 0, "gave_up": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+        metrics.incr(f"llm.{name}")
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """Seconds to wait after the given (0-based) failed attempt."""
+        if retry_after is not None:
+            # Small jitter so workers told the same Retry-After do not return in lockstep
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def submit(self, send, model, query):
+        """
+        Send one request, retrying transient failures.
+
+        Args:
+            send (callable): Backend called as send(model=..., query=..., num_retry=1,
+                             success_sleep=0.0, fail_sleep=0.0); it should raise
+                             TransientLLMError for retryable failures. An empty
+                             "response" is treated as a transient failure too.
+
+        Returns:
+            dict: The backend's response
+
+        Raises:
+            LLMUnavailableError: Every attempt failed with a transient error
+        """
+        self._count("requests")
+        error = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                self._count("retries")
+            if not self.breaker.before_request():
+                break
+            self.bucket.acquire()
+            try:
+                response = send(model=model, query=query, num_retry=1, success_sleep=0.0, fail_sleep=0.0)
+                if not response.get("response"):
+                    raise TransientLLMError("empty response")
+            except TransientLLMError as e:
+                error = e
+                self._count("transient_failures")
+                self.breaker.record_failure()
+                if e.status == 429:
+                    self._count("throttled")
+                    self.bucket.throttle()
+                if e.retry_after is not None:
+                    self.bucket.pause(e.retry_after)
+                if attempt + 1 < self.max_attempts:
+                    delay = self.backoff_delay(attempt, e.retry_after)
+                    print(f"  LLM request failed ({e}); retry {attempt + 1}/{self.max_attempts - 1} "
+                          f"in {delay:.1f}s")
+                    time.sleep(delay)
+                continue
+            except Exception:
+                # Not retried, and not counted against the endpoint (a bad request, credentials, ...)
+                self.breaker.record_other()
+                raise
+            self.breaker.record_success()
+            self.bucket.recover()
+            return response
+
+        self._count("gave_up")
+        if error is None:
+            raise LLMUnavailableError("LLM endpoint is down (circuit open)")
+        raise LLMUnavailableError(f"LLM request failed after {attempt + 1} attempts: {error}")
+
+    def stats(self):
+        """Return request counters and the current rate limit."""
+        with self._lock:
+            stats = dict(self._counts)
+        stats["circuit_trips"] = self.breaker.trips
+        stats["rate_per_second"] = round(self.bucket.rate, 2)
+        return stats
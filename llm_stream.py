@@ -0,0 +1,194 @@
+"""
+Streaming LLM requests over the WebSocket endpoint (config.TEST_LLMs_WS_URL).
+
+The endpoint takes the same payload as the REST endpoint (ModelConfig.compute_payload)
+and streams the answer back as {"response": "<chunk>"} messages, the last one
+carrying "<EOS>" and/or "metadata" (see ASUllmAPI.web_socket). Instead of waiting for
+the whole answer, IncrementalJSONParser follows the chunks and the stream is closed as
+soon as the top-level JSON value is complete, so trailing chatter ("Let me know if
+...") is neither waited for nor returned.
+
+WebSocketBackend is a query_llm-compatible, single-attempt callable; install it with
+llm_client.use_stream_transport so retries and rate limiting stay with llm_scheduler.
+Time to first token is recorded in the "llm.first_token_seconds" histogram.
+"""
+import json
+import time
+
+from websockets.exceptions import WebSocketException
+from websockets.sync.client import connect
+
+import metrics
+from llm_scheduler import TransientLLMError
+
+END_OF_STREAM = "<EOS>"
+STREAM_TIMEOUT = 180
+CONNECT_TIMEOUT = 10
+# Seconds to wait for the endpoint to acknowledge an early close
+CLOSE_TIMEOUT = 1
+
+
+class IncrementalJSONParser:
+    """
+    Find the first complete top-level JSON object or array in a stream of text chunks.
+
+    Text before the opening brace or bracket (e.g. a code fence) is skipped. Brackets
+    inside strings, including escaped quotes, are not counted.
+
+    Usage:
+        parser = IncrementalJSONParser()
+        for chunk in chunks:
+            if parser.feed(chunk):
+                break
+        parser.value  # JSON text of the complete object
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._start = None
+        self._end = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._length = 0
+
+    @property
+    def complete(self):
+        return self._end is not None
+
+    @property
+    def text(self):
+        """Everything fed so far."""
+        return "".join(self._buffer)
+
+    @property
+    def value(self):
+        """The JSON text of the complete top-level value, or None."""
+        return self.text[self._start:self._end] if self.complete else None
+
+    def feed(self, chunk):
+        """
+        Add a chunk of streamed text.
+
+        Returns:
+            bool: True once the top-level JSON value is complete
+        """
+        if self.complete:
+            return True
+        offset = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+        for position, char in enumerate(chunk, offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._start is None:
+                if char in "{[":
+                    self._start = position
+                    self._depth = 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._end = position + 1
+                    return True
+        return False
+
+
+def _chunk_text(message):
+    """
+    Return (text, finished) for one streamed message.
+
+    Raises:
+        TransientLLMError: The endpoint sent an error payload instead of a chunk
+    """
+    try:
+        payload = json.loads(message)
+    except ValueError:
+        payload = message
+    if isinstance(payload, dict):
+        if "response" not in payload:
+            # e.g. {"message": "Internal server error"} or an expired connection id
+            raise TransientLLMError(f"stream error: {payload}")
+        text = str(payload["response"])
+        return text.replace(END_OF_STREAM, ""), END_OF_STREAM in text or "metadata" in payload
+    text = message if isinstance(message, str) else message.decode("utf-8", "replace")
+    return text.replace(END_OF_STREAM, ""), END_OF_STREAM in text
+
+
+def stream_llm_request(ws_url, model, query, timeout=STREAM_TIMEOUT, close_early=True):
+    """
+    Send one query over the WebSocket endpoint and read the streamed answer.
+
+    Args:
+        ws_url (str): WebSocket endpoint
+        model: ModelConfig
+        query (str): Prompt
+        timeout (float): Seconds allowed for the whole answer
+        close_early (bool): Close the stream as soon as the top-level JSON value is
+                            complete; otherwise read until the end of the stream
+
+    Returns:
+        dict: {"response": the JSON text (or the whole answer when it holds no complete
+              JSON value), "first_token_seconds": ..., "closed_early": bool}
+
+    Raises:
+        TransientLLMError: The endpoint could not be reached, sent an error, timed out
+                           or closed the stream before the answer was complete
+    """
+    parser = IncrementalJSONParser()
+    start = time.perf_counter()
+    first_token_seconds = None
+    finished = False
+    try:
+        with connect(ws_url, open_timeout=CONNECT_TIMEOUT, close_timeout=CLOSE_TIMEOUT) as ws:
+            ws.send(json.dumps(model.compute_payload(query=query)))
+            while not finished:
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    raise TimeoutError(f"no complete answer within {timeout}s")
+                text, finished = _chunk_text(ws.recv(timeout=remaining))
+                if text and first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - start
+                    metrics.observe("llm.first_token_seconds", first_token_seconds)
+                if parser.feed(text) and close_early:
+                    break
+    except (OSError, TimeoutError, WebSocketException) as e:
+        # A stream closed after the JSON value was complete still has its answer
+        if not parser.complete:
+            raise TransientLLMError(f"stream failed: {e}") from e
+    closed_early = not finished
+    if closed_early:
+        metrics.incr("llm.streams_closed_early")
+    return {"response": parser.value if parser.complete else parser.text,
+            "first_token_seconds": first_token_seconds, "closed_early": closed_early}
+
+
+class WebSocketBackend:
+    """
+    query_llm-compatible callable streaming every request over the WebSocket endpoint.
+
+    Args:
+        ws_url (str): WebSocket endpoint (config.TEST_LLMs_WS_URL)
+        timeout (float): Seconds allowed per answer
+        close_early (bool): See stream_llm_request
+    """
+
+    def __init__(self, ws_url, timeout=STREAM_TIMEOUT, close_early=True):
+        self.ws_url = ws_url
+        self.timeout = timeout
+        self.close_early = close_early
+
+    def __call__(self, model, query, num_retry=1, success_sleep=0.0, fail_sleep=0.0, timeout=None):
+        return stream_llm_request(self.ws_url, model, query, timeout=timeout or self.timeout,
+                                  close_early=self.close_early)
+
+    def close(self):
+        """Connections are per request; nothing to release."""
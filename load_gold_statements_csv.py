@@ -1,13 +1,123 @@
 """
 Module for loading gold statements from CSV file.
 """
+import math
 import os
 import pandas as pd
+from compiled_index import load_compiled_index
+from text_similarity import tokenize
+
+GOLD_STATEMENTS_CSV = os.path.join("Map", "gold_statements.csv")
+
+# An inferred designation needs this cosine similarity to its statement...
+STATEMENT_INFERENCE_MIN_SCORE = 0.3
+# ...and this lead over the next most similar designation
+STATEMENT_INFERENCE_MIN_MARGIN = 0.15
+
+
+def build_gold_statements_dict(csv_path):
+    """Build the gold_designation -> statement dictionary from gold_statements.csv."""
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    designations = df['gold_designation'].str.strip()
+    statements = df['statements'].str.strip()
+    return dict(zip(designations, statements))
+
+
+def _statement_features(text):
+    """Return feature -> count of the word unigrams and bigrams of a statement."""
+    tokens = tokenize(text)
+    features = {}
+    bigrams = [" ".join(tokens[i:i + 2]) for i in range(len(tokens) - 1)]
+    for feature in tokens + bigrams:
+        features[feature] = features.get(feature, 0) + 1
+    return features
+
+
+class GoldStatementIndex:
+    """
+    TF-IDF index of the expected gold statements, to infer a syllabus's gold designation
+    from the statement it quotes when its course code is not in the catalog.
+
+    Each designation is a document made of its name and statement, weighted by
+    sublinear term frequency and smoothed inverse document frequency over unigrams
+    and bigrams, and L2-normalized. A query is scored against the posting lists of
+    its features only, so inferring one row costs microseconds.
+
+    Args:
+        gold_statements_dict (dict): gold_designation -> statement
+    """
+
+    def __init__(self, gold_statements_dict):
+        self.designations = list(gold_statements_dict)
+        documents = [_statement_features(f"{designation} {statement}")
+                     for designation, statement in gold_statements_dict.items()]
+        document_frequency = {}
+        for features in documents:
+            for feature in features:
+                document_frequency[feature] = document_frequency.get(feature, 0) + 1
+        count = len(documents)
+        self.idf = {feature: math.log((1 + count) / (1 + df)) + 1 for feature, df in document_frequency.items()}
+        # Weight of a feature no statement contains
+        self.unknown_idf = math.log(1 + count) + 1
+        # feature -> [(document number, normalized weight)]
+        self.postings = {}
+        for number, features in enumerate(documents):
+            weights = {feature: (1 + math.log(tf)) * self.idf[feature] for feature, tf in features.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for feature, weight in weights.items():
+                self.postings.setdefault(feature, []).append((number, weight / norm))
+
+    def scores(self, statement):
+        """Return the cosine similarity of a statement to each designation's statement, as a list."""
+        scores = [0.0] * len(self.designations)
+        features = _statement_features(statement)
+        norm = 0.0
+        for feature, tf in features.items():
+            weight = (1 + math.log(tf)) * self.idf.get(feature, self.unknown_idf)
+            norm += weight * weight
+            for number, document_weight in self.postings.get(feature, ()):
+                scores[number] += weight * document_weight
+        norm = math.sqrt(norm) or 1.0
+        return [score / norm for score in scores]
+
+    def infer(self, statement, min_score=STATEMENT_INFERENCE_MIN_SCORE, min_margin=STATEMENT_INFERENCE_MIN_MARGIN):
+        """
+        Return (gold_designation, score) of the designation whose statement the given one
+        resembles, or ("NA", score) when it is missing or no designation clearly stands out.
+        """
+        if statement is None or str(statement).strip() in ('', 'NA') or not self.designations:
+            return "NA", 0.0
+        scores = self.scores(statement)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        runner_up = max((score for number, score in enumerate(scores) if number != best), default=0.0)
+        if scores[best] < min_score or scores[best] - runner_up < min_margin:
+            return "NA", scores[best]
+        return self.designations[best], scores[best]
+
+
+def build_gold_statement_index(csv_path):
+    """Build the GoldStatementIndex of gold_statements.csv."""
+    return GoldStatementIndex(build_gold_statements_dict(csv_path))
+
+
+def load_gold_statement_index(csv_path=GOLD_STATEMENTS_CSV):
+    """
+    Return the GoldStatementIndex of gold_statements.csv, from its compiled index when
+    still current (None if the CSV is missing or unreadable).
+    """
+    if not os.path.exists(csv_path):
+        return None
+    try:
+        return load_compiled_index(csv_path, "gold_statement_tfidf_v1", build_gold_statement_index)
+    except Exception as e:
+        print(f"Error building the gold statement index: {e}")
+        return None
 
 
 def load_gold_statements_csv(csv_path):
     """
     Load gold_statements.csv and create a dictionary mapping gold_designation to statements.
+    The dictionary is persisted next to the CSV and rebuilt only when the CSV changes.
     
     Args:
         csv_path (str): Path to the gold_statements.csv file
@@ -21,15 +131,7 @@ def load_gold_statements_csv(csv_path):
         return {}
 
     try:
-        df = pd.read_csv(csv_path)
-        gold_dict = {}
-        
-        for _, row in df.iterrows():
-            designation = str(row['gold_designation']).strip()
-            statement = str(row['statements']).strip()
-            gold_dict[designation] = statement
-            
-        return gold_dict
+        return load_compiled_index(csv_path, "gold_statements_v1", build_gold_statements_dict)
     except Exception as e:
         print(f"Error reading CSV file: {e}")
         return {}
@@ -3,25 +3,41 @@ Main entry point for the Syllabus Audit application.
 Supports processing single PDF files or entire folders.
 """
 
-from config import TEST_LLMs_API_ACCESS_TOKEN, TEST_LLMs_REST_API_PROVIDERS_URL, TEST_LLMs_REST_API_URL
+import config
+import argparse
 import json
 import pandas as pd
 import os
-from prompt_builder import build_syllabus_audit_prompt
-from ASUllmAPI import query_model_info_api, model_provider_mapper, model_list
-from ASUllmAPI import ModelConfig, query_llm, batch_query_llm
-from input_processing import read_single_pdf_file, read_pdfs_from_folder
-from map_course_designation import process_course_designation
-from match import process_gold_matching
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from prompt_builder import build_syllabus_audit_prompt, build_partial_audit_prompt, estimate_tokens, AUDIT_FIELDS
+from section_windowing import window_relevant_sections, split_pages
+from header_heuristics import extract_header_fields, settled_fields, HEADER_FIELDS
+from document_chunks import MAX_PROMPT_TOKENS, CHUNK_WORKERS, chunk_pages, merge_partial_records
+from near_duplicates import NearDuplicateIndex, fields_to_recheck
+from llm_cache import CACHE_MODES, MODE_READWRITE
+from llm_client import run_llm_query, configure_llm_cache, configure_llm_scheduler
+from llm_client import use_async_transport, use_stream_transport
+from llm_scheduler import LLMUnavailableError, DEFAULT_RATE_PER_SECOND
+from model_cascade import DEFAULT_MODELS, build_models, run_with_escalation, print_cascade_report
+from input_processing import read_single_pdf_file, read_pdfs_from_folder, iter_pdfs_from_folder, list_pdf_files
+from input_processing import compute_file_hash
+from text_cache import enforce_size_limit
+from checkpoint import checkpoint_path_for, load_checkpoint, reset_checkpoint, append_checkpoint
+from sharding import parse_shard, shard_of, shard_path
+from results_store import ResultsStore, RESULTS_DB_PATH
+from map_course_designation import load_course_gold_dict, load_course_code_index, add_gold_designations
+from match import match_gold_statements, get_statement_column, GOLD_STATEMENTS_CSV
+from load_gold_statements_csv import load_gold_statements_csv, load_gold_statement_index
+import metrics
+
+# Extraction fields whose "NA" answer sends a syllabus on to the next model of a cascade
+REQUIRED_EXTRACTION_FIELDS = ("course_code", "course_name")
 
 
 def execute_single_query(query, model):
-    """Execute a single LLM query."""
-    llm_response = query_llm(model=model,
-                             query=query,
-                             num_retry=3,
-                             success_sleep=0.0,
-                             fail_sleep=1.0)
+    """Execute a single LLM query, reusing a cached response for a repeated prompt."""
+    llm_response = run_llm_query(model=model, query=query)
     return llm_response.get('response')
 
 
@@ -35,22 +51,419 @@ def parse_llm_response(response_text):
             start = response_text.find('{')
             end = response_text.rfind('}')
             if start != -1 and end != -1 and end > start:
-                parsed = json.loads(response_text[start:end + 1])
+                try:
+                    parsed = json.loads(response_text[start:end + 1])
+                except Exception:
+                    metrics.incr("extraction.parse_failures")
+                    raise
+                metrics.incr("extraction.json_salvaged")
             else:
+                metrics.incr("extraction.parse_failures")
                 raise
         else:
+            metrics.incr("extraction.parse_failures")
             raise
     return parsed
 
 
-def process_single_pdf(pdf_path, model, output_file=None):
+def extraction_check(fields):
+    """
+    Build the model cascade check for an extraction answer: the JSON must parse and
+    the required fields among those requested must not be "NA".
+    """
+    required = [field for field in REQUIRED_EXTRACTION_FIELDS if field in fields]
+
+    def check(response_text):
+        with metrics.span("extraction.parse"):
+            parsed = parse_llm_response(response_text)
+        missing = [field for field in required if str(parsed.get(field, "NA")).strip() in ("", "NA")]
+        return parsed, not missing
+
+    return check
+
+
+def extract_syllabus(file_name, data, model, window_sections=False, heuristics=False,
+                     max_prompt_tokens=MAX_PROMPT_TOKENS, request_slots=None):
+    """
+    Build the audit prompt for one syllabus, query the LLM and parse its JSON response.
+
+    With window_sections=True, only the first page and the text around the relevant
+    section headings is sent (see section_windowing).
+    model may be a ModelCascade: a cheaper model's answer is only kept when it parses
+    and has the required fields (REQUIRED_EXTRACTION_FIELDS).
+    With heuristics=True, fields extracted locally with high confidence (see
+    header_heuristics) are not asked of the LLM, and no request is made at all when
+    every field is settled.
+    A prompt above max_prompt_tokens estimated tokens is split into chunks of pages
+    (see extract_in_chunks); 0 always sends a single prompt.
+    request_slots limits the chunk requests sent in parallel (see extract_in_chunks).
+    """
+    if heuristics:
+        with metrics.span("heuristics.extract"):
+            fields, confidence = extract_header_fields(file_name, data)
+        settled = settled_fields(fields, confidence)
+        remaining = [field for field in AUDIT_FIELDS if field not in settled]
+        if not remaining:
+            metrics.incr("heuristics.llm_skipped")
+            print(f"  All fields of {file_name} extracted locally")
+            return {"file_name": file_name, **{field: settled[field] for field in AUDIT_FIELDS}}
+        if settled:
+            metrics.incr("heuristics.llm_shrunk")
+            print(f"  Asking the LLM for {len(remaining)} of {len(AUDIT_FIELDS)} fields of {file_name}")
+            parsed = extract_fields(file_name, data, model, remaining, window_sections=window_sections,
+                                    max_prompt_tokens=max_prompt_tokens, request_slots=request_slots)
+            record = {"file_name": file_name}
+            for field in AUDIT_FIELDS:
+                record[field] = settled[field] if field in settled else parsed.get(field, "NA")
+            return record
+
+    with metrics.span("prompt.build"):
+        llm_prompt = build_syllabus_audit_prompt(filename=file_name, data=data)
+        if window_sections:
+            full_tokens = estimate_tokens(llm_prompt)
+            data = window_relevant_sections(data)
+            llm_prompt = build_syllabus_audit_prompt(filename=file_name, data=data)
+            print(f"  Prompt tokens for {file_name}: {full_tokens} -> {estimate_tokens(llm_prompt)}")
+    if max_prompt_tokens and estimate_tokens(llm_prompt) > max_prompt_tokens:
+        return extract_in_chunks(file_name, data, model, list(AUDIT_FIELDS), request_slots=request_slots)
+    parsed = run_with_escalation(model, llm_prompt, extraction_check(AUDIT_FIELDS))
+    # The record is keyed by the input file, whatever name the LLM wrote back
+    return {"file_name": file_name, **{field: value for field, value in parsed.items() if field != "file_name"}}
+
+
+def extract_in_chunks(file_name, data, model, fields, request_slots=None):
+    """
+    Extract a syllabus too long for one prompt: query chunks of whole pages in
+    parallel and merge their answers, preferring non-"NA" values (see document_chunks).
+
+    A chunk whose answer cannot be parsed is left out of the merge; the extraction
+    only fails when no chunk could be parsed.
+
+    Args:
+        request_slots (threading.Semaphore): Request slots shared with the other files
+            being extracted (see extract_syllabi), one of them held by the caller. Chunks
+            run in parallel only on the slots that are free, so the requests in flight
+            never exceed them; None allows CHUNK_WORKERS chunk requests per syllabus.
+    """
+    chunks = chunk_pages(data)
+    print(f"  {file_name} is too long for one prompt; extracting {len(chunks)} chunks")
+    metrics.incr("extraction.chunked_files")
+    metrics.incr("extraction.chunks", len(chunks))
+    with metrics.span("prompt.build"):
+        prompts = [build_partial_audit_prompt(filename=file_name, data=chunk, fields=fields,
+                                              part=part, parts=len(chunks))
+                   for part, chunk in enumerate(chunks, 1)]
+    # Chunks may legitimately lack the title block, so only a parse failure escalates
+    check = extraction_check(())
+    workers = min(CHUNK_WORKERS, len(prompts))
+    borrowed = 0
+    if request_slots is not None:
+        while borrowed < workers - 1 and request_slots.acquire(blocking=False):
+            borrowed += 1
+        workers = 1 + borrowed
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_with_escalation, model, prompt, check) for prompt in prompts]
+    finally:
+        for _ in range(borrowed):
+            request_slots.release()
+
+    partials = []
+    error = None
+    for part, future in enumerate(futures, 1):
+        try:
+            partials.append(future.result())
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            print(f"  Chunk {part} of {file_name} failed: {e}")
+            error = e
+    if not partials:
+        raise error
+    return merge_partial_records(file_name, partials, fields)
+
+
+def extract_fields(file_name, data, model, fields, window_sections=False, max_prompt_tokens=MAX_PROMPT_TOKENS,
+                   request_slots=None):
+    """
+    Ask the LLM for some of the extraction fields only.
+
+    Header fields are on the first page, so only that page is sent when no section
+    field is requested.
+    """
+    with metrics.span("prompt.build"):
+        if all(field in HEADER_FIELDS for field in fields):
+            pages = split_pages(data)
+            data = data[:pages[0][2]] if pages else data
+        elif window_sections:
+            data = window_relevant_sections(data)
+        llm_prompt = build_partial_audit_prompt(filename=file_name, data=data, fields=fields)
+    if max_prompt_tokens and estimate_tokens(llm_prompt) > max_prompt_tokens:
+        return extract_in_chunks(file_name, data, model, fields, request_slots=request_slots)
+    return run_with_escalation(model, llm_prompt, extraction_check(fields))
+
+
+def extract_near_duplicate(file_name, data, model, representative, near_duplicates, window_sections=False,
+                           heuristics=False, max_prompt_tokens=MAX_PROMPT_TOKENS, request_slots=None):
+    """
+    Extract a near-duplicate of an already extracted syllabus from its representative's
+    record, asking again only for the fields that may differ (see
+    near_duplicates.fields_to_recheck), e.g. the instructor of another section.
+
+    Args:
+        representative (tuple): (file name, text, parsed record, similarity) of the representative
+        near_duplicates (NearDuplicateIndex): Index counting the reuse
+    """
+    representative_name, representative_text, representative_record, similarity = representative
+    fields = fields_to_recheck(representative_text, representative_record, data, AUDIT_FIELDS)
+    record = dict(representative_record, file_name=file_name)
+    remaining = []
+    if not fields:
+        print(f"  {file_name} is a near-duplicate of {representative_name} (similarity {similarity:.2f}); "
+              f"reusing its extraction")
+    else:
+        print(f"  {file_name} is a near-duplicate of {representative_name} (similarity {similarity:.2f}); "
+              f"re-checking {', '.join(fields)}")
+        settled = {}
+        if heuristics:
+            with metrics.span("heuristics.extract"):
+                settled = settled_fields(*extract_header_fields(file_name, data))
+        remaining = [field for field in fields if field not in settled]
+        parsed = extract_fields(file_name, data, model, remaining, window_sections=window_sections,
+                                max_prompt_tokens=max_prompt_tokens,
+                                request_slots=request_slots) if remaining else {}
+        for field in fields:
+            record[field] = settled[field] if field in settled else parsed.get(field, "NA")
+    near_duplicates.record_reuse(len(fields), asked_llm=bool(remaining))
+    metrics.incr("near_duplicates.reused")
+    metrics.incr("near_duplicates.fields_rechecked", len(fields))
+    return record
+
+
+def extract_syllabi(pdf_items, model, max_workers=1, on_result=None, window_sections=False, heuristics=False,
+                    max_prompt_tokens=MAX_PROMPT_TOKENS, near_duplicates=None):
+    """
+    Run LLM extraction over several syllabi, optionally with concurrent requests.
+
+    A failing file is reported and skipped; it never aborts the rest of the batch.
+
+    Args:
+        pdf_items (iterable): (file_name, text) pairs, e.g. pdf_data.items()
+        model: LLM model configuration
+        max_workers (int): Number of LLM requests in flight at once, chunk requests included
+                           (1 runs sequentially)
+        on_result (callable): Called as on_result(file_name, parsed) as soon as a file is extracted
+        window_sections (bool): Send only the relevant sections of each syllabus
+        heuristics (bool): Extract confidently recognised fields locally (see header_heuristics)
+        max_prompt_tokens (int): Split longer prompts into chunks of pages (0 never splits)
+        near_duplicates (NearDuplicateIndex): If set, a near-duplicate of a syllabus seen
+                                              earlier reuses that syllabus's extraction
+                                              (see extract_near_duplicate)
+
+    Returns:
+        tuple: (results, failures) where results holds the parsed responses in input
+               order and failures holds (file_name, error message) pairs
+    """
+    outcomes = {}
+    file_names = []
+    # Representatives' records, for their near-duplicates; a representative is always
+    # submitted before its near-duplicates, so one never waits for a queued task
+    extracted = {}
+    finished = {}
+    # One slot per request in flight: each file holds one while it is extracted, and a
+    # chunked syllabus borrows the free ones for its chunks (see extract_in_chunks)
+    request_slots = threading.BoundedSemaphore(max(1, max_workers))
+
+    def run(index, file_name, data, representative=None):
+        print(f"Processing: {file_name}")
+        try:
+            with metrics.span("extract.file", file=file_name):
+                representative_record = None
+                if representative is not None:
+                    finished[representative[0]].wait()
+                    representative_record = extracted.get(representative[0])
+                with request_slots:
+                    if representative_record is not None:
+                        representative_name, representative_text, similarity = representative
+                        parsed = extract_near_duplicate(file_name, data, model,
+                                                        (representative_name, representative_text,
+                                                         representative_record, similarity),
+                                                        near_duplicates, window_sections=window_sections,
+                                                        heuristics=heuristics, max_prompt_tokens=max_prompt_tokens,
+                                                        request_slots=request_slots)
+                    else:
+                        parsed = extract_syllabus(file_name, data, model, window_sections=window_sections,
+                                                  heuristics=heuristics, max_prompt_tokens=max_prompt_tokens,
+                                                  request_slots=request_slots)
+            if file_name in finished:
+                extracted[file_name] = parsed
+        except LLMUnavailableError as e:
+            # Not a problem with the file: a --resume run extracts it again
+            print(f"  LLM unavailable for {file_name}: {e}")
+            outcomes[index] = (None, f"LLM unavailable, retry with --resume ({e})")
+            return
+        except Exception as e:
+            print(f"  Extraction failed for {file_name}: {e}")
+            outcomes[index] = (None, str(e))
+            return
+        finally:
+            if file_name in finished:
+                finished[file_name].set()
+        if on_result is not None:
+            on_result(file_name, parsed)
+        outcomes[index] = (parsed, None)
+
+    def place(file_name, data):
+        """Return the representative of a near-duplicate, registering new representatives."""
+        if near_duplicates is None:
+            return None
+        representative = near_duplicates.add(file_name, data)
+        if representative is None:
+            finished[file_name] = threading.Event()
+        return representative
+
+    if max_workers <= 1:
+        for index, (file_name, data) in enumerate(pdf_items):
+            file_names.append(file_name)
+            run(index, file_name, data, place(file_name, data))
+    else:
+        # Keep only a couple of requests queued per worker so a streaming
+        # input is not drained into memory ahead of the LLM.
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = set()
+            for index, (file_name, data) in enumerate(pdf_items):
+                file_names.append(file_name)
+                pending.add(executor.submit(run, index, file_name, data, place(file_name, data)))
+                if len(pending) >= max_workers * 2:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            wait(pending)
+
+    results = []
+    failures = []
+    for index, file_name in enumerate(file_names):
+        parsed, error = outcomes[index]
+        if error is None:
+            results.append(parsed)
+        else:
+            failures.append((file_name, error))
+
+    return results, failures
+
+
+def report_path_for(output_file):
+    """Return the path of the final audit report that belongs to an extraction output file."""
+    return f"{os.path.splitext(output_file)[0]}_designation_matched.xlsx"
+
+
+def write_report(df, report_path, formats=("xlsx",)):
+    """
+    Write the audit report once, in each requested format ("xlsx" and/or "csv").
+
+    Returns:
+        list: Paths written
+    """
+    base_name = os.path.splitext(report_path)[0]
+    written = []
+    for fmt in formats:
+        path = f"{base_name}.{fmt}"
+        if fmt == "csv":
+            df.to_csv(path, index=False, na_rep='NA')
+        else:
+            df.to_excel(path, index=False, na_rep='NA')
+        written.append(path)
+    return written
+
+
+def audit_records(results, model, report_path, resume=False, report_formats=("xlsx",), store=None,
+                  file_hashes=None):
+    """
+    Run the designation and gold matching stages in memory on extraction records,
+    then write the final report.
+
+    The stages hand a DataFrame to each other directly, so no intermediate Excel file
+    is written or searched for, and concurrent runs cannot pick up each other's files.
+    With a results store, each stage also upserts its results into the store as they
+    are produced, and the report is exported from the store.
+
+    Args:
+        results (list): Parsed extraction records
+        model: LLM model configuration for the matching judge
+        report_path (str): Final report path (its extension is replaced per format); None
+                           writes no report and no matching checkpoint (the rows are
+                           returned, and kept in store if given)
+        resume (bool): Reuse verdicts from the matching checkpoint of an interrupted run
+        report_formats (tuple): Report formats to write ("xlsx", "csv")
+        store (ResultsStore): Results store holding the extraction records (None to report from memory)
+        file_hashes (dict): file_name -> content hash of the records, required with store
+
+    Returns:
+        DataFrame: The audited rows
+    """
+    df = pd.DataFrame(results)
+
+    def row_hash(idx):
+        return file_hashes[df.at[idx, "file_name"]]
+
+    # Add gold designations
+    print("Adding gold designations...")
+    with metrics.span("stage.designation", rows=len(df)):
+        try:
+            course_gold_dict = load_course_gold_dict()
+            course_index = load_course_code_index()
+        except Exception as e:
+            print(f"Error loading the course catalog: {e}")
+            course_gold_dict = None
+        if course_gold_dict is not None:
+            df = add_gold_designations(df, course_gold_dict, course_index,
+                                       load_gold_statement_index(GOLD_STATEMENTS_CSV))
+            if store is not None:
+                store.update_designations((row_hash(idx), row.get("course_code"), row.get("gold_designation"),
+                                           row.get("designation_source")) for idx, row in df.iterrows())
+
+    if course_gold_dict is not None:
+        # Perform gold statement matching
+        print("Performing gold statement matching...")
+        with metrics.span("stage.matching", rows=len(df)):
+            gold_statements_dict = load_gold_statements_csv(GOLD_STATEMENTS_CSV)
+            if not gold_statements_dict:
+                print("Warning: gold_statements_dict is empty; matching will be skipped.")
+            elif get_statement_column(df) is None:
+                print("Warning: extraction results have no gold statement column; matching will be skipped.")
+            else:
+                on_result = None
+                if store is not None:
+                    def on_result(idx, match_result, expected_statement):
+                        store.update_match(row_hash(idx), df.at[idx, "course_code"], match_result,
+                                           expected_statement)
+                df = match_gold_statements(df, gold_statements_dict, model,
+                                           checkpoint_path=report_path and checkpoint_path_for(report_path),
+                                           resume=resume, on_result=on_result)
+
+    if report_path is None:
+        return df
+    with metrics.span("stage.report", formats=",".join(report_formats)):
+        if store is not None:
+            written = store.export(report_path, report_formats, file_names=list(df.get("file_name", [])))
+        else:
+            written = write_report(df, report_path, report_formats)
+    for path in written:
+        print(f"Audit report saved to {path}")
+    return df
+
+
+def process_single_pdf(pdf_path, model, output_file=None, window_sections=False, heuristics=False,
+                       max_prompt_tokens=MAX_PROMPT_TOKENS):
     """
     Process a single PDF file.
     
     Args:
         pdf_path (str): Path to the PDF file
         model: LLM model configuration
-        output_file (str): Output Excel file path (optional, defaults to input filename)
+        output_file (str): Output Excel file path (optional, defaults to input filename); the
+                           report is written next to it with a "_designation_matched" suffix
+        window_sections (bool): Send only the relevant sections of the syllabus to the LLM
+        heuristics (bool): Extract confidently recognised fields locally (see header_heuristics)
+        max_prompt_tokens (int): Split longer prompts into chunks of pages (0 never splits)
     """
     if not os.path.exists(pdf_path):
         print(f"Error: PDF file not found at {pdf_path}")
@@ -60,6 +473,7 @@ def process_single_pdf(pdf_path, model, output_file=None):
 
     # Read PDF content
     data = read_single_pdf_file(pdf_path)
+    enforce_size_limit()
     file_name = os.path.basename(pdf_path)
 
     # Set default output file based on input filename
@@ -68,95 +482,269 @@ def process_single_pdf(pdf_path, model, output_file=None):
         base_name = os.path.splitext(file_name)[0]
         output_file = f"Output/{base_name}.xlsx"
 
-    # Build prompt and execute query
-    llm_prompt = build_syllabus_audit_prompt(filename=file_name, data=data)
-    response_text = execute_single_query(llm_prompt, model)
+    # Build prompt, execute query and parse response
+    parsed = extract_syllabus(file_name, data, model, window_sections=window_sections, heuristics=heuristics,
+                              max_prompt_tokens=max_prompt_tokens)
 
-    # Parse response
-    parsed = parse_llm_response(response_text)
-
-    # Save result
-    df = pd.DataFrame([parsed])
-    df.to_excel(output_file, index=False)
-    print(f"Single PDF result saved to {output_file}")
-    
-    # Automatically add gold designations
-    print("Adding gold designations...")
-    process_course_designation()
-    
-    # Automatically perform gold statement matching
-    print("Performing gold statement matching...")
-    process_gold_matching()
+    # Add gold designations and perform gold statement matching, then save the report
+    audit_records([parsed], model, report_path_for(output_file))
 
     return parsed
 
 
-def process_folder(folder_path, model, output_file="Output/all_results.xlsx", max_files=None):
+def process_folder(folder_path, model, output_file="Output/all_results.xlsx", max_files=None, max_workers=1,
+                   pdf_workers=None, resume=False, window_sections=False, report_formats=("xlsx",),
+                   heuristics=False, max_prompt_tokens=MAX_PROMPT_TOKENS, shard=None, results_db=None,
+                   near_duplicates=False, extract_only=False):
     """
     Process all PDF files in a folder.
     
     Args:
         folder_path (str): Path to folder containing PDF files
         model: LLM model configuration
-        output_file (str): Output Excel file path
+        output_file (str): Output Excel file path; the audit report is written next to it
+                           with a "_designation_matched" suffix
         max_files (int): Maximum number of files to process (None for all)
+        max_workers (int): Number of concurrent LLM requests (1 for sequential)
+        pdf_workers (int): If set, parse PDFs on this many processes and stream each
+                           text to the LLM as soon as it is extracted
+        resume (bool): Skip files (by content hash) and rows already recorded in the
+                       checkpoints of an interrupted run
+        window_sections (bool): Send only the first page and the relevant sections of
+                                each syllabus to the LLM
+        report_formats (tuple): Formats of the audit report ("xlsx", "csv")
+        heuristics (bool): Extract confidently recognised fields locally (see header_heuristics)
+        max_prompt_tokens (int): Split longer prompts into chunks of pages (0 never splits)
+        shard (tuple): (index, count) to process only the files of that shard, by content
+                       hash (see sharding); output_file should then be shard-specific
+        results_db (str): SQLite results store (see results_store) that every stage upserts
+                          into and the report is exported from; with resume, files whose
+                          content is already stored there are not extracted again
+        near_duplicates (bool): Extract each cluster of near-duplicate syllabi (e.g. one
+                                per section) once and re-check only the fields that differ
+                                (see near_duplicates)
+        extract_only (bool): Stop after extraction and save the extraction results to
+                             output_file, for the designation and matching steps of
+                             map_course_designation.py and match.py
     """
     if not os.path.exists(folder_path):
         print(f"Error: Folder not found at {folder_path}")
         return
 
-    print(f"Processing folder: {folder_path}")
+    print(f"Processing folder: {folder_path}" + (f" (shard {shard[0]}/{shard[1]})" if shard else ""))
 
-    # Read all PDFs from folder
-    pdf_data = read_pdfs_from_folder(folder_path)
-
-    if not pdf_data:
+    pdf_files = list_pdf_files(folder_path)
+    if not pdf_files:
         print("No PDF files found in the folder")
         return
 
-    results = []
+    # Every extracted record is checkpointed under its file's content hash
+    checkpoint_path = checkpoint_path_for(output_file)
+    with metrics.span("stage.hash_files", files=len(pdf_files)):
+        file_hashes = {file_name: compute_file_hash(os.path.join(folder_path, file_name))
+                       for file_name in pdf_files}
+    if shard:
+        pdf_files = [file_name for file_name in pdf_files if shard_of(file_hashes[file_name], shard[1]) == shard[0]]
+        print(f"Shard {shard[0]}/{shard[1]}: {len(pdf_files)} of {len(file_hashes)} files")
+    records_by_file = {}
+    store = ResultsStore(results_db) if results_db else None
+    if store is not None:
+        store.register_files({file_name: file_hashes[file_name] for file_name in pdf_files})
+    if resume:
+        completed = load_checkpoint(checkpoint_path)
+        for file_name, file_hash in file_hashes.items():
+            if file_hash in completed:
+                # Files with the same content share a checkpoint entry, under either name
+                records_by_file[file_name] = dict(completed[file_hash], file_name=file_name)
+        if store is not None:
+            stored = store.extracted_records(file_hashes[file_name] for file_name in pdf_files
+                                             if file_name not in records_by_file)
+            for file_name in pdf_files:
+                if file_name not in records_by_file and file_hashes[file_name] in stored:
+                    records_by_file[file_name] = dict(stored[file_hashes[file_name]], file_name=file_name)
+        print(f"Resuming: {len(records_by_file)} of {len(pdf_files)} files already extracted")
+    else:
+        reset_checkpoint(checkpoint_path)
+    pending_files = [file_name for file_name in pdf_files if file_name not in records_by_file]
 
-    for file_name, data in pdf_data.items():
-        print(f"Processing: {file_name}")
+    def save_record(file_name, parsed):
+        append_checkpoint(checkpoint_path, file_hashes[file_name], parsed)
+        if store is not None:
+            store.upsert_extraction(file_hashes[file_name], parsed)
+        records_by_file[file_name] = parsed
 
-        # Build prompt and execute query
-        llm_prompt = build_syllabus_audit_prompt(filename=file_name, data=data)
-        response_text = execute_single_query(llm_prompt, model)
+    read_errors = []
+    if pdf_workers:
+        # Stream texts from the extraction pool straight into the LLM stage
+        pdf_items = iter_pdfs_from_folder(folder_path, max_workers=pdf_workers, filenames=pending_files,
+                                          errors=read_errors)
+    else:
+        # Read all PDFs from folder
+        pdf_items = read_pdfs_from_folder(folder_path, filenames=pending_files).items()
 
-        # Parse response
-        parsed = parse_llm_response(response_text)
-        results.append(parsed)
+    duplicate_index = NearDuplicateIndex() if near_duplicates else None
+    # PDF parsing streams into this stage when pdf_workers is set
+    with metrics.span("stage.extraction", files=len(pending_files)):
+        _, failures = extract_syllabi(pdf_items, model, max_workers=max_workers, on_result=save_record,
+                                      window_sections=window_sections, heuristics=heuristics,
+                                      max_prompt_tokens=max_prompt_tokens, near_duplicates=duplicate_index)
+    if duplicate_index is not None:
+        stats = duplicate_index.stats()
+        print(f"Near-duplicates: {stats['files']} files in {stats['clusters']} clusters "
+              f"({stats['clusters_with_duplicates']} with duplicates); {stats['reused']} extractions reused with "
+              f"{stats['fields_rechecked']} fields re-checked in {stats['rechecked']} LLM requests; "
+              f"{stats['llm_calls_saved']} LLM calls saved")
 
-    # Save results
-    df = pd.DataFrame(results)
-    df.to_excel(output_file, index=False)
-    print(f"Folder processing complete. Results saved to {output_file}")
-    print(f"Processed {len(results)} files")
-    
-    # Automatically add gold designations
-    print("Adding gold designations...")
-    process_course_designation()
-    
-    # Automatically perform gold statement matching
-    print("Performing gold statement matching...")
-    process_gold_matching()
+    # The pool is drained once extraction returns, so every unreadable PDF is listed by now
+    failures = read_errors + failures
+
+    # Report in folder order, whatever order the files finished in
+    results = [records_by_file[file_name] for file_name in pdf_files if file_name in records_by_file]
+
+    if failures:
+        print(f"{len(failures)} file(s) failed extraction:")
+        for file_name, error in failures:
+            print(f"  {file_name}: {error}")
+
+    print(f"Folder extraction complete. Processed {len(results)} files")
+
+    if extract_only:
+        pd.DataFrame(results).to_excel(output_file, index=False, na_rep='NA')
+        print(f"Extraction results saved to {output_file}")
+        if store is not None:
+            store.close()
+        return results
+
+    # Add gold designations and perform gold statement matching, then save the report
+    audit_records(results, model, report_path_for(output_file), resume=resume, report_formats=report_formats,
+                  store=store, file_hashes=file_hashes)
+    if store is not None:
+        store.close()
 
     return results
 
 
-def main():
-    """Main function - example usage of the processing functions."""
-    # Initialize model
-    model = ModelConfig(name="gpt4_1",
-                        provider="openai",
-                        access_token=TEST_LLMs_API_ACCESS_TOKEN,
-                        api_url=TEST_LLMs_REST_API_URL)
+def add_llm_arguments(parser):
+    """Add the options of the LLM setup (see configure_llm) to an argument parser."""
+    parser.add_argument("--llm-cache", choices=CACHE_MODES, default=MODE_READWRITE,
+                        help="LLM response cache mode; 'replay' only serves cached responses")
+    parser.add_argument("--max-workers", type=int, default=4,
+                        help="Number of concurrent LLM requests")
+    parser.add_argument("--llm-transport", choices=("sync", "async", "stream"), default="sync",
+                        help="'async' sends requests through the pooled asyncio client (needs aiohttp); "
+                             "'stream' streams answers over the WebSocket endpoint and stops at the end of "
+                             "their JSON")
+    parser.add_argument("--rate-limit", type=float, default=DEFAULT_RATE_PER_SECOND,
+                        help="Maximum LLM requests per second (0 for no limit)")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS),
+                        help="Comma-separated models, cheapest first, as 'name' (looked up in the model registry) "
+                             "or 'name:provider'; with several, a syllabus (or judge verdict) goes on to the next "
+                             "model only when the previous answer is unusable (or uncertain)")
+
+
+def configure_llm(args):
+    """
+    Set up the LLM response cache, request scheduler, transport and model from the
+    options of add_llm_arguments.
+
+    Returns:
+        tuple: (model or model cascade, response cache, scheduler, transport or None);
+               close the transport when done
+    """
+    llm_cache = configure_llm_cache(mode=args.llm_cache)
+    scheduler = configure_llm_scheduler(rate_per_second=args.rate_limit)
+    transport = None
+    if args.llm_transport == "async":
+        transport = use_async_transport(args.max_workers)
+    elif args.llm_transport == "stream":
+        transport = use_stream_transport(config.TEST_LLMs_WS_URL)
+
+    # Initialize model (or model cascade)
+    model = build_models([spec.strip() for spec in args.models.split(",") if spec.strip()],
+                         access_token=config.TEST_LLMs_API_ACCESS_TOKEN,
+                         api_url=config.TEST_LLMs_REST_API_URL,
+                         registry_url=config.TEST_LLMs_REST_API_PROVIDERS_URL)
+    return model, llm_cache, scheduler, transport
+
+
+def print_llm_report(model, llm_cache, scheduler):
+    """Print the response cache, scheduler and model cascade counters."""
+    stats = llm_cache.stats()
+    print(f"LLM cache ({stats['mode']}): {stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['stores']} stored")
+    stats = scheduler.stats()
+    print(f"LLM requests: {stats['requests']} sent, {stats['retries']} retries, {stats['throttled']} throttled, "
+          f"{stats['gave_up']} gave up, circuit opened {stats['circuit_trips']} times")
+    print_cascade_report(model)
+
+
+def main(argv=None, prog=None):
+    """
+    Main function - example usage of the processing functions.
+
+    Args:
+        argv (list): Command-line arguments (default: sys.argv[1:])
+        prog (str): Program name shown in the help
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="Audit syllabus PDFs with an LLM.")
+    add_llm_arguments(parser)
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from its checkpoints")
+    parser.add_argument("--metrics", default="Output/metrics.json",
+                        help="Write stage timings, LLM latency histograms and counters to this JSON file")
+    parser.add_argument("--heuristics", action="store_true",
+                        help="Extract header fields and clearly headed sections locally and only ask the LLM "
+                             "for the rest")
+    parser.add_argument("--no-window", action="store_true",
+                        help="Send the full syllabus text to the LLM instead of the first page and the Gold "
+                             "Statement and Learning Outcomes sections")
+    parser.add_argument("--trace", help="Write a Chrome trace (chrome://tracing, Perfetto) of the run to this file")
+    parser.add_argument("--max-prompt-tokens", type=int, default=MAX_PROMPT_TOKENS,
+                        help="Split syllabi whose prompt exceeds this many estimated tokens into chunks of pages "
+                             "queried in parallel (0 to always send one prompt)")
+    parser.add_argument("--shard", type=parse_shard,
+                        help="Process only shard I/N of Data/ (files split by content hash) into shard-specific "
+                             "outputs; combine them with 'python sharding.py merge --shards N'")
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="Extract near-duplicate syllabi (e.g. one per section) once per cluster and re-check "
+                             "only the fields that differ, such as the instructor")
+    parser.add_argument("--results-db", default=RESULTS_DB_PATH,
+                        help="SQLite results store that every stage upserts into and the report is exported "
+                             "from; query or export it with results_store.py ('' to report from memory only)")
+    parser.add_argument("--extract-only", action="store_true",
+                        help="Only extract, saving the results to Output/all_results.xlsx for "
+                             "map_course_designation.py and match.py")
+    args = parser.parse_args(argv)
+    output_file = "Output/all_results.xlsx"
+    if args.shard:
+        # Workers sharing the Output folder must not overwrite each other's files
+        output_file = shard_path(output_file, *args.shard)
+        args.metrics = args.metrics and shard_path(args.metrics, *args.shard)
+        args.trace = args.trace and shard_path(args.trace, *args.shard)
+        args.results_db = args.results_db and shard_path(args.results_db, *args.shard)
+    metrics.enable_tracing(bool(args.trace))
+    model, llm_cache, scheduler, transport = configure_llm(args)
 
     # Example 1: Process a single PDF
     # process_single_pdf("Data/Copy of CIS 105 - McCarthy - C - 23330-10466-10467.pdf", model)
 
     # Example 2: Process all PDFs in a folder
-    process_folder("Data/", model)
+    process_folder("Data/", model, output_file=output_file, max_workers=args.max_workers, pdf_workers=4,
+                   resume=args.resume, window_sections=not args.no_window, heuristics=args.heuristics,
+                   max_prompt_tokens=args.max_prompt_tokens, shard=args.shard, results_db=args.results_db,
+                   near_duplicates=args.near_duplicates, extract_only=args.extract_only)
+
+    if transport is not None:
+        transport.close()
+
+    print_llm_report(model, llm_cache, scheduler)
+
+    if args.metrics:
+        metrics.write_metrics(args.metrics)
+        print(f"Metrics saved to {args.metrics}")
+    if args.trace:
+        metrics.write_trace(args.trace)
+        print(f"Trace saved to {args.trace}")
 
 
 if __name__ == '__main__':
@@ -1,6 +1,22 @@
 import pandas as pd
 import os
 import glob
+import re
+from difflib import SequenceMatcher
+
+import metrics
+from compiled_index import load_compiled_index
+from load_gold_statements_csv import GOLD_STATEMENTS_CSV, load_gold_statement_index
+
+COURSE_CATALOG_CSV = "Map/ASU Courses and Topics Approved for General Studies - General Studies Gold.csv"
+
+# Subject and number of a course code written as "CIS 105", "cis105", "CIS-105" or "CIS 105 / CSE 105";
+# the subject may contain a digit misread for a letter ("C1S 105")
+COURSE_CODE_RE = re.compile(r"\b([A-Z][A-Z0-9]{1,3}?)\s*[-.]?\s*(\d{3})(?!\d)")
+# Minimum similarity of a misspelled subject to the catalog subject with the same course number
+FUZZY_SUBJECT_MIN_RATIO = 0.66
+# Columns holding the syllabus gold statement (see match.get_statement_column)
+STATEMENT_COLUMNS = ('gold_statement', 'extracted_gold_statement')
 
 
 def find_result_file():
@@ -31,36 +47,164 @@ def find_result_file():
     return None
 
 
-def process_course_designation():
+def build_course_gold_dict(csv_file_path):
     """
-    Read the CSV file from Map folder and create a dictionary where:
+    Read the course catalog CSV and create a dictionary where:
     - Key: Subject + " " + Nbr (e.g., "ABS 130")
-    - Value: Gold Designation
-    Once the dictionary is created, read the appropriate results file and add gold_designation column
+    - Value: Gold Designation, without its trailing abbreviation in parentheses
     """
-    # Read the CSV file
-    csv_file_path = "Map/ASU Courses and Topics Approved for General Studies - General Studies Gold.csv"
+    # Read every value as the text written in the CSV, so course numbers never become floats
+    df = pd.read_csv(csv_file_path, dtype=str, keep_default_na=False)
+
+    subjects = df['Subject'].str.strip()
+    nbrs = df['Nbr'].str.strip()
+    # Remove abbreviation enclosed in parentheses at the end, e.g. "Humanities, Arts and Design (HUAD)"
+    gold_designations = (df['Gold Designation'].str.strip()
+                         .str.replace(r"\([^(]*\)$", "", regex=True).str.strip())
+
+    # Combine Subject and Nbr with a space; later rows win, as in the catalog order
+    return dict(zip(subjects + " " + nbrs, gold_designations))
+
+
+def load_course_gold_dict(csv_file_path=COURSE_CATALOG_CSV):
+    """
+    Return the course -> gold designation dictionary for the catalog CSV, from the
+    compiled index saved next to the CSV when it is still current.
+    """
+    return load_compiled_index(csv_file_path, "course_gold_v1", build_course_gold_dict)
+
+
+def normalize_course_codes(course_code):
+    """
+    Return the course codes written in a course_code value, normalized to "SUBJECT NBR"
+    (e.g. " cis105/CSE-105" -> ["CIS 105", "CSE 105"]).
+    """
+    return [f"{subject} {number}" for subject, number in COURSE_CODE_RE.findall(str(course_code).upper())]
+
+
+class CourseCodeIndex:
+    """
+    Course -> gold designation lookup that tolerates how the LLM writes course codes.
+
+    Codes are compared in their normalized form (see normalize_course_codes), so
+    "CIS105" and "cis 105 " find "CIS 105". A code whose subject is still unknown is
+    matched to the catalog subject with the same course number that it most resembles
+    ("CSI 105" or "C1S 105" -> "CIS 105"), when that subject is unambiguous; codes of
+    a subject that is in the catalog are taken as written (an uncataloged course).
+
+    Args:
+        course_gold_dict (dict): Course ("ABS 130") -> gold designation, as build_course_gold_dict
+    """
+
+    def __init__(self, course_gold_dict):
+        self.designations = {}
+        for course, designation in course_gold_dict.items():
+            for code in normalize_course_codes(course)[:1]:
+                self.designations[code] = designation
+        # Course number -> subjects in the catalog with that number
+        self.subjects_by_number = {}
+        for code in self.designations:
+            subject, number = code.split(" ")
+            self.subjects_by_number.setdefault(number, []).append(subject)
+        self.subjects = {subject for subjects in self.subjects_by_number.values() for subject in subjects}
+
+    def lookup(self, course_code):
+        """
+        Return (gold designation, method) for a course_code value, method being
+        "normalized" or "fuzzy", or ("NA", None) when no catalog course is found.
+        """
+        codes = normalize_course_codes(course_code)
+        for code in codes:
+            designation = self.designations.get(code)
+            if designation is not None:
+                return designation, "normalized"
+        for code in codes:
+            subject, number = code.split(" ")
+            if subject in self.subjects:
+                continue
+            ratios = sorted(((SequenceMatcher(None, subject, candidate).ratio(), candidate)
+                             for candidate in self.subjects_by_number.get(number, ())), reverse=True)
+            if ratios and ratios[0][0] >= FUZZY_SUBJECT_MIN_RATIO and \
+                    (len(ratios) == 1 or ratios[1][0] < ratios[0][0]):
+                return self.designations[f"{ratios[0][1]} {number}"], "fuzzy"
+        return "NA", None
+
+
+def build_course_code_index(csv_file_path):
+    """Build the CourseCodeIndex of the course catalog CSV."""
+    return CourseCodeIndex(build_course_gold_dict(csv_file_path))
+
+
+def load_course_code_index(csv_file_path=COURSE_CATALOG_CSV):
+    """Return the CourseCodeIndex of the catalog CSV, from its compiled index when still current."""
+    return load_compiled_index(csv_file_path, "course_code_v1", build_course_code_index)
+
+
+def add_gold_designations(results_df, course_gold_dict, course_index=None, statement_index=None):
+    """
+    Return a copy of the extraction results with a gold_designation column looked up
+    from course_code ("NA" when the code is missing or not in the catalog), and a
+    designation_source column telling how it was found: "catalog", "normalized",
+    "fuzzy", "statement" or "NA".
+
+    Rows the exact lookup misses are looked up again in course_index (normalized and
+    misspelled codes, see CourseCodeIndex), then, if still not found, their designation
+    is inferred from the extracted gold statement with statement_index (see
+    load_gold_statements_csv.GoldStatementIndex). Both are local; no LLM is called.
+
+    Args:
+        results_df (DataFrame): Extraction results
+        course_gold_dict (dict): Course -> gold designation
+        course_index (CourseCodeIndex): Fallback course code lookup (None to skip)
+        statement_index (GoldStatementIndex): Fallback inference from the gold statement (None to skip)
+    """
+    results_df = results_df.copy()
+    if 'course_code' in results_df.columns:
+        course_codes = results_df['course_code'].astype(str).str.strip()
+    else:
+        course_codes = pd.Series('', index=results_df.index)
+
+    gold_designations = course_codes.map(course_gold_dict).fillna('NA')
+    gold_designations[course_codes.isin(['NA', ''])] = 'NA'
+    sources = pd.Series('NA', index=results_df.index)
+    sources[gold_designations != 'NA'] = 'catalog'
+    metrics.incr("designation.catalog", int((sources == 'catalog').sum()))
+
+    statement_column = next((column for column in STATEMENT_COLUMNS if column in results_df.columns), None)
+    recovered = {}
+    for idx in gold_designations.index[gold_designations == 'NA']:
+        designation, method = "NA", None
+        if course_index is not None and course_codes[idx] not in ('NA', ''):
+            designation, method = course_index.lookup(course_codes[idx])
+        if method is None and statement_index is not None and statement_column is not None:
+            designation, _ = statement_index.infer(results_df.at[idx, statement_column])
+            method = "statement" if designation != "NA" else None
+        if method is not None:
+            gold_designations[idx] = designation
+            sources[idx] = method
+            recovered[method] = recovered.get(method, 0) + 1
+            metrics.incr(f"designation.{method}")
+    if recovered:
+        print("Designations recovered without an exact catalog match: "
+              + ", ".join(f"{count} by {method} lookup" if method != "statement"
+                          else f"{count} inferred from the gold statement" for method, count in recovered.items()))
+
+    results_df['gold_designation'] = gold_designations
+    results_df['designation_source'] = sources
+    return results_df
+
+
+def process_course_designation():
+    """
+    Build the course -> gold designation dictionary from the catalog CSV in the Map folder,
+    then read the appropriate results file and add a gold_designation column.
+    """
+    csv_file_path = COURSE_CATALOG_CSV
 
     try:
-        df = pd.read_csv(csv_file_path)
-
-        # Create dictionary by combining Subject and Nbr columns
-        course_gold_dict = {}
-
-        for index, row in df.iterrows():
-            subject = str(row['Subject']).strip()
-            nbr = str(row['Nbr']).strip()
-            gold_designation = str(row['Gold Designation']).strip()
-            # Remove abbreviation enclosed in parentheses at the end
-            if gold_designation.endswith(')'):
-                # Find the last opening parenthesis
-                last_open_paren = gold_designation.rfind('(')
-                if last_open_paren != -1:
-                    gold_designation = gold_designation[:last_open_paren].strip()
-
-            # Combine Subject and Nbr with a space
-            course_key = f"{subject} {nbr}"
-            course_gold_dict[course_key] = gold_designation
+        course_gold_dict = load_course_gold_dict(csv_file_path)
+        course_index = load_course_code_index(csv_file_path)
+        statement_index = load_gold_statement_index(GOLD_STATEMENTS_CSV)
 
         # Print first 5 entries
         print("First 5 entries of the course dictionary:")
@@ -83,16 +227,7 @@ def process_course_designation():
                 results_df = pd.read_excel(results_path)
                 
                 # Add gold_designation column
-                gold_designations = []
-                for _, row in results_df.iterrows():
-                    course_code = str(row.get('course_code', '')).strip()
-                    if course_code == 'NA' or not course_code:
-                        gold_designations.append('NA')
-                    else:
-                        gold_designation = course_gold_dict.get(course_code, 'NA')
-                        gold_designations.append(gold_designation)
-                
-                results_df['gold_designation'] = gold_designations
+                results_df = add_gold_designations(results_df, course_gold_dict, course_index, statement_index)
                 
                 # Create output filename with "_designation" extension
                 base_name = os.path.splitext(results_path)[0]
@@ -118,4 +253,4 @@ def process_course_designation():
 
 
 if __name__ == "__main__":
-    course_dict = process_course_designation()
\ No newline at end of file
+    course_dict = process_course_designation()
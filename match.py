@@ -1,12 +1,40 @@
+import argparse
 import os
 import sys
 import pandas as pd
 import json
 import glob
 
-from config import TEST_LLMs_API_ACCESS_TOKEN, TEST_LLMs_REST_API_URL
-from ASUllmAPI import ModelConfig, query_llm
-from load_gold_statements_csv import load_gold_statements_csv
+import config
+from llm_scheduler import LLMUnavailableError
+from model_cascade import DEFAULT_MODELS, build_models, run_with_escalation
+from load_gold_statements_csv import load_gold_statements_csv, GOLD_STATEMENTS_CSV
+from checkpoint import checkpoint_path_for, load_checkpoint, reset_checkpoint, append_checkpoint, row_key
+from text_similarity import tokenize, shingles, containment
+import metrics
+
+# Fraction of the expected statement's word 3-grams that must appear in the syllabus
+# statement to decide locally: at or above MATCH_THRESHOLD it is "matched", below
+# NO_MATCH_THRESHOLD it is "not matched", and anything in between goes to the LLM judge.
+PREMATCH_MATCH_THRESHOLD = 0.9
+PREMATCH_NO_MATCH_THRESHOLD = 0.2
+
+# Number of rows packed into one LLM-as-judge request (1 sends one request per row)
+JUDGE_BATCH_SIZE = 10
+
+# Verdict for rows the LLM could not judge because the endpoint kept failing. These
+# rows are not checkpointed, so a --resume run judges them again.
+LLM_UNAVAILABLE = "llm unavailable"
+# Verdict for rows whose request failed for another reason (e.g. HTTP 400/401, a replay
+# cache miss or a bad model configuration). Not checkpointed either.
+LLM_ERROR = "llm error"
+# Outcomes that are not a verdict on the statement
+LLM_FAILURES = (LLM_UNAVAILABLE, LLM_ERROR)
+# Verdict for rows whose designation was inferred from their own gold statement
+# (designation_source "statement", see map_course_designation.add_gold_designations):
+# judging that statement against the expected one would only confirm the inference, so
+# these rows are not judged and are left for a manual check.
+DESIGNATION_INFERRED = "designation inferred"
 
 
 def find_designation_file():
@@ -30,10 +58,39 @@ def find_designation_file():
     return None
 
 
-def match_gold_statements_with_llm(model, gold_destination, syllabus_statement, expected_statement):
+def prematch_gold_statement(syllabus_statement, expected_statement,
+                            match_threshold=PREMATCH_MATCH_THRESHOLD,
+                            no_match_threshold=PREMATCH_NO_MATCH_THRESHOLD):
     """
-    Use LLM as judge to determine if syllabus statement matches the expected statement.
-    Returns: "matched", "not matched", or "not present" (when syllabus statement is missing).
+    Decide clear matches and clear non-matches without the LLM.
+
+    Both statements are normalized (bullets, whitespace, punctuation and case) and the
+    share of the expected statement's word 3-grams found in the syllabus statement is
+    compared against the thresholds.
+
+    Returns:
+        tuple: (verdict, score) where verdict is "matched", "not matched", or None when
+               the statement is missing or the score falls in the ambiguous band
+    """
+    if syllabus_statement == 'NA' or not str(syllabus_statement).strip():
+        return None, 0.0
+    if expected_statement is None or expected_statement == 'NA' or not str(expected_statement).strip():
+        return None, 0.0
+
+    expected_shingles = shingles(tokenize(expected_statement))
+    syllabus_shingles = shingles(tokenize(syllabus_statement))
+    score = containment(expected_shingles, syllabus_shingles)
+
+    if score >= match_threshold:
+        return "matched", score
+    if score < no_match_threshold:
+        return "not matched", score
+    return None, score
+
+
+def precheck_gold_statement(syllabus_statement, expected_statement):
+    """
+    Return the verdict for rows that cannot be judged, or None if the row needs judging.
     """
     # If syllabus statement missing/empty → not present
     if syllabus_statement == 'NA' or not str(syllabus_statement).strip():
@@ -42,6 +99,43 @@ def match_gold_statements_with_llm(model, gold_destination, syllabus_statement,
     # If expected statement unavailable, treat as not matched (cannot verify)
     if expected_statement is None or expected_statement == 'NA' or not str(expected_statement).strip():
         return "not matched"
+
+    return None
+
+
+def parse_judge_response(response_text):
+    """
+    Parse a single-row judge response.
+
+    Returns:
+        tuple: (verdict, certain); a malformed or "unsure" answer counts as "not matched"
+               but is not certain, so a model cascade asks its next model
+    """
+    start = response_text.find('{')
+    end = response_text.rfind('}')
+    try:
+        if start == -1 or end <= start:
+            raise ValueError("no JSON object")
+        result = json.loads(response_text[start:end + 1])
+        answer = str(result.get('match', '')).strip().lower()
+    except (ValueError, AttributeError):
+        metrics.incr("judge.parse_failures")
+        return "not matched", False
+    if answer == 'unsure':
+        metrics.incr("judge.unsure")
+    return ("matched" if answer == 'yes' else "not matched"), answer in ('yes', 'no')
+
+
+def match_gold_statements_with_llm(model, gold_destination, syllabus_statement, expected_statement):
+    """
+    Use LLM as judge to determine if syllabus statement matches the expected statement.
+    Returns: "matched", "not matched", "not present" (when syllabus statement is missing),
+    "llm unavailable" (when the LLM kept failing) or "llm error" (when the request failed
+    otherwise); in the last two cases no verdict was reached.
+    """
+    precheck = precheck_gold_statement(syllabus_statement, expected_statement)
+    if precheck is not None:
+        return precheck
     
     prompt = f"""
 You are an impartial evaluator for academic course statements. Determine if a syllabus Gold Statement matches the required criteria for a specific General Studies Gold designation area.
@@ -49,7 +143,7 @@ You are an impartial evaluator for academic course statements. Determine if a sy
 Instructions:
 - Carefully compare the provided syllabus Gold Statement against the official expected statement.
 - Consider exact text matching, ignore bullet points.
-- Answer strictly in JSON with keys: "match" ("yes" or "no") and "reason" (concise justification).
+- Answer strictly in JSON with keys: "match" ("yes", "no", or "unsure" if you cannot tell) and "reason" (concise justification).
 
 Gold Designation Area: {gold_destination}
 
@@ -60,36 +154,305 @@ Syllabus Gold Statement:
 {syllabus_statement}
 
 JSON only:
-{{"match":"yes|no","reason":"..."}}
+{{"match":"yes|no|unsure","reason":"..."}}
 """
 
     try:
-        resp = query_llm(model=model, query=prompt, num_retry=3, success_sleep=0.0, fail_sleep=1.0)
-        response_text = resp.get('response', '')
-        
-        # Parse JSON response
-        try:
-            # Try to extract JSON from response if it's wrapped in other text
-            start = response_text.find('{')
-            end = response_text.rfind('}')
-            if start != -1 and end != -1 and end > start:
-                json_text = response_text[start:end + 1]
-                result = json.loads(json_text)
-                return "matched" if result.get('match') == 'yes' else "not matched"
-            else:
-                return "not matched"
-        except json.JSONDecodeError:
-            return "not matched"
-            
+        return run_with_escalation(model, prompt, parse_judge_response)
+    except LLMUnavailableError as e:
+        print(f"  {e}")
+        return LLM_UNAVAILABLE
     except Exception as e:
         print(f"  LLM error: {e}")
-        return "not matched"
+        return LLM_ERROR
+
+
+def build_batch_judge_prompt(items):
+    """
+    Build one LLM-as-judge prompt for several rows.
+
+    Each expected statement is listed once per designation area, and every row is
+    identified by its position in items.
+
+    Args:
+        items (list): (gold_designation, syllabus_statement, expected_statement) triples
+    """
+    expected_by_designation = {}
+    for gold_designation, _, expected_statement in items:
+        expected_by_designation.setdefault(gold_designation, expected_statement)
+
+    expected_blocks = "\n\n".join(
+        f"Gold Designation Area: {gold_designation}\n{expected_statement}"
+        for gold_designation, expected_statement in expected_by_designation.items()
+    )
+    item_blocks = "\n\n".join(
+        f"Item id: {item_id}\nGold Designation Area: {gold_designation}\nSyllabus Gold Statement:\n{syllabus_statement}"
+        for item_id, (gold_designation, syllabus_statement, _) in enumerate(items)
+    )
+
+    return f"""
+You are an impartial evaluator for academic course statements. For each item below, determine if the syllabus Gold Statement matches the required criteria for its General Studies Gold designation area.
+
+Instructions:
+- Carefully compare each syllabus Gold Statement against the official expected statement for its designation area.
+- Consider exact text matching, ignore bullet points.
+- Judge every item independently.
+- Answer strictly with a JSON array containing exactly one object per item, with keys: "id" (the item id), "match" ("yes", "no", or "unsure" if you cannot tell) and "reason" (concise justification).
+
+Official Expected Statements:
+
+{expected_blocks}
+
+Items:
+
+{item_blocks}
+
+JSON only:
+[{{"id":0,"match":"yes|no|unsure","reason":"..."}}, ...]
+"""
+
+
+def parse_batch_judge_response(response_text, num_items):
+    """
+    Parse a batched judge response.
+
+    Returns:
+        dict: item id -> "matched"/"not matched" for every well-formed entry; ids that
+              are missing, "unsure", duplicated with conflicting answers or malformed are left out
+    """
+    start = response_text.find('[')
+    end = response_text.rfind(']')
+    if start == -1 or end <= start:
+        return {}
+    try:
+        entries = json.loads(response_text[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+
+    verdicts = {}
+    conflicting = set()
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            item_id = int(entry.get('id'))
+        except (TypeError, ValueError):
+            continue
+        answer = str(entry.get('match', '')).strip().lower()
+        if not 0 <= item_id < num_items or answer not in ('yes', 'no'):
+            continue
+        verdict = "matched" if answer == 'yes' else "not matched"
+        if verdicts.get(item_id, verdict) != verdict:
+            conflicting.add(item_id)
+        verdicts[item_id] = verdict
 
+    for item_id in conflicting:
+        del verdicts[item_id]
+    return verdicts
 
-def process_gold_matching():
+
+def match_gold_statements_batch_with_llm(model, items, max_attempts=2):
+    """
+    Judge several rows with batched LLM requests.
+
+    Rows whose verdict is missing or malformed in the response are re-queried as a
+    smaller batch, up to max_attempts batched requests; any row still unresolved
+    falls back to a single-row request.
+
+    Args:
+        model: LLM model configuration
+        items (list): (gold_designation, syllabus_statement, expected_statement) triples
+        max_attempts (int): Number of batched requests before falling back to single rows
+
+    Returns:
+        list: Verdicts in the order of items
+    """
+    verdicts = [None] * len(items)
+    for item_id, (_, syllabus_statement, expected_statement) in enumerate(items):
+        verdicts[item_id] = precheck_gold_statement(syllabus_statement, expected_statement)
+
+    unresolved = [item_id for item_id, verdict in enumerate(verdicts) if verdict is None]
+    for attempt in range(max_attempts):
+        if len(unresolved) <= 1:
+            break
+        prompt = build_batch_judge_prompt([items[item_id] for item_id in unresolved])
+        num_items = len(unresolved)
+
+        def check(response_text):
+            batch_verdicts = parse_batch_judge_response(response_text, num_items)
+            return batch_verdicts, len(batch_verdicts) == num_items
+
+        try:
+            batch_verdicts = run_with_escalation(model, prompt, check)
+        except LLMUnavailableError as e:
+            # The endpoint is down; single-row requests would only fail the same way
+            print(f"  {e}")
+            for item_id in unresolved:
+                verdicts[item_id] = LLM_UNAVAILABLE
+            return verdicts
+        except Exception as e:
+            # Left unresolved: single-row requests end in LLM_ERROR if they fail as well
+            print(f"  LLM error: {e}")
+            batch_verdicts = {}
+
+        for batch_id, verdict in batch_verdicts.items():
+            verdicts[unresolved[batch_id]] = verdict
+        missing = [item_id for item_id in unresolved if verdicts[item_id] is None]
+        if missing:
+            metrics.incr("judge.batch_items_missing", len(missing))
+            print(f"  Batch attempt {attempt + 1}: {len(missing)} of {len(unresolved)} rows missing or malformed")
+        unresolved = missing
+
+    for item_id in unresolved:
+        verdicts[item_id] = match_gold_statements_with_llm(model, *items[item_id])
+    return verdicts
+
+
+def get_statement_column(df):
+    """
+    Return the column holding the syllabus gold statement: "gold_statement", or
+    "extracted_gold_statement" as named by the extraction prompt (None if neither exists).
+    """
+    for column in ('gold_statement', 'extracted_gold_statement'):
+        if column in df.columns:
+            return column
+    return None
+
+
+def match_gold_statements(df, gold_statements_dict, model, checkpoint_path=None, resume=False, prematch=True,
+                          match_threshold=PREMATCH_MATCH_THRESHOLD, no_match_threshold=PREMATCH_NO_MATCH_THRESHOLD,
+                          batch_size=JUDGE_BATCH_SIZE, on_result=None):
+    """
+    Judge every row of a designation DataFrame against its expected gold statement.
+
+    Each row's verdict is checkpointed as soon as it is judged; with resume=True,
+    rows already judged by an interrupted run are not sent to the LLM again.
+    With prematch=True, near-verbatim and clearly different statements are decided
+    locally (see prematch_gold_statement) and only the ambiguous rows reach the LLM.
+    Rows that do reach the LLM are judged batch_size at a time in one request.
+    Rows whose designation was inferred from their own statement are marked
+    DESIGNATION_INFERRED without being judged.
+
+    Args:
+        df (DataFrame): Rows with course_code, gold_designation and a gold statement column
+        gold_statements_dict (dict): gold_designation -> expected statement
+        model: LLM model configuration for the judge
+        checkpoint_path (str): JSONL checkpoint file (None to disable checkpointing)
+        on_result (callable): Called with (index, match_result, expected_statement) as each
+                              row is settled, e.g. to store verdicts incrementally
+
+    Returns:
+        DataFrame: A copy of df with "match_result" and "expected gold statement" columns
+    """
+    statement_column = get_statement_column(df)
+
+    if checkpoint_path and resume:
+        completed = load_checkpoint(checkpoint_path)
+        print(f"Resuming: {len(completed)} rows already judged")
+    else:
+        completed = {}
+        if checkpoint_path:
+            reset_checkpoint(checkpoint_path)
+
+    # Attach the expected statement for each row's designation
+    expected_statements = (df['gold_designation'].astype(str).str.strip()
+                           .map(gold_statements_dict).fillna('NA'))
+
+    # Store match results for each row
+    match_results = {}
+    llm_rows = []
+    llm_calls_avoided = 0
+
+    def record_result(idx, key, course_code, match_result):
+        match_results[idx] = match_result
+        metrics.incr(f"match.{match_result.replace(' ', '_')}")
+        if checkpoint_path and match_result not in (*LLM_FAILURES, DESIGNATION_INFERRED):
+            append_checkpoint(checkpoint_path, key, {'match_result': match_result})
+        if on_result is not None:
+            on_result(idx, match_result, expected_statements[idx])
+        print(f"  Match result for {course_code}: {match_result}")
+
+    # Settle every row that needs no LLM call, and collect the rest for the judge
+    for idx, row in df.iterrows():
+        course_code = str(row.get('course_code', '')).strip()
+        gold_designation = str(row.get('gold_designation', '')).strip()
+        syllabus_statement = str(row.get(statement_column, '')).strip()
+        
+        print(f"{course_code} -> {gold_designation}")
+        
+        expected_statement = expected_statements[idx]
+        
+        # Rows are keyed by everything the verdict depends on, so edited rows are judged again
+        key = row_key(row.get('file_name', ''), course_code, gold_designation, syllabus_statement,
+                      expected_statement)
+        if str(row.get('designation_source', '')).strip() == 'statement':
+            record_result(idx, key, course_code, DESIGNATION_INFERRED)
+            continue
+        if key in completed:
+            match_results[idx] = completed[key]['match_result']
+            if on_result is not None:
+                on_result(idx, match_results[idx], expected_statement)
+            print(f"  Match result (checkpoint): {match_results[idx]}")
+            continue
+
+        match_result = precheck_gold_statement(syllabus_statement, expected_statement)
+        if match_result is None and prematch:
+            match_result, score = prematch_gold_statement(syllabus_statement, expected_statement,
+                                                          match_threshold, no_match_threshold)
+            if match_result is not None:
+                llm_calls_avoided += 1
+                metrics.incr("match.decided_locally")
+                print(f"  Decided locally (similarity {score:.2f})")
+        if match_result is None:
+            llm_rows.append((idx, key, course_code, (gold_designation, syllabus_statement, expected_statement)))
+        else:
+            record_result(idx, key, course_code, match_result)
+
+    # Match gold statements using LLM
+    if llm_rows:
+        print(f"\nJudging {len(llm_rows)} rows with the LLM (batch size {batch_size})")
+    if batch_size > 1:
+        for start in range(0, len(llm_rows), batch_size):
+            batch = llm_rows[start:start + batch_size]
+            verdicts = match_gold_statements_batch_with_llm(model, [item for _, _, _, item in batch])
+            for (idx, key, course_code, _), match_result in zip(batch, verdicts):
+                record_result(idx, key, course_code, match_result)
+    else:
+        for idx, key, course_code, item in llm_rows:
+            record_result(idx, key, course_code, match_gold_statements_with_llm(model, *item))
+
+    if prematch:
+        print(f"\nPre-matcher decided {llm_calls_avoided} of {len(df)} rows without an LLM call")
+    unavailable = sum(1 for result in match_results.values() if result == LLM_UNAVAILABLE)
+    if unavailable:
+        print(f"Warning: {unavailable} rows could not be judged because the LLM endpoint kept failing; "
+              f"they are marked \"{LLM_UNAVAILABLE}\" and are retried by a --resume run")
+    inferred = sum(1 for result in match_results.values() if result == DESIGNATION_INFERRED)
+    if inferred:
+        print(f"{inferred} rows were not judged because their designation was inferred from their gold statement; "
+              f"they are marked \"{DESIGNATION_INFERRED}\" for a manual check")
+    errors = sum(1 for result in match_results.values() if result == LLM_ERROR)
+    if errors:
+        print(f"Warning: {errors} rows could not be judged because their LLM request failed; "
+              f"they are marked \"{LLM_ERROR}\" and are retried by a --resume run")
+
+    # Add match results and expected statements as new columns
+    df = df.copy()
+    df['match_result'] = [match_results[idx] for idx in df.index]
+    df['expected gold statement'] = expected_statements
+    return df
+
+
+def process_gold_matching(resume=False, prematch=True, match_threshold=PREMATCH_MATCH_THRESHOLD,
+                          no_match_threshold=PREMATCH_NO_MATCH_THRESHOLD, batch_size=JUDGE_BATCH_SIZE,
+                          models=DEFAULT_MODELS, model=None):
     """
     Main function to process gold statement matching.
     Automatically finds designation file and creates matched file.
+    See match_gold_statements for the resume, prematch and batching options, and
+    model_cascade.build_models for models (several models make a cascade in which
+    uncertain verdicts go on to the next model). A model (or cascade) already built,
+    e.g. by main.configure_llm, is used instead of models.
     """
     # Automatically detect designation file
     designation_path = find_designation_file()
@@ -99,9 +462,6 @@ def process_gold_matching():
 
     print(f"Found designation file: {designation_path}")
 
-    # Paths
-    csv_path = os.path.join("Map", "gold_statements.csv")
-
     try:
         df = pd.read_excel(designation_path)
     except Exception as e:
@@ -109,54 +469,33 @@ def process_gold_matching():
         return False
 
     # Check required columns
-    required_columns = ['course_code', 'gold_designation', 'gold_statement']
+    required_columns = ['course_code', 'gold_designation']
     missing_columns = [col for col in required_columns if col not in df.columns]
+    if get_statement_column(df) is None:
+        missing_columns.append('gold_statement')
     if missing_columns:
         print(f"Error: Missing columns in {designation_path}: {missing_columns}")
         return False
 
     # Load gold statements dictionary
-    gold_statements_dict = load_gold_statements_csv(csv_path)
+    gold_statements_dict = load_gold_statements_csv(GOLD_STATEMENTS_CSV)
     if not gold_statements_dict:
         print("Warning: gold_statements_dict is empty; matching will be skipped.")
         return False
 
-    # Initialize model for LLM-as-judge
-    model = ModelConfig(
-        name="gpt4_1",
-        provider="openai",
-        access_token=TEST_LLMs_API_ACCESS_TOKEN,
-        api_url=TEST_LLMs_REST_API_URL
-    )
-
-    # Store match results and expected statements for each row
-    match_results = []
-    expected_statements = []
+    # Initialize model (or model cascade) for LLM-as-judge
+    if model is None:
+        model = build_models(models, access_token=config.TEST_LLMs_API_ACCESS_TOKEN,
+                             api_url=config.TEST_LLMs_REST_API_URL,
+                             registry_url=config.TEST_LLMs_REST_API_PROVIDERS_URL)
 
-    # For each entry, match gold statements using LLM
-    for idx, row in df.iterrows():
-        course_code = str(row.get('course_code', '')).strip()
-        gold_designation = str(row.get('gold_designation', '')).strip()
-        syllabus_statement = str(row.get('gold_statement', '')).strip()
-        
-        print(f"{course_code} -> {gold_designation}")
-        
-        # Get expected statement from CSV
-        expected_statement = gold_statements_dict.get(gold_designation, 'NA')
-        expected_statements.append(expected_statement)
-        
-        # Match gold statements using LLM
-        match_result = match_gold_statements_with_llm(model, gold_designation, syllabus_statement, expected_statement)
-        match_results.append(match_result)
-        print(f"  Match result: {match_result}")
-
-    # Add match results and expected statements as new columns
-    df['match_result'] = match_results
-    df['expected gold statement'] = expected_statements
-    
     # Create output filename with "_matched" extension
     base_name = os.path.splitext(designation_path)[0]
     output_path = f"{base_name}_matched.xlsx"
+
+    df = match_gold_statements(df, gold_statements_dict, model, checkpoint_path=checkpoint_path_for(output_path),
+                               resume=resume, prematch=prematch, match_threshold=match_threshold,
+                               no_match_threshold=no_match_threshold, batch_size=batch_size)
     
     # Save updated results file
     try:
@@ -168,9 +507,32 @@ def process_gold_matching():
         return False
 
 
-def main():
+def main(argv=None, prog=None):
     """Legacy main function for backward compatibility."""
-    process_gold_matching()
+    parser = argparse.ArgumentParser(prog=prog, description="Match extracted gold statements with an LLM judge.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip rows already judged by an interrupted run")
+    parser.add_argument("--no-prematch", action="store_true",
+                        help="Send every row to the LLM judge")
+    parser.add_argument("--match-threshold", type=float, default=PREMATCH_MATCH_THRESHOLD,
+                        help="Similarity at or above which a row is matched without the LLM")
+    parser.add_argument("--no-match-threshold", type=float, default=PREMATCH_NO_MATCH_THRESHOLD,
+                        help="Similarity below which a row is not matched without the LLM")
+    parser.add_argument("--batch-size", type=int, default=JUDGE_BATCH_SIZE,
+                        help="Rows judged per LLM request (1 for one request per row)")
+    # main imports this module, so its LLM options are imported here rather than at the top
+    from main import add_llm_arguments, configure_llm, print_llm_report
+    add_llm_arguments(parser)
+    args = parser.parse_args(argv)
+    model, llm_cache, scheduler, transport = configure_llm(args)
+    try:
+        process_gold_matching(resume=args.resume, prematch=not args.no_prematch,
+                              match_threshold=args.match_threshold, no_match_threshold=args.no_match_threshold,
+                              batch_size=args.batch_size, model=model)
+    finally:
+        if transport is not None:
+            transport.close()
+    print_llm_report(model, llm_cache, scheduler)
 
 
 if __name__ == "__main__":
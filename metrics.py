@@ -0,0 +1,160 @@
+"""
+Lightweight, process-wide instrumentation of the audit pipeline.
+
+Three kinds of measurement are kept in memory:
+- timers: wall time per named span (count, total, min, max), e.g. "stage.extraction"
+  or "extract.file",
+- histograms: value distributions over fixed buckets, e.g. "llm.latency_seconds",
+- counters: plain totals, e.g. "llm.prompt_tokens", "llm.retries" or
+  "extraction.parse_failures".
+
+Timers, histograms and counters are always on; each update is a dictionary update
+under a lock. Trace events, one per span, are only kept after enable_tracing() and
+are capped at MAX_TRACE_EVENTS. write_metrics() exports a JSON summary and
+write_trace() a Chrome trace (open it in chrome://tracing or https://ui.perfetto.dev).
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+# Upper bounds of the size histogram buckets (estimated tokens)
+SIZE_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+MAX_TRACE_EVENTS = 200000
+
+_lock = threading.Lock()
+_timers = {}
+_histograms = {}
+_counters = {}
+_trace_events = []
+_thread_ids = {}
+_tracing = False
+_started_at = time.time()
+
+
+def reset():
+    """Clear every measurement and restart the trace clock."""
+    global _started_at
+    with _lock:
+        _timers.clear()
+        _histograms.clear()
+        _counters.clear()
+        _trace_events.clear()
+        _thread_ids.clear()
+        _started_at = time.time()
+
+
+def enable_tracing(enabled=True):
+    """Keep a trace event per span (needed for write_trace)."""
+    global _tracing
+    _tracing = enabled
+
+
+def incr(name, value=1):
+    """Add value to a counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name, value, buckets=LATENCY_BUCKETS):
+    """Record a value in a histogram; the buckets of its first observation are kept."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = {"buckets": buckets, "counts": [0] * (len(buckets) + 1),
+                                             "count": 0, "sum": 0.0, "min": value, "max": value}
+        index = next((i for i, bound in enumerate(histogram["buckets"]) if value <= bound),
+                     len(histogram["buckets"]))
+        histogram["counts"][index] += 1
+        histogram["count"] += 1
+        histogram["sum"] += value
+        histogram["min"] = min(histogram["min"], value)
+        histogram["max"] = max(histogram["max"], value)
+
+
+def record_span(name, start, seconds, args=None, pid=None, tid=None):
+    """
+    Record a finished span.
+
+    Args:
+        name (str): Timer name
+        start (float): Start time as returned by time.time()
+        seconds (float): Duration
+        args (dict): Details shown with the trace event (e.g. the file name)
+        pid (int): Process that ran the span (default: this process), e.g. a PDF worker
+        tid (int): Thread that ran the span (default: the calling thread)
+    """
+    with _lock:
+        timer = _timers.get(name)
+        if timer is None:
+            timer = _timers[name] = {"count": 0, "total": 0.0, "min": seconds, "max": seconds}
+        timer["count"] += 1
+        timer["total"] += seconds
+        timer["min"] = min(timer["min"], seconds)
+        timer["max"] = max(timer["max"], seconds)
+
+        if _tracing and len(_trace_events) < MAX_TRACE_EVENTS:
+            if tid is None:
+                thread = threading.current_thread()
+                tid = _thread_ids.setdefault(thread.ident, (len(_thread_ids) + 1, thread.name))[0]
+            event = {"name": name, "cat": name.split(".", 1)[0], "ph": "X",
+                     "ts": round((start - _started_at) * 1e6), "dur": round(seconds * 1e6),
+                     "pid": pid or os.getpid(), "tid": tid}
+            if args:
+                event["args"] = args
+            _trace_events.append(event)
+
+
+@contextmanager
+def span(name, **args):
+    """
+    Time a block of code under a timer name.
+
+    Usage:
+        with metrics.span("stage.matching", rows=len(df)):
+            ...
+    """
+    start = time.time()
+    start_counter = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, start, time.perf_counter() - start_counter, args)
+
+
+def snapshot():
+    """Return every timer, histogram and counter as a JSON-serialisable dict."""
+    with _lock:
+        timers = {name: dict(timer, mean=timer["total"] / timer["count"]) for name, timer in _timers.items()}
+        histograms = {}
+        for name, histogram in _histograms.items():
+            labels = [f"<={bound}" for bound in histogram["buckets"]] + [f">{histogram['buckets'][-1]}"]
+            histograms[name] = {"count": histogram["count"], "sum": histogram["sum"],
+                                "mean": histogram["sum"] / histogram["count"],
+                                "min": histogram["min"], "max": histogram["max"],
+                                "buckets": dict(zip(labels, histogram["counts"]))}
+        return {"started_at": _started_at, "timers": timers, "histograms": histograms,
+                "counters": dict(_counters)}
+
+
+def write_metrics(path):
+    """Write snapshot() as JSON."""
+    with open(path, "w") as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+def write_trace(path):
+    """Write the trace events in Chrome trace format."""
+    with _lock:
+        events = list(_trace_events)
+        events += [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                   for tid, name in _thread_ids.values()]
+        # Spans recorded on behalf of worker processes (e.g. PDF parsing)
+        worker_pids = {event["pid"] for event in _trace_events} - {os.getpid()}
+        events += [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"worker {pid}"}}
+                   for pid in sorted(worker_pids)]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
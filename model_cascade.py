@@ -0,0 +1,222 @@
+"""
+Try a cheaper model first and escalate to a larger one only when its answer is not usable.
+
+A ModelCascade holds ModelConfigs ordered from cheapest to largest. run_with_escalation
+sends a prompt to each model in turn until a caller-supplied check accepts the answer:
+syllabus extraction escalates when parse_llm_response fails or a required field is
+"NA", and the judge escalates on malformed JSON, an "unsure" verdict or unresolved
+batch items. The largest model's answer is always used as is.
+
+Anywhere a ModelConfig is expected (process_folder, match_gold_statements, ...) a
+ModelCascade can be passed instead; a plain ModelConfig behaves as a cascade of one.
+Models are resolved by name through the ASUllmAPI model registry
+(query_model_info_api, model_list, model_provider_mapper), unless given as
+"name:provider".
+"""
+import threading
+import time
+
+from ASUllmAPI import ModelConfig, query_model_info_api, model_provider_mapper, model_list
+
+import metrics
+from llm_cache import ReplayCacheMiss
+from llm_client import run_llm_query, get_llm_cache
+
+# Model specs used when none are given: the single large model, no cascade
+DEFAULT_MODELS = ("gpt4_1:openai",)
+
+
+def _apply_check(check, response_text):
+    """Return (result, accepted, error) of check(response_text); error is the exception check raised."""
+    try:
+        result, accepted = check(response_text)
+    except Exception as e:
+        return None, False, e
+    return result, accepted, None
+
+
+def checked_query(model, query, check, final=True):
+    """
+    Query one model and apply check to its answer.
+
+    An answer is kept in the response cache unless check raised on it (unparseable)
+    or, when not final, did not accept it (it is escalated to the next model); the
+    answer of the final model is cached even when uncertain, since it is the one used.
+    A cached answer that would not be kept now (e.g. after check changed) is removed.
+
+    Args:
+        final (bool): Whether model is the last one of its cascade (or a single model)
+
+    Returns:
+        tuple: (result, accepted, error) where error is the exception check raised, if any
+    """
+    checked = []
+
+    def keep(outcome):
+        _, accepted, error = outcome
+        return error is None and (accepted or final)
+
+    def accept(response):
+        checked.append(_apply_check(check, response.get('response', '')))
+        return keep(checked[-1])
+
+    response = run_llm_query(model=model, query=query, accept=accept)
+    if not checked:
+        # Served from the cache
+        checked.append(_apply_check(check, response.get('response', '')))
+        if not keep(checked[-1]):
+            get_llm_cache().delete(model, query)
+    return checked[-1]
+
+
+class ModelCascade:
+    """
+    Models tried in order, cheapest first, with per-model request statistics.
+
+    Args:
+        models (list): ModelConfigs, cheapest first; the last one is the fallback
+    """
+
+    def __init__(self, models):
+        if not models:
+            raise ValueError("A model cascade needs at least one model")
+        self.models = list(models)
+        self._stats = {model.name: {"requests": 0, "accepted": 0, "escalated": 0, "seconds": 0.0}
+                       for model in self.models}
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return " > ".join(model.name for model in self.models)
+
+    def _record(self, model, seconds, outcome):
+        with self._lock:
+            stats = self._stats[model.name]
+            stats["requests"] += 1
+            stats["seconds"] += seconds
+            stats[outcome] += 1
+        metrics.incr(f"cascade.{model.name}.{outcome}")
+
+    def run(self, query, check):
+        """
+        Send query to each model in turn until check accepts the answer.
+
+        Args:
+            query (str): Prompt
+            check (callable): check(response_text) -> (result, accepted). An exception
+                              raised by check also counts as not accepted.
+
+        Returns:
+            The result of the first accepted answer, or of the last model's answer
+
+        Raises:
+            Whatever check raised for the last model's answer; LLMUnavailableError;
+            ReplayCacheMiss when the last model's answer is not cached in replay mode
+        """
+        for index, model in enumerate(self.models):
+            last = index == len(self.models) - 1
+            start = time.perf_counter()
+            try:
+                result, accepted, error = checked_query(model, query, check, final=last)
+            except ReplayCacheMiss:
+                # Escalated answers are not cached, so a replay goes on to the model that answered
+                if last:
+                    raise
+                continue
+            seconds = time.perf_counter() - start
+            if error is not None:
+                if last:
+                    self._record(model, seconds, "accepted")
+                    raise error
+                reason = f"unusable answer ({error})"
+            else:
+                reason = "uncertain answer"
+            if accepted or last:
+                self._record(model, seconds, "accepted")
+                return result
+            self._record(model, seconds, "escalated")
+            print(f"  {model.name}: {reason}; escalating to {self.models[index + 1].name}")
+
+    def stats(self):
+        """
+        Requests, accepted answers, escalations and latency per model, plus an estimate
+        of the latency saved compared with sending every request to the last model.
+        """
+        with self._lock:
+            per_model = {name: dict(stats, mean_seconds=stats["seconds"] / stats["requests"]
+                                    if stats["requests"] else None)
+                         for name, stats in self._stats.items()}
+        final = per_model[self.models[-1].name]["mean_seconds"]
+        saved = None
+        if final is not None:
+            # Every request a cheaper model settled would otherwise have cost a final-model
+            # call; every cheaper call (settled or escalated) was spent on top of that
+            saved = sum(stats["accepted"] * final - stats["seconds"]
+                        for name, stats in per_model.items() if name != self.models[-1].name)
+        return {"models": per_model, "estimated_seconds_saved": saved}
+
+
+def print_cascade_report(model):
+    """Print requests per model and the estimated latency saved (nothing for a single model)."""
+    if not isinstance(model, ModelCascade):
+        return
+    stats = model.stats()
+    for name, model_stats in stats["models"].items():
+        mean = model_stats["mean_seconds"]
+        print(f"Model {name}: {model_stats['requests']} requests, {model_stats['accepted']} accepted, "
+              f"{model_stats['escalated']} escalated"
+              + (f", {mean:.2f}s mean latency" if mean is not None else ""))
+    if stats["estimated_seconds_saved"] is not None:
+        print(f"Estimated LLM latency saved by the cascade: {stats['estimated_seconds_saved']:.1f}s")
+
+
+def run_with_escalation(model, query, check):
+    """
+    Send query to a ModelConfig or a ModelCascade (see ModelCascade.run).
+
+    For a single model the answer is returned, and cached, whether check accepts it or
+    not; only an answer check raised on is neither (see checked_query).
+    """
+    if isinstance(model, ModelCascade):
+        return model.run(query, check)
+    result, _, error = checked_query(model, query, check)
+    if error is not None:
+        raise error
+    return result
+
+
+def build_models(specs, access_token, api_url, registry_url=None):
+    """
+    Build the model (or cascade) for a list of model specs, cheapest first.
+
+    Args:
+        specs (list): "name" or "name:provider"; bare names are looked up in the
+                      model registry at registry_url
+        access_token (str): API access token
+        api_url (str): Query endpoint
+        registry_url (str): Model info endpoint (config.TEST_LLMs_REST_API_PROVIDERS_URL)
+
+    Returns:
+        ModelConfig for a single spec, otherwise a ModelCascade
+
+    Raises:
+        ValueError: A model is not in the registry or the registry could not be read
+    """
+    names = [spec.partition(":")[0] for spec in specs]
+    providers = {name: provider for name, _, provider in (spec.partition(":") for spec in specs) if provider}
+
+    unresolved = [name for name in names if name not in providers]
+    if unresolved:
+        registry = query_model_info_api(ModelConfig(access_token=access_token, api_url=registry_url))
+        if not registry:
+            raise ValueError(f"Could not read the model registry at {registry_url}")
+        available = model_list(registry)
+        unknown = [name for name in unresolved if name not in available]
+        if unknown:
+            raise ValueError(f"Models not in the registry: {', '.join(unknown)}")
+        providers.update({name: provider for name, provider in model_provider_mapper(registry).items()
+                          if name in unresolved})
+
+    models = [ModelConfig(name=name, provider=providers[name], access_token=access_token, api_url=api_url)
+              for name in names]
+    return models[0] if len(models) == 1 else ModelCascade(models)
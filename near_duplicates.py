@@ -0,0 +1,155 @@
+"""
+Find syllabi that are near-duplicates of one already extracted, to reuse its extraction.
+
+Many PDFs are the same syllabus with small edits, one per section or instructor.
+NearDuplicateIndex keeps a MinHash signature of the word shingles of every cluster
+representative in an LSH table (BANDS bands of ROWS_PER_BAND rows), so each new text
+is only compared with the few representatives it shares a band with; a candidate is
+accepted when the exact shingle Jaccard similarity reaches the threshold. A text with
+no such representative starts a new cluster.
+
+main.extract_syllabi extracts each representative with the LLM as usual. For a
+member, fields_to_recheck compares its text with the representative's: a field is
+asked again (see main.extract_near_duplicate) only when the representative's value is
+no longer in the member's text, or when the local rules (see header_heuristics) read
+it differently in the two texts, e.g. another instructor on the first page. All other
+fields are copied from the representative.
+"""
+import threading
+import zlib
+
+import numpy as np
+
+from header_heuristics import extract_header_fields
+from text_similarity import normalize_text, tokenize, shingles, jaccard
+
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+# Shingle Jaccard similarity from which two syllabi are near-duplicates
+NEAR_DUPLICATE_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = np.random.RandomState(20240917)
+_PERMUTATION_A = _rng.randint(1, _MAX_HASH, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERMUTATION_B = _rng.randint(0, _MAX_HASH, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def text_shingles(text, size=SHINGLE_SIZE):
+    """Return the set of normalized word shingles of a syllabus text."""
+    return shingles(tokenize(text), size)
+
+
+def minhash_signature(shingle_set):
+    """
+    Return the MinHash signature (NUM_PERMUTATIONS values) of a set of shingles.
+
+    The shingles are hashed to 32 bits, so a * hash + b never overflows 64 bits.
+    """
+    if not shingle_set:
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingle_set),
+                         dtype=np.uint64, count=len(shingle_set))
+    permuted = (np.outer(hashes, _PERMUTATION_A) + _PERMUTATION_B) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+def _band_keys(signature):
+    return [(band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """
+    Online clustering of syllabus texts into near-duplicate clusters, safe to share
+    between the threads of a run.
+
+    Args:
+        threshold (float): Shingle Jaccard similarity from which a text joins a cluster
+    """
+
+    def __init__(self, threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._representatives = {}
+        self._clusters = {}
+        self._reused = 0
+        self._rechecked = 0
+        self._fields_rechecked = 0
+
+    def add(self, file_name, text):
+        """
+        Place a text in a cluster.
+
+        Returns:
+            tuple: (representative file name, representative text, similarity), or None
+                   when the text starts a new cluster (it is then its representative)
+        """
+        shingle_set = text_shingles(text)
+        signature = minhash_signature(shingle_set)
+        keys = _band_keys(signature)
+        with self._lock:
+            candidates = dict.fromkeys(name for key in keys for name in self._buckets.get(key, ()))
+            best = None
+            for name in candidates:
+                similarity = jaccard(shingle_set, self._representatives[name][1])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (name, similarity)
+            if best is not None:
+                self._clusters[best[0]].append(file_name)
+                return best[0], self._representatives[best[0]][0], best[1]
+            self._representatives[file_name] = (text, shingle_set)
+            self._clusters[file_name] = [file_name]
+            for key in keys:
+                self._buckets.setdefault(key, []).append(file_name)
+        return None
+
+    def record_reuse(self, fields_rechecked, asked_llm):
+        """
+        Count a member extracted from its representative.
+
+        Args:
+            fields_rechecked (int): Fields extracted again from the member's text
+            asked_llm (bool): Whether the re-check needed an LLM request
+        """
+        with self._lock:
+            self._reused += 1
+            self._fields_rechecked += fields_rechecked
+            self._rechecked += bool(asked_llm)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "files": sum(len(members) for members in self._clusters.values()),
+                "clusters": len(self._clusters),
+                "clusters_with_duplicates": sum(1 for members in self._clusters.values() if len(members) > 1),
+                "reused": self._reused,
+                "rechecked": self._rechecked,
+                "fields_rechecked": self._fields_rechecked,
+                # A reuse replaces a full extraction, at most by one re-check of a few fields
+                "llm_calls_saved": self._reused - self._rechecked,
+            }
+
+
+def fields_to_recheck(representative_text, representative_record, text, fields):
+    """
+    Return the fields of a near-duplicate that may differ from its representative's record.
+
+    A field is re-checked when its value in the representative's record no longer
+    appears in the text, or when the local rules extract it differently from the two
+    texts (which also catches a field the representative lacked, or a section that
+    only grew).
+    """
+    normalized = normalize_text(text)
+    local_representative, _ = extract_header_fields("", representative_text)
+    local, _ = extract_header_fields("", text)
+    changed = []
+    for field in fields:
+        value = representative_record.get(field, "NA")
+        if value not in (None, "", "NA") and normalize_text(value) not in normalized:
+            changed.append(field)
+        elif local.get(field) != local_representative.get(field):
+            changed.append(field)
+    return changed
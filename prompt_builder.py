@@ -1,3 +1,55 @@
+# Extraction fields (other than file_name) and how the audit prompt describes them
+AUDIT_FIELDS = {
+    "full_title": "Full course title as written in the document.",
+    "course_code": "Extracted course code (or \"NA\" if not found).",
+    "course_name": "Extracted course name (or \"NA\" if not found).",
+    "instructor_name": "Extracted instructor name (or \"NA\" if not found).",
+    "extracted_gold_statement": "Full text content of the Gold Statement section (or \"NA\" if not found).",
+    "learning_outcome": "Full text content of the Learning Outcomes section (or \"NA\" if not found).",
+}
+
+
+def estimate_tokens(text):
+    """Rough token count for a prompt (about four characters per token)."""
+    return len(text) // 4
+
+
+def build_partial_audit_prompt(filename, data, fields, part=None, parts=None):
+    """
+    Build an audit prompt that asks only for some of the extraction fields, for
+    syllabi whose other fields were already extracted locally (see header_heuristics).
+
+    With part and parts, data is one chunk of a syllabus too long for a single prompt
+    (see document_chunks), and fields missing from that chunk are to be "NA".
+    """
+    chunk_note = ""
+    if part is not None:
+        chunk_note = (f"The document is too long for one request; below is part {part} of {parts}. "
+                      f"Extract only what appears in this part and use \"NA\" for anything that does not.\n")
+    field_lines = "\n".join(f'       - "{field}": {AUDIT_FIELDS[field]}' for field in fields)
+    example = ",\n".join(f'  "{field}": "..."' for field in fields)
+    return f"""
+You are an AI agent assisting faculty with auditing syllabus documents.
+Read the document below and extract only the fields listed here.
+{chunk_note}For text sections, include the complete text content of the section, not just "yes" or "no".
+
+   - Return results as JSON with the following fields:
+       - "file_name": MUST be exactly "{filename}".
+{field_lines}
+
+Strictly follow JSON format for output. For example:
+{{
+  "file_name": "{filename}",
+{example}
+}}
+
+Do not include any additional commentary—just the JSON output.
+
+Extracted document content:: {data}
+
+"""
+
+
 def build_syllabus_audit_prompt(filename, data):
     return f"""
 You are an AI agent assisting faculty with auditing syllabus documents.
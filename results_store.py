@@ -0,0 +1,317 @@
+"""
+Indexed SQLite store of audit results.
+
+One row per syllabus content, keyed by (file content hash, course_code), holding
+the extraction fields, the gold designation and the match verdict, and a files table
+mapping every file name to its content hash. Each pipeline stage upserts its results
+as they are produced (see main.process_folder), so a reporting query such as "CIS
+courses that failed matching" reads only the matching rows through the
+gold_designation, match_result and course_code indexes, and a re-run of a stage
+updates only the rows it touches. Excel/CSV reports are exports of the report view,
+which joins the two tables: copies of a syllabus under several file names are
+audited once but reported once per file.
+
+Usage:
+    python results_store.py query --course-prefix CIS --match-result "not matched"
+    python results_store.py export Output/not_matched.csv --match-result "not matched"
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+RESULTS_DB_PATH = os.path.join("Output", "results.sqlite")
+
+# Extraction fields stored per syllabus, in report order (see prompt_builder.AUDIT_FIELDS)
+EXTRACTION_COLUMNS = ("file_name", "full_title", "course_code", "course_name", "instructor_name",
+                      "extracted_gold_statement", "learning_outcome")
+# Report column -> store column
+REPORT_COLUMNS = {column: column for column in EXTRACTION_COLUMNS}
+REPORT_COLUMNS.update({"gold_designation": "gold_designation", "designation_source": "designation_source",
+                       "match_result": "match_result",
+                       "expected gold statement": "expected_gold_statement"})
+
+
+def _text(value):
+    """Store a missing or empty value as "NA", like the reports."""
+    if value is None:
+        return "NA"
+    value = str(value).strip()
+    return value if value and value.lower() != "nan" else "NA"
+
+
+class ResultsStore:
+    """
+    SQLite results store, safe to share between the threads of a run.
+
+    Args:
+        path (str): SQLite database file
+    """
+
+    def __init__(self, path=RESULTS_DB_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        files_table_exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'files'").fetchone() is not None
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS results (
+                file_hash TEXT NOT NULL,
+                {", ".join(f"{column} TEXT" for column in EXTRACTION_COLUMNS)},
+                gold_designation TEXT,
+                match_result TEXT,
+                expected_gold_statement TEXT,
+                extracted_at REAL,
+                designated_at REAL,
+                matched_at REAL,
+                designation_source TEXT,
+                PRIMARY KEY (file_hash, course_code)
+            )
+        """)
+        # Last, as in a store written before it was added (merge_from copies rows by position)
+        if "designation_source" not in {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}:
+            self._conn.execute("ALTER TABLE results ADD COLUMN designation_source TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_gold_designation ON results (gold_designation)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_match_result ON results (match_result)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_course_code ON results (course_code)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                file_name TEXT PRIMARY KEY,
+                file_hash TEXT NOT NULL,
+                seen_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_files_file_hash ON files (file_hash)")
+        if not files_table_exists:
+            # A store written before the files table: each syllabus under its stored name
+            self._conn.execute("INSERT OR IGNORE INTO files SELECT file_name, file_hash, extracted_at FROM results")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def register_files(self, file_hashes):
+        """
+        Record the content hash of each file name, so the report lists every file, also
+        copies whose content was extracted under another name.
+
+        Args:
+            file_hashes (dict): file_name -> content hash
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                                   [(file_name, file_hash, now) for file_name, file_hash in file_hashes.items()])
+            self._conn.commit()
+
+    def upsert_extraction(self, file_hash, record):
+        """
+        Store the extraction record of a syllabus, and register its file name.
+
+        A stored designation and verdict are kept if the course code and gold statement
+        did not change, and cleared otherwise; rows left from an earlier extraction of
+        the same file under another course code are removed.
+        """
+        values = {column: _text(record.get(column)) for column in EXTRACTION_COLUMNS}
+        columns = ", ".join(values)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values if column != "course_code")
+        with self._lock:
+            self._conn.execute("DELETE FROM results WHERE file_hash = ? AND course_code != ?",
+                               (file_hash, values["course_code"]))
+            self._conn.execute(
+                f"INSERT INTO results (file_hash, {columns}, extracted_at) "
+                f"VALUES (?, {', '.join('?' * len(values))}, ?) "
+                f"ON CONFLICT (file_hash, course_code) DO UPDATE SET {updates}, "
+                f"extracted_at = excluded.extracted_at, "
+                f"match_result = CASE WHEN results.extracted_gold_statement = excluded.extracted_gold_statement "
+                f"THEN results.match_result END",
+                (file_hash, *values.values(), time.time())
+            )
+            if values["file_name"] != "NA":
+                self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                                   (values["file_name"], file_hash, time.time()))
+            self._conn.commit()
+
+    def update_designations(self, rows):
+        """
+        Store gold designations and how each was found. A stored verdict is kept only if
+        both are unchanged.
+
+        Args:
+            rows (iterable): (file_hash, course_code, gold_designation, designation_source) tuples,
+                             see map_course_designation.add_gold_designations
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE results SET match_result = CASE WHEN gold_designation = ? AND designation_source IS ? "
+                "THEN match_result END, gold_designation = ?, designation_source = ?, designated_at = ? "
+                "WHERE file_hash = ? AND course_code = ?",
+                [(_text(designation), _text(source), _text(designation), _text(source), now, file_hash,
+                  _text(course_code))
+                 for file_hash, course_code, designation, source in rows]
+            )
+            self._conn.commit()
+
+    def update_match(self, file_hash, course_code, match_result, expected_statement):
+        """Store the match verdict of one syllabus."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE results SET match_result = ?, expected_gold_statement = ?, matched_at = ? "
+                "WHERE file_hash = ? AND course_code = ?",
+                (match_result, _text(expected_statement), time.time(), file_hash, _text(course_code))
+            )
+            self._conn.commit()
+
+    def _select_by_hash(self, columns, file_hashes):
+        """Return the (file_hash, *columns) rows of the given hashes."""
+        file_hashes = list(file_hashes)
+        rows = []
+        with self._lock:
+            # Stay under SQLite's limit on query parameters
+            for start in range(0, len(file_hashes), 500):
+                batch = file_hashes[start:start + 500]
+                rows += self._conn.execute(
+                    f"SELECT file_hash, {', '.join(columns)} FROM results "
+                    f"WHERE file_hash IN ({', '.join('?' * len(batch))})", batch).fetchall()
+        return rows
+
+    def extracted_records(self, file_hashes):
+        """
+        Return file hash -> extraction record for the given hashes that are stored.
+        """
+        return {row[0]: dict(zip(EXTRACTION_COLUMNS, row[1:]))
+                for row in self._select_by_hash(EXTRACTION_COLUMNS, file_hashes)}
+
+    def match_results(self, file_hashes):
+        """
+        Return file hash -> match verdict (None until matched) for the given hashes that are stored.
+        """
+        return {file_hash: match_result
+                for file_hash, match_result in self._select_by_hash(("match_result",), file_hashes)}
+
+    def merge_from(self, path):
+        """
+        Copy every row of another results store (e.g. a shard's) into this one, replacing
+        rows with the same key, together with its file names.
+
+        Returns:
+            int: Result rows copied
+        """
+        # Opening it adds the files table to a store written before it existed
+        ResultsStore(path).close()
+        with self._lock:
+            self._conn.execute("ATTACH DATABASE ? AS other", (path,))
+            try:
+                cursor = self._conn.execute("INSERT OR REPLACE INTO results SELECT * FROM other.results")
+                self._conn.execute("INSERT OR REPLACE INTO files SELECT * FROM other.files")
+                self._conn.commit()
+            finally:
+                self._conn.execute("DETACH DATABASE other")
+        return cursor.rowcount
+
+    def query(self, course_prefix=None, gold_designation=None, match_result=None, file_names=None):
+        """
+        Return the report rows matching every given filter, one per file, ordered by file name.
+
+        Args:
+            course_prefix (str): Course code prefix, e.g. "CIS" or "CIS 1"
+            gold_designation (str): Exact gold designation
+            match_result (str): Exact verdict, e.g. "not matched"
+            file_names (iterable): Only these files (e.g. those of the current run)
+
+        Returns:
+            DataFrame: Rows with the report columns
+        """
+        conditions = []
+        parameters = []
+        if course_prefix:
+            # A range on course_code uses its index, unlike LIKE
+            conditions.append("results.course_code >= ? AND results.course_code < ?")
+            parameters += [course_prefix, course_prefix + "\U0010ffff"]
+        if gold_designation:
+            conditions.append("results.gold_designation = ?")
+            parameters.append(gold_designation)
+        if match_result:
+            conditions.append("results.match_result = ?")
+            parameters.append(match_result)
+        if file_names is not None:
+            file_names = list(file_names)
+            if not file_names:
+                return pd.DataFrame(columns=list(REPORT_COLUMNS))
+            conditions.append(f"files.file_name IN (SELECT value FROM json_each(?))")
+            parameters.append(pd.Series(file_names).to_json(orient="values"))
+        # The file name is the reported file's own, not the one its content was extracted under
+        select = ", ".join(f'{"files" if column == "file_name" else "results"}.{column} AS "{name}"'
+                           for name, column in REPORT_COLUMNS.items())
+        sql = f"SELECT {select} FROM files JOIN results ON results.file_hash = files.file_hash"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY files.file_name, results.course_code"
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=parameters)
+        return df.fillna("NA")
+
+    def export(self, path, formats=None, **filters):
+        """
+        Write the report rows matching the filters (see query) as .xlsx and/or .csv.
+
+        Args:
+            path (str): Output path; its extension is replaced per format
+            formats (tuple): "xlsx" and/or "csv" (default: the extension of path)
+
+        Returns:
+            list: Paths written
+        """
+        df = self.query(**filters)
+        base_name, extension = os.path.splitext(path)
+        written = []
+        for fmt in formats or (extension.lstrip(".") or "xlsx",):
+            output_path = f"{base_name}.{fmt}"
+            if fmt == "csv":
+                df.to_csv(output_path, index=False, na_rep='NA')
+            else:
+                df.to_excel(output_path, index=False, na_rep='NA')
+            written.append(output_path)
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or export the audit results store.")
+    parser.add_argument("command", choices=("query", "export"))
+    parser.add_argument("output", nargs="?", help="Export file (.xlsx or .csv)")
+    parser.add_argument("--db", default=RESULTS_DB_PATH, help="Results database")
+    parser.add_argument("--course-prefix", help="Course code prefix, e.g. CIS")
+    parser.add_argument("--gold-designation", help="Gold designation")
+    parser.add_argument("--match-result", help="Verdict, e.g. 'not matched'")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"no results database at {args.db}")
+
+    store = ResultsStore(args.db)
+    filters = {"course_prefix": args.course_prefix, "gold_designation": args.gold_designation,
+               "match_result": args.match_result}
+    if args.command == "export":
+        if not args.output:
+            parser.error("export needs an output file")
+        for path in store.export(args.output, **filters):
+            print(f"Exported to {path}")
+    else:
+        df = store.query(**filters)
+        with pd.option_context("display.max_rows", None, "display.max_colwidth", 40):
+            print(df[["file_name", "course_code", "gold_designation", "designation_source",
+                      "match_result"]].to_string(index=False))
+        print(f"{len(df)} rows")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Shrink syllabus text to the parts the audit prompt needs.
+
+The extraction prompt only needs the title block and instructor (normally on the
+first page) and the "Gold Statement" and "Learning Outcomes" sections. This module
+keeps the first page plus a window of text after every matching heading, using the
+"--- Page N ---" markers written by input_processing.read_single_pdf_file, and falls
+back to the full text unless a heading is found for each of those sections: a
+section under a heading the table does not know must not be cut out.
+"""
+import re
+
+_PAGE_MARKER_RE = re.compile(r"\n\n--- Page (\d+) ---\n")
+
+# Heading keyword -> characters kept after the heading
+SECTION_WINDOWS = {
+    "gold statement": 3000,
+    "gold designation": 3000,
+    "general studies gold": 3000,
+    "learning outcomes": 4000,
+    "learning objectives": 4000,
+    "instructor": 400,
+}
+# Sections whose heading must be found before anything is cut, with their heading keywords
+REQUIRED_SECTIONS = {
+    "gold statement": ("gold statement", "gold designation", "general studies gold"),
+    "learning outcomes": ("learning outcomes", "learning objectives"),
+}
+# Characters kept before a heading (on the same page), in case the heading text wrapped
+WINDOW_LEAD_CHARS = 200
+# Heading lines are short; a keyword inside a long paragraph line is not a heading
+MAX_HEADING_LENGTH = 100
+# Only the first few headings per keyword are windowed (e.g. "Instructor" recurs often)
+MAX_HEADINGS_PER_KEYWORD = 3
+
+_SHORT_LINE_RE = re.compile(rf"^[^\n]{{0,{MAX_HEADING_LENGTH}}}$", re.MULTILINE)
+
+
+def split_pages(text):
+    """
+    Split extracted text into pages.
+
+    Returns:
+        list: (page_number, start_offset, end_offset) for every page marker in text
+    """
+    markers = list(_PAGE_MARKER_RE.finditer(text))
+    pages = []
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        pages.append((int(marker.group(1)), marker.start(), end))
+    return pages
+
+
+def find_section_headings(text):
+    """
+    Locate heading lines that name a relevant section.
+
+    Returns:
+        list: (offset, keyword) for every heading found, in text order
+    """
+    headings = []
+    counts = dict.fromkeys(SECTION_WINDOWS, 0)
+    for line in _SHORT_LINE_RE.finditer(text):
+        lowered = line.group(0).lower()
+        for keyword in SECTION_WINDOWS:
+            if keyword in lowered:
+                if counts[keyword] < MAX_HEADINGS_PER_KEYWORD:
+                    counts[keyword] += 1
+                    headings.append((line.start(), keyword))
+                break
+    return headings
+
+
+def _merge(spans):
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def window_relevant_sections(text):
+    """
+    Return the first page plus windows around the relevant section headings.
+
+    Each window is prefixed with the marker of the page it starts on. If the text has
+    no page markers, or no heading is found for one of REQUIRED_SECTIONS (e.g. only an
+    "Instructor" line), the full text is returned.
+    """
+    pages = split_pages(text)
+    headings = find_section_headings(text)
+    found = {keyword for _, keyword in headings}
+    if not pages or any(found.isdisjoint(keywords) for keywords in REQUIRED_SECTIONS.values()):
+        return text
+
+    first_page_end = pages[0][2]
+    spans = [(0, first_page_end)]
+    for offset, keyword in headings:
+        # Stay on the heading's page and cut at line boundaries
+        page_start = max((page_start for _, page_start, _ in pages if page_start <= offset), default=0)
+        start = text.rfind("\n", 0, max(page_start, offset - WINDOW_LEAD_CHARS)) + 1
+        end = text.find("\n", offset + SECTION_WINDOWS[keyword])
+        spans.append((max(start, page_start), len(text) if end == -1 else end))
+
+    parts = []
+    for start, end in _merge(spans):
+        if start >= first_page_end:
+            parts.append("\n\n[...]")
+            if not _PAGE_MARKER_RE.match(text, start):
+                page_number = max(number for number, page_start, _ in pages if page_start <= start)
+                parts.append(f"\n\n--- Page {page_number} ---\n")
+            parts.append(text[start:end])
+        else:
+            parts.append(text[start:end])
+    return "".join(parts)
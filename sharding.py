@@ -0,0 +1,192 @@
+"""
+Split an audit run over several processes or machines, and merge their reports.
+
+Every PDF in the data folder belongs to shard shard_of(content hash, N), so the split
+is stable across runs, file renames and machines, and identical copies of a syllabus
+always land on the same shard. A worker started with `main.py --shard I/N` runs
+extraction, designation mapping and matching on its shard only and writes its output,
+checkpoints, results store and report under shard_path(..., I, N) names, so workers
+sharing an Output folder never touch each other's files (and each can --resume on its own).
+
+`python sharding.py merge --shards N` combines the N shard reports into the usual
+*_designation_matched report, keeping one row per file, and copies the shard results
+stores into the main one. `python sharding.py run-local --shards N` runs the N workers
+as local processes and then merges, e.g. to try a sharded run on one machine.
+
+Usage:
+    python main.py --shard 2/4                    # on each node, I = 1..4
+    python sharding.py merge --shards 4
+    python sharding.py run-local --shards 4 -- --max-workers 8 --heuristics
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from results_store import ResultsStore, RESULTS_DB_PATH
+
+DEFAULT_OUTPUT_FILE = os.path.join("Output", "all_results.xlsx")
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def parse_shard(value):
+    """
+    Parse an "I/N" shard specification (1 <= I <= N).
+
+    Returns:
+        tuple: (index, count)
+
+    Raises:
+        ValueError: value is not a valid specification
+    """
+    index, separator, count = value.partition("/")
+    if not separator or not index.strip().isdigit() or not count.strip().isdigit():
+        raise ValueError(f"Shard must look like I/N, e.g. 2/4: {value!r}")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}: {value!r}")
+    return index, count
+
+
+def shard_of(file_hash, count):
+    """Return the shard (1..count) of a file from its SHA-256 content hash."""
+    return int(file_hash[:16], 16) % count + 1
+
+
+def shard_path(path, index, count):
+    """Return the per-shard name of an output path, e.g. all_results.shard-2-of-4.xlsx."""
+    base_name, extension = os.path.splitext(path)
+    return f"{base_name}.shard-{index}-of-{count}{extension}"
+
+
+def merge_shard_reports(count, output_file=DEFAULT_OUTPUT_FILE, report_formats=("xlsx",),
+                        results_db=RESULTS_DB_PATH):
+    """
+    Combine the reports of shards 1..count into the final audit report.
+
+    Every file is reported once, like in an unsharded run: copies of a syllabus under
+    other names keep their rows, and rows of the same file name are kept once (a file
+    edited between the runs of two shards can be reported by both).
+
+    Args:
+        count (int): Number of shards
+        output_file (str): Extraction output file the shards were derived from
+        report_formats (tuple): Formats of the merged report ("xlsx", "csv")
+        results_db (str): Results store to copy the shard stores into (None to skip)
+
+    Returns:
+        list: Paths written
+
+    Raises:
+        FileNotFoundError: A shard report is missing (that shard has not finished)
+    """
+    # main loads pandas and the LLM client, so it is only imported once a merge starts
+    from main import report_path_for, write_report
+
+    frames = []
+    missing = []
+    for index in range(1, count + 1):
+        shard_output = shard_path(output_file, index, count)
+        report_path = report_path_for(shard_output)
+        csv_path = f"{os.path.splitext(report_path)[0]}.csv"
+        if os.path.exists(report_path):
+            frames.append(pd.read_excel(report_path, dtype=str).fillna("NA"))
+        elif os.path.exists(csv_path):
+            frames.append(pd.read_csv(csv_path, dtype=str, keep_default_na=False))
+        else:
+            missing.append(report_path)
+            continue
+    if missing:
+        raise FileNotFoundError(f"Shard reports not found (shards still running or failed): {', '.join(missing)}")
+
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    rows = len(df)
+    if rows and "file_name" in df.columns:
+        df = df.sort_values("file_name", kind="stable")
+        df = df.drop_duplicates(subset="file_name").reset_index(drop=True)
+    print(f"Merged {count} shard reports: {rows} rows, {rows - len(df)} duplicates removed")
+
+    written = write_report(df, report_path_for(output_file), report_formats)
+    for path in written:
+        print(f"Audit report saved to {path}")
+
+    shard_stores = [shard_path(results_db, index, count) for index in range(1, count + 1)] if results_db else []
+    shard_stores = [path for path in shard_stores if os.path.exists(path)]
+    if shard_stores:
+        store = ResultsStore(results_db)
+        rows = sum(store.merge_from(path) for path in shard_stores)
+        store.close()
+        print(f"Copied {rows} rows from {len(shard_stores)} shard results stores into {results_db}")
+    return written
+
+
+def run_local_shards(count, main_args=(), report_formats=("xlsx",)):
+    """
+    Run `main.py --shard I/count` for every shard as parallel local processes, then merge.
+
+    Each worker's console output goes to its own log file next to the shard outputs
+    (main.py writes to DEFAULT_OUTPUT_FILE).
+
+    Returns:
+        bool: True if every shard succeeded and the reports were merged
+    """
+    output_file = DEFAULT_OUTPUT_FILE
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    workers = []
+    for index in range(1, count + 1):
+        log_path = shard_path(os.path.splitext(output_file)[0] + ".log", index, count)
+        log = open(log_path, "w")
+        command = [sys.executable, MAIN_SCRIPT, "--shard", f"{index}/{count}", *main_args]
+        workers.append((index, log_path, log, subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)))
+    print(f"Started {count} shard workers")
+
+    start = time.perf_counter()
+    failed = []
+    for index, log_path, log, process in workers:
+        return_code = process.wait()
+        log.close()
+        status = "done" if return_code == 0 else f"failed with exit code {return_code}"
+        print(f"  Shard {index}/{count} {status} after {time.perf_counter() - start:.1f}s (log: {log_path})")
+        if return_code != 0:
+            failed.append(index)
+    if failed:
+        print(f"Not merging: shard(s) {', '.join(map(str, failed))} failed")
+        return False
+
+    merge_shard_reports(count, output_file=output_file, report_formats=report_formats)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge or locally run a sharded audit.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    merge_parser = subparsers.add_parser("merge", help="Combine the shard reports into the final report")
+    run_parser = subparsers.add_parser("run-local", help="Run every shard as a local process, then merge; "
+                                                         "arguments after -- are passed to main.py")
+    merge_parser.add_argument("--output", default=DEFAULT_OUTPUT_FILE,
+                              help="Extraction output file of the unsharded run")
+    for subparser in (merge_parser, run_parser):
+        subparser.add_argument("--shards", type=int, required=True, help="Number of shards")
+        subparser.add_argument("--report-formats", default="xlsx", help="Comma-separated: xlsx, csv")
+    args, main_args = parser.parse_known_args()
+    if main_args and main_args[0] == "--":
+        main_args = main_args[1:]
+    if args.command == "merge" and main_args:
+        parser.error(f"unrecognized arguments: {' '.join(main_args)}")
+
+    report_formats = tuple(fmt.strip() for fmt in args.report_formats.split(",") if fmt.strip())
+    if args.command == "merge":
+        try:
+            merge_shard_reports(args.shards, output_file=args.output, report_formats=report_formats)
+        except FileNotFoundError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif not run_local_shards(args.shards, main_args, report_formats=report_formats):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Content-addressed on-disk cache for text extracted from PDF files.
+
+Entries are keyed by a hash of the PDF contents and the extractor version, so an
+unchanged file is never parsed twice and a new extractor invalidates old entries.
+The cache is bounded in size; the least recently used entries are evicted first.
+
+Usage:
+    python text_cache.py stats
+    python text_cache.py purge            # remove every entry
+    python text_cache.py purge --max-mb 100  # evict down to 100 MB
+"""
+import argparse
+import hashlib
+import os
+import tempfile
+
+TEXT_CACHE_DIR = os.path.join(".cache", "pdf_text")
+TEXT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+def cache_key(content_hash, extractor_version):
+    """Combine a file content hash and the extractor version into a cache key."""
+    return hashlib.sha256(f"{extractor_version}:{content_hash}".encode("utf-8")).hexdigest()
+
+
+def _entry_path(key, cache_dir):
+    return os.path.join(cache_dir, key[:2], f"{key}.txt")
+
+
+def load_cached_text(content_hash, extractor_version, cache_dir=TEXT_CACHE_DIR):
+    """
+    Return the cached text for a file, or None on a cache miss.
+
+    Args:
+        content_hash (str): Hash of the PDF file contents
+        extractor_version (str): Version tag of the extractor that produced the text
+        cache_dir (str): Cache directory
+    """
+    path = _entry_path(cache_key(content_hash, extractor_version), cache_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return None
+
+    # Refresh the access time used for LRU eviction
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return text
+
+
+def store_cached_text(content_hash, extractor_version, text, cache_dir=TEXT_CACHE_DIR):
+    """
+    Store extracted text in the cache.
+
+    The entry is written to a temporary file and renamed into place, so concurrent
+    extraction processes never see a partially written entry. Checking the size means
+    walking the whole cache, so it is not done here: the process that reads a batch of
+    files calls enforce_size_limit once the batch is done (see input_processing).
+    """
+    path = _entry_path(cache_key(content_hash, extractor_version), cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _list_entries(cache_dir):
+    """Return (path, size, mtime) for every cache entry."""
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if not name.endswith(".txt"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def evict(max_bytes, cache_dir=TEXT_CACHE_DIR):
+    """
+    Remove least recently used entries until the cache holds at most max_bytes.
+
+    Returns:
+        int: Number of entries removed
+    """
+    entries = _list_entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    if total <= max_bytes:
+        return 0
+
+    removed = 0
+    for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def enforce_size_limit(max_bytes=TEXT_CACHE_MAX_BYTES, cache_dir=TEXT_CACHE_DIR):
+    """
+    Evict least recently used entries if the cache grew past max_bytes, e.g. after a
+    batch of files was read. A missing cache directory is not an error.
+
+    Returns:
+        int: Number of entries removed
+    """
+    try:
+        return evict(max_bytes, cache_dir)
+    except OSError as e:
+        print(f"Warning: could not trim the text cache {cache_dir}: {e}")
+        return 0
+
+
+def cache_stats(cache_dir=TEXT_CACHE_DIR):
+    """Return a dict with the number of entries and total size of the cache."""
+    entries = _list_entries(cache_dir)
+    return {
+        "cache_dir": cache_dir,
+        "entries": len(entries),
+        "total_bytes": sum(size for _, size, _ in entries),
+        "max_bytes": TEXT_CACHE_MAX_BYTES,
+    }
+
+
+def purge(cache_dir=TEXT_CACHE_DIR):
+    """Remove every entry from the cache and return how many were removed."""
+    return evict(0, cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or purge the extracted PDF text cache.")
+    parser.add_argument("--cache-dir", default=TEXT_CACHE_DIR, help="Cache directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Show the number of entries and size of the cache")
+    purge_parser = subparsers.add_parser("purge", help="Remove cache entries")
+    purge_parser.add_argument("--max-mb", type=float, default=None,
+                              help="Only evict least recently used entries down to this size")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        stats = cache_stats(args.cache_dir)
+        print(f"Cache directory: {stats['cache_dir']}")
+        print(f"Entries: {stats['entries']}")
+        print(f"Size: {stats['total_bytes'] / (1024 * 1024):.1f} MB "
+              f"(limit {stats['max_bytes'] / (1024 * 1024):.0f} MB)")
+    elif args.command == "purge":
+        if args.max_mb is None:
+            removed = purge(args.cache_dir)
+        else:
+            removed = evict(int(args.max_mb * 1024 * 1024), args.cache_dir)
+        print(f"Removed {removed} cache entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Text normalization and token/shingle similarity helpers for comparing syllabus statements.
+"""
+import re
+import unicodedata
+
+# Leading bullets and list numbering, e.g. "•", "-", "*", "1.", "(2)"
+_BULLET_RE = re.compile(r"^\s*(?:[-*•◦▪‣●○■□–—]|\(?\d+[.)])\s+",
+                        re.MULTILINE)
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_text(text):
+    """
+    Normalize text for comparison: strip bullets and list numbering, fold unicode
+    and case, drop punctuation and collapse whitespace.
+    """
+    if text is None:
+        return ""
+    text = _BULLET_RE.sub(" ", str(text))
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM_RE.sub(" ", text.lower()).strip()
+
+
+def tokenize(text):
+    """Return the list of normalized word tokens in text."""
+    normalized = normalize_text(text)
+    return normalized.split() if normalized else []
+
+
+def shingles(tokens, size=3):
+    """Return the set of word n-grams of the given size (the tokens themselves if too short)."""
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def containment(part, whole):
+    """Fraction of the set `part` that is present in the set `whole`."""
+    if not part:
+        return 0.0
+    return len(part & whole) / len(part)
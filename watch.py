@@ -0,0 +1,293 @@
+"""
+Watch the data folder and audit new or changed syllabi as they arrive.
+
+`python watch.py` starts a long-running process that polls Data/ every few seconds.
+A PDF is picked up once it has not been modified for SETTLE_SECONDS (so a file still
+being copied is not read half-written) and its content hash is new or changed. Only
+those files go through extraction, designation mapping and gold matching; their rows
+are upserted into the results store (see results_store) and the report is exported
+again from the store for the files currently in the folder.
+
+The process stays warm between batches: the model (or cascade), LLM response cache,
+scheduler and HTTP/WebSocket transport, the results store and the compiled course and
+gold statement indexes (see compiled_index) are set up once. On start, files whose
+content is already audited in the store are not processed again.
+
+A file whose extraction failed or whose verdict could not be reached (the LLM was
+unavailable or the request failed) is picked up again after RETRY_BASE_SECONDS,
+doubling per failed attempt up to RETRY_MAX_SECONDS, without having to change.
+
+Usage:
+    python watch.py
+    python watch.py --interval 2 --heuristics --llm-transport async
+    python watch.py --once                  # audit what is new, then exit
+"""
+import argparse
+import os
+import threading
+import time
+
+import metrics
+from document_chunks import MAX_PROMPT_TOKENS
+from input_processing import compute_file_hash, list_pdf_files, read_pdfs_from_folder, iter_pdfs_from_folder
+from main import add_llm_arguments, configure_llm, print_llm_report, extract_syllabi, audit_records
+from main import report_path_for
+from match import LLM_FAILURES
+from results_store import ResultsStore, RESULTS_DB_PATH
+
+DEFAULT_DATA_FOLDER = "Data/"
+DEFAULT_OUTPUT_FILE = os.path.join("Output", "all_results.xlsx")
+# Seconds between two scans of the data folder
+POLL_INTERVAL = 5.0
+# A file modified less than this many seconds ago may still be being written
+SETTLE_SECONDS = 2.0
+# Batches of at least this many files are parsed on a process pool
+PDF_POOL_MIN_FILES = 8
+PDF_WORKERS = 4
+# Delay before a failed file is audited again, doubled per consecutive failure
+RETRY_BASE_SECONDS = 30.0
+RETRY_MAX_SECONDS = 900.0
+
+
+class FolderWatcher:
+    """
+    Detect new and changed PDFs in a folder by polling.
+
+    A file's content is only hashed when its size or modification time changed since
+    the last poll, so a poll of an unchanged folder costs one stat per file.
+
+    Args:
+        folder_path (str): Folder to watch
+        settle_seconds (float): Minimum age of a file's last modification before it is picked up
+    """
+
+    def __init__(self, folder_path, settle_seconds=SETTLE_SECONDS):
+        self.folder_path = folder_path
+        self.settle_seconds = settle_seconds
+        # file_name -> (size, mtime_ns, content hash)
+        self._seen = {}
+        # file_name -> time after which an unchanged file is reported again (see retry_later)
+        self._retry_at = {}
+
+    def poll(self):
+        """
+        Scan the folder once.
+
+        Returns:
+            list: (file_name, file_hash) of the files that are new or whose content changed,
+                  and of the files whose retry is due
+        """
+        now = time.time()
+        changed = []
+        present = set()
+        for file_name in list_pdf_files(self.folder_path):
+            path = os.path.join(self.folder_path, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed since the listing
+                continue
+            present.add(file_name)
+            signature = (stat.st_size, stat.st_mtime_ns)
+            seen = self._seen.get(file_name)
+            if seen is not None and seen[:2] == signature:
+                continue
+            if now - stat.st_mtime < self.settle_seconds:
+                continue
+            file_hash = compute_file_hash(path)
+            self._seen[file_name] = (*signature, file_hash)
+            if seen is None or seen[2] != file_hash:
+                changed.append((file_name, file_hash))
+                self._retry_at.pop(file_name, None)
+        for file_name in set(self._seen) - present:
+            del self._seen[file_name]
+            self._retry_at.pop(file_name, None)
+        for file_name, retry_at in list(self._retry_at.items()):
+            if retry_at <= now and file_name in self._seen:
+                del self._retry_at[file_name]
+                changed.append((file_name, self._seen[file_name][2]))
+        return changed
+
+    def retry_later(self, file_name, delay):
+        """Report file_name again from the first poll at least delay seconds from now, even if unchanged."""
+        self._retry_at[file_name] = time.time() + delay
+
+    def file_hashes(self):
+        """Return file_name -> content hash of the files seen in the folder."""
+        return {file_name: seen[2] for file_name, seen in self._seen.items()}
+
+
+class AuditWatcher:
+    """
+    Audit the files a FolderWatcher reports, in a process that keeps the model, LLM
+    session, results store and indexes loaded between batches.
+
+    Args:
+        folder_path (str): Folder to watch
+        model: LLM model configuration (or cascade)
+        store (ResultsStore): Results store the rows are upserted into
+        output_file (str): Extraction output path the report path is derived from (see main.report_path_for)
+        report_formats (tuple): Formats of the report exported after each batch (empty for none)
+        max_workers (int): Number of concurrent LLM requests
+        heuristics (bool): Extract confidently recognised fields locally (see header_heuristics)
+        max_prompt_tokens (int): Split longer prompts into chunks of pages (0 never splits)
+        settle_seconds (float): See FolderWatcher
+        window_sections (bool): Send only the first page and the relevant sections (see section_windowing)
+    """
+
+    def __init__(self, folder_path, model, store, output_file=DEFAULT_OUTPUT_FILE, report_formats=("xlsx",),
+                 max_workers=4, heuristics=False, max_prompt_tokens=MAX_PROMPT_TOKENS,
+                 settle_seconds=SETTLE_SECONDS, window_sections=True):
+        self.folder_path = folder_path
+        self.model = model
+        self.store = store
+        self.report_path = report_path_for(output_file)
+        self.report_formats = report_formats
+        self.max_workers = max_workers
+        self.heuristics = heuristics
+        self.max_prompt_tokens = max_prompt_tokens
+        self.window_sections = window_sections
+        self.watcher = FolderWatcher(folder_path, settle_seconds=settle_seconds)
+        self.batches = 0
+        self.files_audited = 0
+        # file_name -> consecutive failed audits, for the retry backoff
+        self._failures = {}
+
+    def audit(self, changed):
+        """
+        Extract, designate and match a batch of new or changed files, then export the report.
+
+        Files already audited in the store (e.g. by an earlier process) are skipped, and
+        files whose extraction is stored are only designated and matched again.
+
+        Returns:
+            int: Files audited
+        """
+        start = time.perf_counter()
+        file_hashes = dict(changed)
+        # A copy of an audited syllabus is reported under its own name without being audited again
+        self.store.register_files(file_hashes)
+        verdicts = self.store.match_results(file_hashes.values())
+        pending = [(file_name, file_hash) for file_name, file_hash in changed
+                   if verdicts.get(file_hash) is None or verdicts[file_hash] in LLM_FAILURES]
+        if not pending:
+            return 0
+        print(f"\n{len(pending)} new or changed file(s): {', '.join(file_name for file_name, _ in pending)}")
+
+        stored = self.store.extracted_records(file_hash for _, file_hash in pending)
+        records = {file_name: dict(stored[file_hash], file_name=file_name)
+                   for file_name, file_hash in pending if file_hash in stored}
+        to_extract = [file_name for file_name, _ in pending if file_name not in records]
+
+        def save_record(file_name, parsed):
+            self.store.upsert_extraction(file_hashes[file_name], parsed)
+            records[file_name] = parsed
+
+        if to_extract:
+            read_errors = []
+            if len(to_extract) >= PDF_POOL_MIN_FILES:
+                pdf_items = iter_pdfs_from_folder(self.folder_path, max_workers=PDF_WORKERS, filenames=to_extract,
+                                                  errors=read_errors)
+            else:
+                pdf_items = read_pdfs_from_folder(self.folder_path, filenames=to_extract).items()
+            with metrics.span("stage.extraction", files=len(to_extract)):
+                _, failures = extract_syllabi(pdf_items, self.model, max_workers=self.max_workers,
+                                              on_result=save_record, window_sections=self.window_sections,
+                                              heuristics=self.heuristics, max_prompt_tokens=self.max_prompt_tokens)
+            for file_name, error in read_errors + failures:
+                print(f"  {file_name} failed extraction: {error}")
+
+        results = [records[file_name] for file_name, _ in pending if file_name in records]
+        failed = {file_name for file_name, _ in pending if file_name not in records}
+        if results:
+            df = audit_records(results, self.model, None, store=self.store, file_hashes=file_hashes)
+            if "match_result" in df.columns:
+                failed.update(df.loc[df["match_result"].isin(LLM_FAILURES), "file_name"])
+        self._schedule_retries([file_name for file_name, _ in pending], failed)
+        seconds = time.perf_counter() - start
+        metrics.observe("watch.batch_seconds", seconds)
+        print(f"Audited {len(results)} file(s) in {seconds:.1f}s")
+
+        if self.report_formats:
+            with metrics.span("stage.report", formats=",".join(self.report_formats)):
+                written = self.store.export(self.report_path, self.report_formats,
+                                            file_names=self.watcher.file_hashes())
+            for path in written:
+                print(f"Audit report saved to {path}")
+        self.batches += 1
+        self.files_audited += len(results)
+        return len(results)
+
+    def _schedule_retries(self, file_names, failed):
+        """Queue the failed files for a retry with exponential backoff, and reset the others."""
+        for file_name in file_names:
+            if file_name not in failed:
+                self._failures.pop(file_name, None)
+                continue
+            attempts = self._failures[file_name] = self._failures.get(file_name, 0) + 1
+            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            self.watcher.retry_later(file_name, delay)
+            metrics.incr("watch.retries_scheduled")
+            print(f"  {file_name} will be retried in {delay:.0f}s (failed attempt {attempts})")
+
+    def poll_once(self):
+        """Scan the folder and audit what is new. Returns the number of files audited."""
+        return self.audit(self.watcher.poll())
+
+    def run(self, interval=POLL_INTERVAL, stop=None):
+        """Poll the folder every interval seconds until interrupted, or until stop (a threading.Event) is set."""
+        print(f"Watching {self.folder_path} every {interval:g}s (Ctrl+C to stop)")
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.poll_once()
+            stop.wait(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch the data folder and audit new or changed syllabi.")
+    add_llm_arguments(parser)
+    parser.add_argument("--data", default=DEFAULT_DATA_FOLDER, help="Folder of syllabus PDFs to watch")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="Seconds between scans")
+    parser.add_argument("--settle-seconds", type=float, default=SETTLE_SECONDS,
+                        help="Only pick up files not modified for this many seconds")
+    parser.add_argument("--once", action="store_true", help="Audit what is new or changed, then exit")
+    parser.add_argument("--heuristics", action="store_true",
+                        help="Extract header fields and clearly headed sections locally and only ask the LLM "
+                             "for the rest")
+    parser.add_argument("--max-prompt-tokens", type=int, default=MAX_PROMPT_TOKENS,
+                        help="Split syllabi whose prompt exceeds this many estimated tokens into chunks of pages")
+    parser.add_argument("--no-window", action="store_true",
+                        help="Send the full syllabus text to the LLM instead of the first page and the Gold "
+                             "Statement and Learning Outcomes sections")
+    parser.add_argument("--results-db", default=RESULTS_DB_PATH, help="SQLite results store")
+    parser.add_argument("--report-formats", default="xlsx",
+                        help="Comma-separated formats of the report exported after each batch: xlsx, csv "
+                             "('' for none; export on demand with results_store.py)")
+    args = parser.parse_args()
+    if not os.path.isdir(args.data):
+        parser.error(f"folder not found: {args.data}")
+
+    model, llm_cache, scheduler, transport = configure_llm(args)
+    store = ResultsStore(args.results_db)
+    watcher = AuditWatcher(args.data, model, store,
+                           report_formats=tuple(fmt.strip() for fmt in args.report_formats.split(",") if fmt.strip()),
+                           max_workers=args.max_workers, heuristics=args.heuristics,
+                           max_prompt_tokens=args.max_prompt_tokens, settle_seconds=args.settle_seconds,
+                           window_sections=not args.no_window)
+    try:
+        if args.once:
+            watcher.poll_once()
+        else:
+            watcher.run(args.interval)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        if transport is not None:
+            transport.close()
+        store.close()
+    print(f"{watcher.files_audited} file(s) audited in {watcher.batches} batch(es)")
+    print_llm_report(model, llm_cache, scheduler)
+
+
+if __name__ == "__main__":
+    main()